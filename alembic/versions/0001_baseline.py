@@ -0,0 +1,122 @@
+"""Baseline schema, as created by Base.metadata.create_all before migrations existed
+
+Databases that were created by create_all should be marked with
+`alembic stamp 0001_baseline` once, then upgraded with `alembic upgrade head`.
+
+Revision ID: 0001_baseline
+Revises:
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0001_baseline"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "oauth_users",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("provider", sa.String()),
+        sa.Column("provider_id", sa.String()),
+        sa.Column("email", sa.String()),
+        sa.Column("name", sa.String()),
+        sa.Column("phone", sa.String(), nullable=True),
+        sa.Column("profile_picture", sa.String(), nullable=True),
+        sa.Column("access_token", sa.String()),
+        sa.Column("refresh_token", sa.String(), nullable=True),
+    )
+    op.create_index("ix_oauth_users_id", "oauth_users", ["id"])
+    op.create_index("ix_oauth_users_provider", "oauth_users", ["provider"])
+    op.create_index("ix_oauth_users_provider_id", "oauth_users", ["provider_id"], unique=True)
+    op.create_index("ix_oauth_users_email", "oauth_users", ["email"], unique=True)
+
+    op.create_table(
+        "spots",
+        sa.Column("spot_id", sa.Integer(), primary_key=True),
+        sa.Column("owner_id", sa.String(), sa.ForeignKey("oauth_users.provider_id")),
+        sa.Column("spot_title", sa.String()),
+        sa.Column("address", sa.String()),
+        sa.Column("latitude", sa.Float()),
+        sa.Column("longitude", sa.Float()),
+        sa.Column("hourly_rate", sa.Integer()),
+        sa.Column("no_of_slots", sa.Integer()),
+        sa.Column("available_slots", sa.Integer()),
+        sa.Column("open_time", sa.String(), nullable=False),
+        sa.Column("close_time", sa.String(), nullable=False),
+        sa.Column("description", sa.String(), nullable=True),
+        sa.Column("available_days", sa.ARRAY(sa.String()), nullable=False),
+        sa.Column("image", sa.ARRAY(sa.LargeBinary()), nullable=True),
+        sa.Column("verification_status", sa.Integer()),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    for column in ("spot_id", "owner_id", "spot_title", "address", "latitude", "longitude",
+                   "hourly_rate", "no_of_slots", "available_slots"):
+        op.create_index(f"ix_spots_{column}", "spots", [column])
+
+    op.create_table(
+        "documents",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("spot_id", sa.Integer(), sa.ForeignKey("spots.spot_id")),
+        sa.Column("document_type", sa.String(), nullable=False),
+        sa.Column("content", sa.LargeBinary(), nullable=False),
+        sa.Column("filename", sa.String(), nullable=False),
+        sa.Column("uploaded_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index("ix_documents_id", "documents", ["id"])
+    op.create_index("ix_documents_spot_id", "documents", ["spot_id"])
+
+    op.create_table(
+        "payments",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.String(), nullable=False),
+        sa.Column("spot_id", sa.Integer(), nullable=False),
+        sa.Column("amount", sa.Integer(), nullable=False),
+        sa.Column("razorpay_order_id", sa.String(), nullable=False, unique=True),
+        sa.Column("razorpay_payment_id", sa.String(), nullable=True, unique=True),
+        sa.Column("razorpay_signature", sa.String(), nullable=True),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), server_default=sa.func.now()),
+    )
+    op.create_index("ix_payments_id", "payments", ["id"])
+
+    op.create_table(
+        "bookings",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.String(), nullable=False),
+        sa.Column("spot_id", sa.Integer(), nullable=False),
+        sa.Column("total_slots", sa.Integer(), nullable=False),
+        sa.Column("start_date_time", sa.String(), nullable=False),
+        sa.Column("end_date_time", sa.String(), nullable=False),
+        sa.Column("payment_id", sa.Integer(), sa.ForeignKey("payments.id"), nullable=False),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), server_default=sa.func.now()),
+    )
+    op.create_index("ix_bookings_id", "bookings", ["id"])
+
+    op.create_table(
+        "reviews",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.String(), sa.ForeignKey("oauth_users.provider_id"), nullable=False),
+        sa.Column("spot_id", sa.Integer(), sa.ForeignKey("spots.spot_id"), nullable=False),
+        sa.Column("rating_score", sa.Integer(), nullable=False),
+        sa.Column("review_description", sa.String(), nullable=True),
+        sa.Column("images", sa.ARRAY(sa.LargeBinary()), nullable=True),
+        sa.Column("owner_reply", sa.String(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), server_default=sa.func.now()),
+    )
+    op.create_index("ix_reviews_id", "reviews", ["id"])
+
+
+def downgrade():
+    op.drop_table("reviews")
+    op.drop_table("bookings")
+    op.drop_table("payments")
+    op.drop_table("documents")
+    op.drop_table("spots")
+    op.drop_table("oauth_users")
@@ -0,0 +1,64 @@
+"""Typed timestamp columns and range indexes for booking times
+
+Existing string values are backfilled in place. Values carrying an offset
+(e.g. "2025-04-23T10:00:00Z") keep it, values without one are read in the
+platform timezone (Settings.DEFAULT_TIMEZONE), matching how the API now
+interprets naive booking times.
+
+Revision ID: 0002_booking_timestamps
+Revises: 0001_baseline
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from app.core.config import settings
+
+
+revision = "0002_booking_timestamps"
+down_revision = "0001_baseline"
+branch_labels = None
+depends_on = None
+
+
+def _to_timestamptz(column: str) -> str:
+    return (
+        f"CASE WHEN {column} ~ '(Z|[+-][0-9]{{2}}(:?[0-9]{{2}})?)$' "
+        f"THEN {column}::timestamptz "
+        f"ELSE {column}::timestamp AT TIME ZONE '{settings.DEFAULT_TIMEZONE}' END"
+    )
+
+
+def upgrade():
+    for column in ("start_date_time", "end_date_time"):
+        op.alter_column(
+            "bookings", column,
+            type_=sa.DateTime(timezone=True),
+            existing_type=sa.String(),
+            existing_nullable=False,
+            postgresql_using=_to_timestamptz(column),
+        )
+
+    op.create_index("ix_bookings_spot_id_start_end", "bookings",
+                    ["spot_id", "start_date_time", "end_date_time"])
+    op.create_index("ix_bookings_user_id_start", "bookings", ["user_id", "start_date_time"])
+    op.create_index("ix_bookings_booked_end", "bookings", ["end_date_time", "id"],
+                    postgresql_where=sa.text("status = 'Booked'"))
+
+
+def downgrade():
+    op.drop_index("ix_bookings_booked_end", table_name="bookings")
+    op.drop_index("ix_bookings_user_id_start", table_name="bookings")
+    op.drop_index("ix_bookings_spot_id_start_end", table_name="bookings")
+
+    for column in ("start_date_time", "end_date_time"):
+        op.alter_column(
+            "bookings", column,
+            type_=sa.String(),
+            existing_type=sa.DateTime(timezone=True),
+            existing_nullable=False,
+            postgresql_using=(
+                f"to_char({column} AT TIME ZONE '{settings.DEFAULT_TIMEZONE}', "
+                "'YYYY-MM-DD\"T\"HH24:MI:SS')"
+            ),
+        )
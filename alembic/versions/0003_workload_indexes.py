@@ -0,0 +1,63 @@
+"""Workload-driven index set for bookings, payments and spots
+
+Derived from `python -m app.db.index_advisor`:
+- bookings.payment_id is used for joins and lookups but had no index.
+  payments.user_id is not indexed: no query reads payments by user, and the
+  advisor reports an index on it as unused.
+- The spots table indexed nearly every column. None of those indexes were used
+  by the workload, and indexing available_slots made every slot update a
+  non-HOT update.
+- The extra single-column indexes on primary keys duplicated the primary
+  key index.
+
+Indexes are built and dropped CONCURRENTLY so the tables stay writable.
+
+Revision ID: 0003_workload_indexes
+Revises: 0002_booking_timestamps
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+
+
+revision = "0003_workload_indexes"
+down_revision = "0002_booking_timestamps"
+branch_labels = None
+depends_on = None
+
+REDUNDANT_INDEXES = [
+    ("bookings", "id"),
+    ("payments", "id"),
+    ("spots", "spot_id"),
+    ("spots", "spot_title"),
+    ("spots", "address"),
+    ("spots", "latitude"),
+    ("spots", "longitude"),
+    ("spots", "hourly_rate"),
+    ("spots", "no_of_slots"),
+    ("spots", "available_slots"),
+]
+
+NEW_INDEXES = [
+    ("bookings", "payment_id"),
+]
+
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        for table, column in NEW_INDEXES:
+            op.create_index(f"ix_{table}_{column}", table, [column],
+                            postgresql_concurrently=True, if_not_exists=True)
+        for table, column in REDUNDANT_INDEXES:
+            op.drop_index(f"ix_{table}_{column}", table_name=table,
+                          postgresql_concurrently=True, if_exists=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for table, column in REDUNDANT_INDEXES:
+            op.create_index(f"ix_{table}_{column}", table, [column],
+                            postgresql_concurrently=True, if_not_exists=True)
+        for table, column in NEW_INDEXES:
+            op.drop_index(f"ix_{table}_{column}", table_name=table,
+                          postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,41 @@
+"""Waitlist for sold out spots
+
+Revision ID: 0005_waitlist
+Revises: 0004_idempotency_keys
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0005_waitlist"
+down_revision = "0004_idempotency_keys"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "waitlist_entries",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("spot_id", sa.Integer(), sa.ForeignKey("spots.spot_id"), nullable=False),
+        sa.Column("user_id", sa.String(), nullable=False),
+        sa.Column("total_slots", sa.Integer(), nullable=False),
+        sa.Column("start_date_time", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("end_date_time", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("offered_until", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index("ix_waitlist_entries_user_id", "waitlist_entries", ["user_id"])
+    op.create_index("ix_waitlist_entries_spot_waiting", "waitlist_entries", ["spot_id", "id"],
+                    postgresql_where=sa.text("status = 'waiting'"))
+    op.create_index("ix_waitlist_entries_offered_until", "waitlist_entries", ["offered_until"],
+                    postgresql_where=sa.text("status = 'offered'"))
+    op.create_index("ix_waitlist_entries_waiting_end", "waitlist_entries", ["end_date_time"],
+                    postgresql_where=sa.text("status = 'waiting'"))
+
+
+def downgrade():
+    op.drop_table("waitlist_entries")
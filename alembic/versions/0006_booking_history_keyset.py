@@ -0,0 +1,33 @@
+"""Cover the (start_date_time, id) keyset of a user's booking history
+
+The user history index gains the id column, so a page is a single index range
+scan ending at LIMIT instead of a sort of all the user's bookings.
+
+Revision ID: 0006_booking_history_keyset
+Revises: 0005_waitlist
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+
+
+revision = "0006_booking_history_keyset"
+down_revision = "0005_waitlist"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        op.create_index("ix_bookings_user_id_start_id", "bookings", ["user_id", "start_date_time", "id"],
+                        postgresql_concurrently=True, if_not_exists=True)
+        op.drop_index("ix_bookings_user_id_start", table_name="bookings",
+                      postgresql_concurrently=True, if_exists=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.create_index("ix_bookings_user_id_start", "bookings", ["user_id", "start_date_time"],
+                        postgresql_concurrently=True, if_not_exists=True)
+        op.drop_index("ix_bookings_user_id_start_id", table_name="bookings",
+                      postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,55 @@
+"""Hourly per spot rollups for owner analytics
+
+Backfills the rollups from existing bookings and payments, bucketed by hour in
+the platform timezone (Settings.DEFAULT_TIMEZONE).
+
+Revision ID: 0007_spot_hourly_rollups
+Revises: 0006_booking_history_keyset
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from app.core.config import settings
+
+
+revision = "0007_spot_hourly_rollups"
+down_revision = "0006_booking_history_keyset"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "spot_hourly_rollups",
+        sa.Column("spot_id", sa.Integer(), sa.ForeignKey("spots.spot_id"), primary_key=True),
+        sa.Column("bucket_start", sa.DateTime(timezone=True), primary_key=True),
+        sa.Column("bookings", sa.Integer(), nullable=False),
+        sa.Column("cancellations", sa.Integer(), nullable=False),
+        sa.Column("occupied_slot_hours", sa.Float(), nullable=False),
+        sa.Column("revenue", sa.Integer(), nullable=False),
+    )
+    op.execute(sa.text("""
+        INSERT INTO spot_hourly_rollups
+            (spot_id, bucket_start, bookings, cancellations, occupied_slot_hours, revenue)
+        SELECT b.spot_id, bucket,
+               COUNT(*) FILTER (WHERE bucket = f.first_bucket),
+               COUNT(*) FILTER (WHERE bucket = f.first_bucket AND b.status = 'Cancelled'),
+               COALESCE(SUM(b.total_slots * GREATEST(EXTRACT(EPOCH FROM
+                   LEAST(bucket + interval '1 hour', b.end_date_time) - GREATEST(bucket, b.start_date_time)), 0) / 3600)
+                   FILTER (WHERE b.status <> 'Cancelled'), 0),
+               COALESCE(SUM(p.amount) FILTER (WHERE bucket = f.first_bucket), 0)
+        FROM bookings b
+        JOIN payments p ON p.id = b.payment_id
+        JOIN spots s ON s.spot_id = b.spot_id
+        CROSS JOIN LATERAL (SELECT date_trunc('hour', b.start_date_time, :tz) AS first_bucket) AS f
+        CROSS JOIN LATERAL generate_series(
+            f.first_bucket,
+            GREATEST(b.end_date_time - interval '1 microsecond', f.first_bucket),
+            interval '1 hour') AS bucket
+        GROUP BY b.spot_id, bucket
+    """).bindparams(tz=settings.DEFAULT_TIMEZONE))
+
+
+def downgrade():
+    op.drop_table("spot_hourly_rollups")
@@ -0,0 +1,43 @@
+"""Precomputed earnings of spots and owners
+
+Adds total_earnings counters to spots and oauth_users and fills them from
+existing bookings and payments.
+
+Revision ID: 0008_earnings_counters
+Revises: 0007_spot_hourly_rollups
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0008_earnings_counters"
+down_revision = "0007_spot_hourly_rollups"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("spots", sa.Column("total_earnings", sa.Integer(), nullable=False, server_default=sa.text("0")))
+    op.add_column("oauth_users", sa.Column("total_earnings", sa.Integer(), nullable=False, server_default=sa.text("0")))
+    op.execute("""
+        UPDATE spots SET total_earnings = t.total
+        FROM (
+            SELECT b.spot_id, SUM(p.amount) AS total
+            FROM bookings b
+            JOIN payments p ON p.id = b.payment_id
+            GROUP BY b.spot_id
+        ) AS t
+        WHERE spots.spot_id = t.spot_id
+    """)
+    op.execute("""
+        UPDATE oauth_users SET total_earnings = t.total
+        FROM (SELECT owner_id, SUM(total_earnings) AS total FROM spots GROUP BY owner_id) AS t
+        WHERE oauth_users.provider_id = t.owner_id
+    """)
+
+
+def downgrade():
+    op.drop_column("oauth_users", "total_earnings")
+    op.drop_column("spots", "total_earnings")
@@ -0,0 +1,42 @@
+"""Razorpay webhook events and the booking window of payments
+
+Revision ID: 0009_payment_webhooks
+Revises: 0008_earnings_counters
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0009_payment_webhooks"
+down_revision = "0008_earnings_counters"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("payments", sa.Column("total_slots", sa.Integer(), nullable=True))
+    op.add_column("payments", sa.Column("start_date_time", sa.DateTime(timezone=True), nullable=True))
+    op.add_column("payments", sa.Column("end_date_time", sa.DateTime(timezone=True), nullable=True))
+
+    op.create_table(
+        "payment_webhook_events",
+        sa.Column("id", sa.String(), primary_key=True),
+        sa.Column("event", sa.String(), nullable=False),
+        sa.Column("payload", sa.JSON(), nullable=False),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("error", sa.String(), nullable=True),
+        sa.Column("received_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("processed_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index("ix_payment_webhook_events_pending", "payment_webhook_events", ["received_at"],
+                    postgresql_where=sa.text("status = 'pending'"))
+
+
+def downgrade():
+    op.drop_table("payment_webhook_events")
+    op.drop_column("payments", "end_date_time")
+    op.drop_column("payments", "start_date_time")
+    op.drop_column("payments", "total_slots")
@@ -0,0 +1,30 @@
+"""Partial index over payments awaiting reconciliation
+
+Built CONCURRENTLY so payments stay writable.
+
+Revision ID: 0010_payments_unsettled_index
+Revises: 0009_payment_webhooks
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0010_payments_unsettled_index"
+down_revision = "0009_payment_webhooks"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        op.create_index("ix_payments_unsettled", "payments", ["id"],
+                        postgresql_where=sa.text("status IN ('pending', 'failed')"),
+                        postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_payments_unsettled", table_name="payments",
+                      postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,31 @@
+"""Admin verification queue
+
+Adds the claim and lease of a pending spot and a partial index over the
+spots pending verification.
+
+Revision ID: 0011_verification_queue
+Revises: 0010_payments_unsettled_index
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0011_verification_queue"
+down_revision = "0010_payments_unsettled_index"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("spots", sa.Column("verification_claimed_by", sa.String(), nullable=True))
+    op.add_column("spots", sa.Column("verification_lease_until", sa.DateTime(timezone=True), nullable=True))
+    op.create_index("ix_spots_verification_pending", "spots", ["spot_id"],
+                    postgresql_where=sa.text("verification_status = 0"))
+
+
+def downgrade():
+    op.drop_index("ix_spots_verification_pending", table_name="spots")
+    op.drop_column("spots", "verification_lease_until")
+    op.drop_column("spots", "verification_claimed_by")
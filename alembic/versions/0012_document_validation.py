@@ -0,0 +1,33 @@
+"""Validation status of uploaded documents
+
+Existing documents start as pending so the validation worker checks them too.
+
+Revision ID: 0012_document_validation
+Revises: 0011_verification_queue
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0012_document_validation"
+down_revision = "0011_verification_queue"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("documents", sa.Column("status", sa.String(), nullable=False, server_default=sa.text("'pending'")))
+    op.add_column("documents", sa.Column("page_count", sa.Integer(), nullable=True))
+    op.add_column("documents", sa.Column("validation_error", sa.String(), nullable=True))
+    op.add_column("documents", sa.Column("validated_at", sa.DateTime(timezone=True), nullable=True))
+    op.create_index("ix_documents_pending", "documents", ["id"], postgresql_where=sa.text("status = 'pending'"))
+
+
+def downgrade():
+    op.drop_index("ix_documents_pending", table_name="documents")
+    op.drop_column("documents", "validated_at")
+    op.drop_column("documents", "validation_error")
+    op.drop_column("documents", "page_count")
+    op.drop_column("documents", "status")
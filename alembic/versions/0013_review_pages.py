@@ -0,0 +1,48 @@
+"""Keyset indexes over reviews and per spot rating summaries
+
+Backfills the summaries from existing reviews.
+
+Revision ID: 0013_review_pages
+Revises: 0012_document_validation
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0013_review_pages"
+down_revision = "0012_document_validation"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index("ix_reviews_spot_created", "reviews", ["spot_id", "created_at", "id"])
+    op.create_index("ix_reviews_spot_rating", "reviews", ["spot_id", "rating_score", "id"])
+    op.create_table(
+        "spot_rating_summaries",
+        sa.Column("spot_id", sa.Integer(), sa.ForeignKey("spots.spot_id"), primary_key=True),
+        sa.Column("review_count", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column("rating_sum", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        *[sa.Column(f"rating_{stars}", sa.Integer(), nullable=False, server_default=sa.text("0"))
+          for stars in range(1, 6)],
+    )
+    op.execute("""
+        INSERT INTO spot_rating_summaries
+            (spot_id, review_count, rating_sum, rating_1, rating_2, rating_3, rating_4, rating_5)
+        SELECT spot_id, COUNT(*), SUM(rating_score),
+               COUNT(*) FILTER (WHERE rating_score = 1),
+               COUNT(*) FILTER (WHERE rating_score = 2),
+               COUNT(*) FILTER (WHERE rating_score = 3),
+               COUNT(*) FILTER (WHERE rating_score = 4),
+               COUNT(*) FILTER (WHERE rating_score = 5)
+        FROM reviews
+        GROUP BY spot_id
+    """)
+
+
+def downgrade():
+    op.drop_table("spot_rating_summaries")
+    op.drop_index("ix_reviews_spot_rating", table_name="reviews")
+    op.drop_index("ix_reviews_spot_created", table_name="reviews")
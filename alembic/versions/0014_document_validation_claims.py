@@ -0,0 +1,33 @@
+"""Claims of the document validation worker
+
+Documents are claimed by marking them as validating until a lease runs out,
+instead of being locked for the whole validation. The pending index also
+covers validating documents, so lapsed claims are found again.
+
+Revision ID: 0014_document_validation_claims
+Revises: 0013_review_pages
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0014_document_validation_claims"
+down_revision = "0013_review_pages"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("documents", sa.Column("validation_lease_until", sa.DateTime(timezone=True), nullable=True))
+    op.drop_index("ix_documents_pending", table_name="documents")
+    op.create_index("ix_documents_pending", "documents", ["id"],
+                    postgresql_where=sa.text("status IN ('pending', 'validating')"))
+
+
+def downgrade():
+    op.drop_index("ix_documents_pending", table_name="documents")
+    op.execute("UPDATE documents SET status = 'pending' WHERE status = 'validating'")
+    op.create_index("ix_documents_pending", "documents", ["id"], postgresql_where=sa.text("status = 'pending'"))
+    op.drop_column("documents", "validation_lease_until")
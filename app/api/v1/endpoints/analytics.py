@@ -0,0 +1,67 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from typing import Annotated, List
+from app.schemas.analytics import AnalyticsRange, OccupancyBucket, RevenueDay
+from app.services.analytics_service import get_owner_occupancy, get_owner_revenue
+from app.db.session import get_db
+from sqlalchemy.exc import SQLAlchemyError
+
+router = APIRouter()
+
+
+@router.get("/owner/{owner_id}/occupancy", response_model=List[OccupancyBucket])
+def read_owner_occupancy(owner_id: str, window: Annotated[AnalyticsRange, Query()],
+                         db: Session = Depends(get_db)):
+    """
+    Hourly bookings and occupied slot-hours of an owner's spots.
+
+    Parameters:
+        owner_id (str): The ID of the owner.
+        window (AnalyticsRange): start, end and an optional spot_id.
+        db (Session): The database session.
+
+    Returns:
+        List[OccupancyBucket]: Hours with bookings, in time order.
+
+    Raises:
+        HTTPException:
+            400: If the range is invalid (ValueError)
+            500: If an internal server error occurs or a database error occurs
+    """
+    try:
+        return get_owner_occupancy(db, owner_id, window)
+    except ValueError as invalid:
+        raise HTTPException(status_code=400, detail=str(invalid))
+    except SQLAlchemyError as db_error:
+        raise HTTPException(status_code=500, detail="DB Error: " + str(db_error))
+    except Exception as general_error:
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(general_error)}")
+
+
+@router.get("/owner/{owner_id}/revenue", response_model=List[RevenueDay])
+def read_owner_revenue(owner_id: str, window: Annotated[AnalyticsRange, Query()],
+                       db: Session = Depends(get_db)):
+    """
+    Daily bookings and revenue of an owner's spots.
+
+    Parameters:
+        owner_id (str): The ID of the owner.
+        window (AnalyticsRange): start, end and an optional spot_id.
+        db (Session): The database session.
+
+    Returns:
+        List[RevenueDay]: Days with bookings, in date order.
+
+    Raises:
+        HTTPException:
+            400: If the range is invalid (ValueError)
+            500: If an internal server error occurs or a database error occurs
+    """
+    try:
+        return get_owner_revenue(db, owner_id, window)
+    except ValueError as invalid:
+        raise HTTPException(status_code=400, detail=str(invalid))
+    except SQLAlchemyError as db_error:
+        raise HTTPException(status_code=500, detail="DB Error: " + str(db_error))
+    except Exception as general_error:
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(general_error)}")
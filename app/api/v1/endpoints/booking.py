@@ -1,23 +1,26 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from app.db.session import get_db
+from fastapi import APIRouter, Depends, HTTPException, Header, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Annotated, Optional
+from app.db.session import get_async_db, get_async_read_db
 import threading
 import asyncio
-from app.services.booking_service import create_booking, get_bookings, get_booking_by_user, update_booking, get_booking_by_spot, get_bookings_of_spots_of_owner, cancel_booking, check_in_booking, check_out_booking, update_available_slots, refresh_bookings
-from app.schemas.booking import BookingCreate, BookingUpdate
+from app.services.booking_service import SlotUnavailableException, PriceMismatchException, create_booking, get_bookings, get_booking_by_user, update_booking, get_booking_by_spot, get_bookings_of_spots_of_owner, cancel_booking, check_in_booking, check_out_booking, update_available_slots, refresh_bookings, export_bookings
+from app.schemas.booking import BookingCreate, BookingUpdate, BookingHistoryQuery, BookingExportQuery
 from app.schemas.payment import Payment
+from app.services.idempotency_service import run_idempotent, IdempotencyConflictException
 from concurrent.futures import ThreadPoolExecutor
-from app.db.session import SessionLocal
+from app.db.session import AsyncSessionLocal, AsyncReadSessionLocal
+from fastapi.responses import StreamingResponse
 router = APIRouter()
 
 
 @router.get("/")
-async def get_booking(db: Session = Depends(get_db)):
+async def get_booking(db: AsyncSession = Depends(get_async_read_db)):
     """
     Retrieve all bookings
 
     Parameters:
-        db (Session, optional): SQLAlchemy database session. Defaults to Depends(get_db).
+        db (AsyncSession, optional): SQLAlchemy database session. Defaults to Depends(get_async_read_db).
 
     Returns:
         List[dict]: List of all bookings
@@ -25,80 +28,146 @@ async def get_booking(db: Session = Depends(get_db)):
     return await get_bookings(db)
 
 
+@router.get("/export")
+async def export_all_bookings(export: Annotated[BookingExportQuery, Query()]):
+    """
+    Download all bookings as NDJSON or CSV, streamed row batch by row batch.
+    The read session is opened by the stream itself, so it lives exactly as long as
+    the response body rather than the endpoint call.
+
+    Parameters:
+        export (BookingExportQuery): Output format and optional start time range
+
+    Returns:
+        StreamingResponse: The export as an attachment
+    """
+    async def stream():
+        async with AsyncReadSessionLocal() as db:
+            async for chunk in export_bookings(db, export):
+                yield chunk
+
+    media_type = "text/csv" if export.format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        stream(),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="bookings.{export.format}"'}
+    )
+
+
 @router.get("/user/{user_id}")
-async def get_booking_by_user_id(user_id: int, db: Session = Depends(get_db)):
+async def get_booking_by_user_id(user_id: int, page: Annotated[BookingHistoryQuery, Query()],
+                                 db: AsyncSession = Depends(get_async_read_db)):
     """
-    Retrieve all bookings for a specific user.
+    Retrieve the bookings for a specific user, newest first, one page at a time.
 
     Parameters:
         user_id (int): User ID
-        db (Session, optional): SQLAlchemy database session. Defaults to Depends(get_db).
+        page (BookingHistoryQuery): Cursor from the previous page, page size, status and start time filters
+        db (AsyncSession, optional): SQLAlchemy database session. Defaults to Depends(get_async_read_db).
 
     Returns:
-        List[Booking]: List of bookings for the specified user
+        dict: "items" of the page and "next_cursor", None on the last page
     """
-    return await get_booking_by_user(db, user_id)
+    try:
+        return await get_booking_by_user(db, user_id, page)
+    except ValueError as invalid:
+        raise HTTPException(status_code=400, detail=str(invalid))
 
 
 @router.get("/owner/{user_id}")
-async def get_booking_of_spots_of_owner(user_id: int, db: Session = Depends(get_db)):
+async def get_booking_of_spots_of_owner(user_id: int, page: Annotated[BookingHistoryQuery, Query()],
+                                        db: AsyncSession = Depends(get_async_read_db)):
     """
-    Retrieve all bookings of spots owned by a specific user.
+    Retrieve the bookings of spots owned by a specific user, newest first, one page at a time.
 
     Parameters:
         user_id (int): User ID
-        db (Session, optional): SQLAlchemy database session. Defaults to Depends(get_db).
+        page (BookingHistoryQuery): Cursor from the previous page, page size, status and start time filters
+        db (AsyncSession, optional): SQLAlchemy database session. Defaults to Depends(get_async_read_db).
 
     Returns:
-        List[dict]: List of bookings for the specified user
+        dict: "items" of the page and "next_cursor", None on the last page
     """
-    return await get_bookings_of_spots_of_owner(db, user_id)
+    try:
+        return await get_bookings_of_spots_of_owner(db, user_id, page)
+    except ValueError as invalid:
+        raise HTTPException(status_code=400, detail=str(invalid))
 
 
 @router.get("/spot/{spot_id}")
-async def get_booking_by_spot_id(spot_id: int, db: Session = Depends(get_db)):
+async def get_booking_by_spot_id(spot_id: int, page: Annotated[BookingHistoryQuery, Query()],
+                                 db: AsyncSession = Depends(get_async_read_db)):
     """
-    Retrieve all bookings for a specific spot.
+    Retrieve the bookings for a specific spot, newest first, one page at a time.
 
     Parameters:
         spot_id (int): Spot ID
-        db (Session, optional): SQLAlchemy database session. Defaults to Depends(get_db).
+        page (BookingHistoryQuery): Cursor from the previous page, page size, status and start time filters
+        db (AsyncSession, optional): SQLAlchemy database session. Defaults to Depends(get_async_read_db).
 
     Returns:
-        List[dict]: List of bookings for the specified spot
+        dict: "items" of the page and "next_cursor", None on the last page
     """
-    return await get_booking_by_spot(db, spot_id)
+    try:
+        return await get_booking_by_spot(db, spot_id, page)
+    except ValueError as invalid:
+        raise HTTPException(status_code=400, detail=str(invalid))
+
+async def _create_booking_in_own_session(booking_data: BookingCreate):
+    async with AsyncSessionLocal() as db:
+        return await create_booking(db, booking_data)
+
 
 def thread_safe_booking(thread_id, booking_data: BookingCreate):
-    db = SessionLocal()
     try:
         print(f"[Thread-{thread_id}] Booking started")
-        result = asyncio.run(create_booking(db, booking_data))
+        result = asyncio.run(_create_booking_in_own_session(booking_data))
         print(f"[Thread-{thread_id}] Result: {result}")
         return result
     except Exception as e:
         print(f"[Thread-{thread_id}] Error: {e}")
-    # finally:
-    #     db.close()
 
 @router.post("/book-spot")
-async def book_spot(booking_data: BookingCreate):
-    db = SessionLocal()
+async def book_spot(booking_data: BookingCreate,
+                    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+                    db: AsyncSession = Depends(get_async_db)):
+    """
+    Hold the requested slots and create a Razorpay order for them.
+    Retries carrying the same Idempotency-Key get the original order back.
+
+    Parameters:
+        booking_data (BookingCreate): Booking data
+        idempotency_key (str, optional): Client generated key identifying this booking attempt
+        db (AsyncSession, optional): SQLAlchemy database session. Defaults to Depends(get_async_db).
+
+    Returns:
+        dict: Order details
+    """
     try:
-        response = await create_booking(db, booking_data)
+        response = await run_idempotent(
+            db, "book-spot", idempotency_key, booking_data.model_dump(),
+            lambda: create_booking(db, booking_data))
         return response
+    except IdempotencyConflictException as conflict:
+        raise HTTPException(status_code=conflict.status_code, detail=conflict.message)
+    except SlotUnavailableException as sold_out:
+        raise HTTPException(status_code=409, detail=sold_out.message)
+    except PriceMismatchException as mismatch:
+        raise HTTPException(status_code=422, detail=mismatch.message)
+    except HTTPException:
+        raise
     except Exception as e:
         print(e)
         raise HTTPException(status_code=400, detail="Failed to book the spot")
 
 @router.delete("/{booking_id}")
-async def cancel_spot_booking(booking_id: str, db: Session = Depends(get_db)):
+async def cancel_spot_booking(booking_id: str, db: AsyncSession = Depends(get_async_db)):
     """
     Cancel a specific spot booking.
 
     Parameters:
         booking_id (str): The ID of the booking to be canceled.
-        db (Session, optional): SQLAlchemy database session. Defaults to Depends(get_db).
+        db (AsyncSession, optional): SQLAlchemy database session. Defaults to Depends(get_async_db).
 
     Returns:
         dict: Response data otherwise raise appropriate HTTPException and return the error message
@@ -106,27 +175,49 @@ async def cancel_spot_booking(booking_id: str, db: Session = Depends(get_db)):
     try:
         response = await cancel_booking(db, booking_id)
         return response
+    except HTTPException:
+        raise
     except Exception as exception:
         print(exception)
         raise HTTPException(
             status_code=500, detail="Failed to cancel the booking")
 
 @router.post("/update-payment-status")
-async def update_payment_status(booking_data: Payment, db: Session = Depends(get_db)):
+async def update_payment_status(booking_data: Payment,
+                                idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+                                db: AsyncSession = Depends(get_async_db)):
+    """
+    Confirm a payment and create the booking for it.
+    Retries carrying the same Idempotency-Key get the original result back.
+
+    Parameters:
+        booking_data (Payment): Payment confirmation sent by the client
+        idempotency_key (str, optional): Client generated key identifying this confirmation
+        db (AsyncSession, optional): SQLAlchemy database session. Defaults to Depends(get_async_db).
+
+    Returns:
+        dict: Payment status and Razorpay details
+    """
     try:
-        response = await update_booking(db, booking_data)
+        response = await run_idempotent(
+            db, "update-payment-status", idempotency_key, booking_data.model_dump(),
+            lambda: update_booking(db, booking_data))
         return response
+    except IdempotencyConflictException as conflict:
+        raise HTTPException(status_code=conflict.status_code, detail=conflict.message)
+    except HTTPException:
+        raise
     except Exception as exception:
         raise HTTPException(status_code=400, detail="Failed to update the payment status")
 
 @router.put("/checkin/{booking_id}")
-async def check_in_spot_booking(booking_id: str, db: Session = Depends(get_db)):
+async def check_in_spot_booking(booking_id: str, db: AsyncSession = Depends(get_async_db)):
     """
     Check in for a specific booking.
 
     Parameters:
         booking_id (str): The ID of the booking to check in.
-        db (Session, optional): SQLAlchemy database session. Defaults to Depends(get_db).
+        db (AsyncSession, optional): SQLAlchemy database session. Defaults to Depends(get_async_db).
 
     Returns:
         dict: Response data indicating success or failure of the check-in process.
@@ -146,13 +237,13 @@ async def check_in_spot_booking(booking_id: str, db: Session = Depends(get_db)):
 
 
 @router.put("/checkout/{booking_id}")
-async def check_out_spot_booking(booking_id: str, db: Session = Depends(get_db)):
+async def check_out_spot_booking(booking_id: str, db: AsyncSession = Depends(get_async_db)):
     """
     Check out for a specific booking.
 
     Parameters:
         booking_id (str): The ID of the booking to check out.
-        db (Session, optional): SQLAlchemy database session. Defaults to Depends(get_db).
+        db (AsyncSession, optional): SQLAlchemy database session. Defaults to Depends(get_async_db).
 
     Returns:
         dict: Response data indicating success or failure of the check-out process.
@@ -165,13 +256,15 @@ async def check_out_spot_booking(booking_id: str, db: Session = Depends(get_db))
     try:
         response = await check_out_booking(db, booking_id)
         return response
+    except HTTPException:
+        raise
     except Exception as exception:
         print(exception)
         raise HTTPException(
             status_code=500, detail="Failed to check out for the booking")
     
 @router.put("/update-booking-slots")
-async def update_booking_slots(booking_data: BookingUpdate, db: Session = Depends(get_db)):
+async def update_booking_slots(booking_data: BookingUpdate, db: AsyncSession = Depends(get_async_db)):
     try:
         response = await update_available_slots(db, booking_data)
         return response
@@ -181,7 +274,7 @@ async def update_booking_slots(booking_data: BookingUpdate, db: Session = Depend
 
     
 @router.put("/user/{user_id}")
-async def update_booking_slots(user_id: str, db: Session = Depends(get_db)):
+async def update_booking_slots(user_id: str, db: AsyncSession = Depends(get_async_db)):
     try:
         response = await refresh_bookings(user_id, db)
         return response
@@ -0,0 +1,30 @@
+from fastapi import APIRouter
+from typing import List
+from app.db.pool_monitor import pool_snapshot
+from app.db.session import replica_router
+from app.schemas.metrics import PoolStatus, ReplicaStatus
+
+router = APIRouter()
+
+
+@router.get("/db-pool", response_model=List[PoolStatus])
+def read_pool_status():
+    """
+    Connection pool statistics of this worker, one entry per engine.
+
+    Returns:
+        List[PoolStatus]: Connections checked out and in, overflow in use, the peak since
+        startup, checkout wait times, checkouts that timed out and sessions left open by requests.
+    """
+    return pool_snapshot()
+
+
+@router.get("/db-replicas", response_model=List[ReplicaStatus])
+def read_replica_status():
+    """
+    Read replicas of this worker with the lag last measured on them.
+
+    Returns:
+        List[ReplicaStatus]: Lag in seconds, whether the replica takes reads and the last connection error
+    """
+    return replica_router.status()
@@ -0,0 +1,61 @@
+import asyncio
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from app.core.config import settings
+from app.core.realtime import owner_hub
+
+router = APIRouter()
+
+
+async def _send_events(websocket: WebSocket, connection):
+    """Forward hub events, and a ping whenever the socket was idle for a heartbeat interval."""
+    while True:
+        try:
+            event = await asyncio.wait_for(connection.queue.get(), timeout=settings.WS_HEARTBEAT_SECONDS)
+        except asyncio.TimeoutError:
+            event = {"type": "ping"}
+        await websocket.send_json(event)
+
+
+async def _receive_messages(websocket: WebSocket):
+    """Answer client pings, return when the client goes away."""
+    try:
+        while True:
+            message = await websocket.receive_text()
+            if message == "ping":
+                await websocket.send_json({"type": "pong"})
+    except WebSocketDisconnect:
+        return
+
+
+@router.websocket("/owner/{owner_id}")
+async def owner_notifications(websocket: WebSocket, owner_id: str):
+    """
+    Live dashboard feed of an owner: booking.created, booking.checked_in,
+    booking.completed, booking.cancelled and review.created events as JSON messages.
+    The server sends {"type": "ping"} after WS_HEARTBEAT_SECONDS of silence and answers
+    a "ping" text message with {"type": "pong"}. A client that falls more than
+    WS_SEND_BUFFER_SIZE events behind is closed with code 1013 and should reconnect
+    and reload its data.
+
+    Parameters:
+        websocket (WebSocket): The client connection.
+        owner_id (str): The ID of the owner whose spots are followed.
+    """
+    await websocket.accept()
+    connection = owner_hub.connect(owner_id, settings.WS_SEND_BUFFER_SIZE)
+    tasks = [
+        asyncio.create_task(_send_events(websocket, connection)),
+        asyncio.create_task(_receive_messages(websocket)),
+        asyncio.create_task(connection.overflowed.wait()),
+    ]
+    try:
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        if tasks[2] in done:
+            await websocket.close(code=1013, reason="Too slow, reconnect and reload")
+    except Exception:
+        pass
+    finally:
+        owner_hub.disconnect(connection)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
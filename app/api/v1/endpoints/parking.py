@@ -1,18 +1,23 @@
 from sqlalchemy import text
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session  # interact with database
-from app.db.session import get_db
-from app.services.parking_service import get_all_parking_spots, get_parking_spot_by_id
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession  # interact with database
+from app.core.config import settings
+from app.core.realtime import availability_hub
+from app.db.session import get_async_read_db
+from app.services.parking_service import get_all_parking_spots, get_parking_spot_by_id, get_availability
 from app.schemas.parking import ParkingSpot
-from typing import List
+from typing import List, Optional
+import asyncio
 import base64
+import json
 
 router = APIRouter()
 
 @router.get("/get-spot/{spot_id}", response_model=ParkingSpot)
-async def fetch_parking_spot(spot_id: int, db: Session = Depends(get_db)):
+async def fetch_parking_spot(spot_id: int, db: AsyncSession = Depends(get_async_read_db)):
     try:
-        spot = get_parking_spot_by_id(db, spot_id)
+        spot = await get_parking_spot_by_id(db, spot_id)
         if not spot:
             raise HTTPException(status_code=404, detail="Spot not found")
 
@@ -46,9 +51,9 @@ async def fetch_parking_spot(spot_id: int, db: Session = Depends(get_db)):
         )
 
 @router.get("/getparkingspot", response_model=List[ParkingSpot])
-async def fetch_parking_spots(db: Session = Depends(get_db)):
+async def fetch_parking_spots(db: AsyncSession = Depends(get_async_read_db)):
     try:
-        spots = get_all_parking_spots(db)
+        spots = await get_all_parking_spots(db)
         out: List[dict] = []
 
         for spot in spots:
@@ -86,15 +91,15 @@ async def fetch_parking_spots(db: Session = Depends(get_db)):
 
 
 @router.get("/get-images/{spot_id}")
-def get_images(spot_id: int, db: Session = Depends(get_db)):
+async def get_images(spot_id: int, db: AsyncSession = Depends(get_async_read_db)):
     """
     Fetch ALL image blobs for a given spot_id,
     encode each as base64, and return as JSON array.
     """
-    row = db.execute(
+    row = (await db.execute(
         text("SELECT image FROM spots WHERE spot_id = :spot_id"),
         {"spot_id": spot_id}
-    ).fetchone()
+    )).fetchone()
 
 
     # row[0] is either bytes (single) or list[bytes]
@@ -103,3 +108,73 @@ def get_images(spot_id: int, db: Session = Depends(get_db)):
     images_b64 = [base64.b64encode(blob).decode("utf-8") for blob in blobs]
 
     return {"images": images_b64}
+
+
+def _sse(update: dict) -> str:
+    return f"event: availability\ndata: {json.dumps(update)}\n\n"
+
+
+async def _availability_events(request: Request, subscription, snapshot: List[dict]):
+    try:
+        for update in snapshot:
+            yield _sse(update)
+        while not await request.is_disconnected():
+            try:
+                await asyncio.wait_for(subscription.wakeup.wait(), timeout=settings.SSE_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            # Let a burst of changes settle so each spot is sent once
+            await asyncio.sleep(settings.SSE_COALESCE_SECONDS)
+            for update in subscription.drain():
+                yield _sse(update)
+    finally:
+        availability_hub.unsubscribe(subscription)
+
+
+@router.get("/availability/stream")
+async def stream_availability(request: Request,
+                              spot_ids: Optional[List[int]] = Query(None),
+                              bbox: Optional[str] = None,
+                              db: AsyncSession = Depends(get_async_read_db)):
+    """
+    Server-Sent Events feed of slot availability, replacing polling of /get-spot.
+    The current availability is sent first, then an "availability" event whenever
+    a booking, cancellation, check-out, waitlist offer or the sweeper changes it.
+
+    Parameters:
+        spot_ids (List[int], optional): Spots to watch, as repeated spot_ids parameters
+        bbox (str, optional): "min_lon,min_lat,max_lon,max_lat", watch every spot inside it
+        db (AsyncSession): The database session.
+
+    Returns:
+        StreamingResponse: text/event-stream of {spot_id, available_slots, no_of_slots, latitude, longitude}
+    """
+    if not spot_ids and not bbox:
+        raise HTTPException(status_code=400, detail="Provide spot_ids or bbox")
+    if spot_ids and len(spot_ids) > settings.SSE_MAX_SPOT_IDS:
+        raise HTTPException(status_code=400, detail=f"At most {settings.SSE_MAX_SPOT_IDS} spot_ids per stream")
+    box = None
+    if not spot_ids:
+        try:
+            box = tuple(float(value) for value in bbox.split(","))
+        except ValueError:
+            box = ()
+        if len(box) != 4 or box[0] > box[2] or box[1] > box[3]:
+            raise HTTPException(status_code=400, detail="bbox must be min_lon,min_lat,max_lon,max_lat")
+
+    # Subscribe before reading the snapshot so no change falls in between
+    subscription = availability_hub.subscribe(spot_ids, box)
+    try:
+        snapshot = await db.run_sync(get_availability, spot_ids, box)
+    except Exception:
+        availability_hub.unsubscribe(subscription)
+        raise
+    finally:
+        await db.close()
+
+    return StreamingResponse(
+        _availability_events(request, subscription, snapshot),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
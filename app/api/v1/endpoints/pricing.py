@@ -0,0 +1,61 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from typing import List
+from app.schemas.pricing import QuoteRequest, BatchQuoteRequest, Quote
+from app.services.pricing_service import quote_batch
+from app.db.session import get_db
+from sqlalchemy.exc import SQLAlchemyError
+
+router = APIRouter()
+
+
+@router.post("/quote", response_model=Quote)
+def quote_booking(item: QuoteRequest, db: Session = Depends(get_db)):
+    """
+    Price a single booking window. Booking creation expects exactly this amount.
+
+    Parameters:
+        item (QuoteRequest): Spot, booking window and number of slots.
+        db (Session): The database session.
+
+    Returns:
+        Quote: Billed hours and amount.
+
+    Raises:
+        HTTPException:
+            400: If the window cannot be priced
+            500: If an internal server error occurs or a database error occurs
+    """
+    try:
+        quote = quote_batch(db, [item])[0]
+    except SQLAlchemyError as db_error:
+        raise HTTPException(status_code=500, detail="DB Error: " + str(db_error))
+    except Exception as general_error:
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(general_error)}")
+    if quote.error:
+        raise HTTPException(status_code=400, detail=quote.error)
+    return quote
+
+
+@router.post("/quotes", response_model=List[Quote])
+def quote_bookings(batch: BatchQuoteRequest, db: Session = Depends(get_db)):
+    """
+    Price many booking windows at once, e.g. every spot of a search result.
+
+    Parameters:
+        batch (BatchQuoteRequest): Up to PRICING_MAX_BATCH_SIZE windows.
+        db (Session): The database session.
+
+    Returns:
+        List[Quote]: Quotes in request order, items that cannot be priced carry an error.
+
+    Raises:
+        HTTPException:
+            500: If an internal server error occurs or a database error occurs
+    """
+    try:
+        return quote_batch(db, batch.items)
+    except SQLAlchemyError as db_error:
+        raise HTTPException(status_code=500, detail="DB Error: " + str(db_error))
+    except Exception as general_error:
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(general_error)}")
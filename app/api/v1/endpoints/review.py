@@ -1,22 +1,50 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
-from app.schemas.review import Review, ReviewCreate, ReviewUpdate
-from app.services.review_service import get_review, get_reviews_by_spot, create_review, update_review, delete_review
-from app.db.session import get_db
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Annotated, List
+from app.core.config import settings
+from app.schemas.review import Review, ReviewCreate, ReviewUpdate, ReviewPageQuery, RatingSummary
+from app.services.review_service import (
+    get_review, get_reviews_by_spot, get_rating_summaries, create_review, update_review, delete_review
+)
+from app.db.session import get_async_db, get_async_read_db
 from sqlalchemy.exc import IntegrityError, DataError, SQLAlchemyError
 
 router = APIRouter()
 
 
+@router.get("/summaries", response_model=List[RatingSummary])
+async def read_rating_summaries(
+        spot_ids: Annotated[List[int], Query(min_length=1, max_length=settings.RATING_SUMMARY_MAX_BATCH_SIZE)],
+        db: AsyncSession = Depends(get_async_read_db)):
+    """
+    Retrieve the rating summaries of many spots at once, e.g. ?spot_ids=1&spot_ids=2.
+
+    Parameters:
+        spot_ids (List[int]): The IDs of the spots.
+        db (AsyncSession): The database session.
+
+    Returns:
+        List[RatingSummary]: Review count, average rating and star histogram per spot.
+    Raises:
+        HTTPException:
+            500: If an internal server error occurs or a database error occurs
+    """
+    try:
+        return await get_rating_summaries(db, spot_ids)
+    except SQLAlchemyError as db_error:
+        raise HTTPException(status_code=500, detail="DB Error: " + str(db_error))
+    except Exception as general_error:
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(general_error)}")
+
+
 @router.get("/{review_id}", response_model=Review)
-def read_review(review_id: int, db: Session = Depends(get_db)):
+async def read_review(review_id: int, db: AsyncSession = Depends(get_async_read_db)):
     """
     Retrieve a review by its ID.
 
     Parameters:
         review_id (int): The ID of the review to retrieve.
-        db (Session): The database session.
+        db (AsyncSession): The database session.
 
     Returns:
         Review: The retrieved review.
@@ -27,7 +55,7 @@ def read_review(review_id: int, db: Session = Depends(get_db)):
             500: If an internal server error occurs or a database error occurs
     """
     try:
-        db_review = get_review(db, review_id)
+        db_review = await get_review(db, review_id)
         return db_review
     except KeyError:
         raise HTTPException(status_code=404, detail="Review not found")
@@ -39,22 +67,38 @@ def read_review(review_id: int, db: Session = Depends(get_db)):
 
 
 @router.get("/spot/{spot_id}", response_model=List[Review])
-def read_reviews_by_spot(spot_id: int, db: Session = Depends(get_db)):
+async def read_reviews_by_spot(spot_id: int, page: Annotated[ReviewPageQuery, Query()], response: Response,
+                               db: AsyncSession = Depends(get_async_read_db)):
     """
-    Retrieve all reviews for a specific spot.
+    Retrieve one page of the reviews of a spot, newest first or by rating.
+    The spot's rating summary is returned in the X-Review-Count, X-Rating-Average and
+    X-Rating-Histogram (review counts for 1 to 5 stars) headers, and the cursor of the
+    next page, if any, in X-Next-Cursor.
 
     Parameters:
         spot_id (int): The ID of the spot to retrieve reviews for.
-        db (Session): The database session.
+        page (ReviewPageQuery): Cursor, page size, sort order and whether to include images.
+        db (AsyncSession): The database session.
 
     Returns:
-        List[Review]: A list of reviews for the specified spot.
+        List[Review]: The reviews of the page.
     Raises:
         HTTPException:
+            400: If the cursor is malformed (ValueError)
             500: If an internal server error occurs    
     """
     try:
-        return get_reviews_by_spot(db, spot_id)
+        result = await get_reviews_by_spot(db, spot_id, page)
+        summary = result["summary"]
+        response.headers["X-Review-Count"] = str(summary["review_count"])
+        if summary["average_rating"] is not None:
+            response.headers["X-Rating-Average"] = str(summary["average_rating"])
+        response.headers["X-Rating-Histogram"] = ",".join(str(count) for count in summary["histogram"].values())
+        if result["next_cursor"]:
+            response.headers["X-Next-Cursor"] = result["next_cursor"]
+        return result["items"]
+    except ValueError as value_error:
+        raise HTTPException(status_code=400, detail=str(value_error))
     except SQLAlchemyError as db_error:
         raise HTTPException(status_code=500, detail="DB Error: " + str(db_error))
     except Exception as general_error:
@@ -62,13 +106,13 @@ def read_reviews_by_spot(spot_id: int, db: Session = Depends(get_db)):
 
 
 @router.post("/", response_model=Review)
-def create_new_review(review: ReviewCreate, db: Session = Depends(get_db)):
+async def create_new_review(review: ReviewCreate, db: AsyncSession = Depends(get_async_db)):
     """
     Create a new review.
 
     Parameters:
         review (ReviewCreate): The review data to create.
-        db (Session): The database session.
+        db (AsyncSession): The database session.
 
     Returns:
         Review: The created review.
@@ -78,7 +122,7 @@ def create_new_review(review: ReviewCreate, db: Session = Depends(get_db)):
             500: If an internal server error occurs, if there is an integrity error or there is a database error
     """
     try:
-        return create_review(db, review)
+        return await create_review(db, review)
     except IntegrityError as integrity_error:
         raise HTTPException(status_code=500, detail="Integrity Error: " + str(integrity_error))
     except SQLAlchemyError as db_error:
@@ -87,14 +131,14 @@ def create_new_review(review: ReviewCreate, db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail="Internal Server Error: " + str(general_error))
 
 @router.put("/{review_id}", response_model=Review)
-def update_existing_review(review_id: int, review: ReviewUpdate, db: Session = Depends(get_db)):
+async def update_existing_review(review_id: int, review: ReviewUpdate, db: AsyncSession = Depends(get_async_db)):
     """
     Update an existing review.
 
     Parameters:
         review_id (int): The ID of the review to update.
         review (ReviewUpdate): The updated review data.
-        db (Session): The database session.
+        db (AsyncSession): The database session.
 
     Returns:
         Review: The updated review.
@@ -105,7 +149,7 @@ def update_existing_review(review_id: int, review: ReviewUpdate, db: Session = D
             500: If an internal server error occurs, there is a database error, or an integrity error
     """
     try:
-        db_review = update_review(db, review_id, review)
+        db_review = await update_review(db, review_id, review)
         return db_review
     except KeyError:
         raise HTTPException(status_code=404, detail="Review not found")
@@ -117,13 +161,13 @@ def update_existing_review(review_id: int, review: ReviewUpdate, db: Session = D
         raise HTTPException(status_code=500, detail="Internal Server Error: " + str(general_error))
 
 @router.delete("/{review_id}", response_model=bool)
-def delete_existing_review(review_id: int, db: Session = Depends(get_db)):
+async def delete_existing_review(review_id: int, db: AsyncSession = Depends(get_async_db)):
     """
     Delete a review by its ID.
 
     Parameters:
         review_id (int): The ID of the review to delete.
-        db (Session): The database session.
+        db (AsyncSession): The database session.
 
     Returns:
         bool: True if the review was deleted, False otherwise.
@@ -134,7 +178,7 @@ def delete_existing_review(review_id: int, db: Session = Depends(get_db)):
             500: If an internal server error occurs, or there is a database error
     """
     try:
-        success = delete_review(db, review_id)
+        success = await delete_review(db, review_id)
         return success
     except KeyError:
         raise HTTPException(status_code=404, detail="Review not found")
@@ -1,30 +1,29 @@
 from fastapi import APIRouter, Depends, HTTPException, File, Form, UploadFile
-from sqlalchemy.orm import Session  # interact with database
-from app.db.session import get_db
+from sqlalchemy.ext.asyncio import AsyncSession  # interact with database
+from app.db.session import get_async_db, get_async_read_db
 from typing import Optional
 from fastapi.responses import JSONResponse
 from app.services.spot_service import add_document, add_spot, get_spot_list_of_owner, update_spot_details, delete_spot
+from app.services.verification_service import get_pending_spots_with_documents, document_url
 from app.schemas.spot import AddSpot, EditSpot
-from app.db.spot_model import Document, Spot
+from app.db.spot_model import Document
 from fastapi.responses import StreamingResponse
 from io import BytesIO
 
 router = APIRouter()
 
 @router.get("/documents", response_class=JSONResponse)
-async def get_all_documents(db: Session = Depends(get_db)):
-    # Join documents with their spot info
-    results = db.query(Spot).filter(Spot.verification_status == 0).all()
-
+async def get_all_documents(db: AsyncSession = Depends(get_async_db)):
+    # Pending spots joined with their document metadata, contents are fetched by id
     response = []
-    for spot in results:
-        spot_docs = db.query(Document).filter(Document.spot_id == spot.spot_id).all()
-
+    for spot, spot_docs in await get_pending_spots_with_documents(db):
         doc_dict = {}
         for doc in spot_docs:
             doc_dict[doc.document_type] = {
                 "filename": doc.filename,
-                "url": f"spots/documents/view/{doc.id}"
+                "url": document_url(doc.document_id),
+                "status": doc.status,
+                "validation_error": doc.validation_error
             }
 
         response.append({
@@ -37,9 +36,9 @@ async def get_all_documents(db: Session = Depends(get_db)):
     return response
 
 @router.get("/documents/view/{doc_id}")
-async def view_document(doc_id: int, db: Session = Depends(get_db)):
+async def view_document(doc_id: int, db: AsyncSession = Depends(get_async_db)):
     print("view document")
-    document = db.query(Document).filter(Document.id == doc_id).first()
+    document = await db.get(Document, doc_id)
     if not document:
         raise HTTPException(status_code=404, detail="Document not found")
 
@@ -52,7 +51,7 @@ async def view_document(doc_id: int, db: Session = Depends(get_db)):
 @router.post("/add-documents")
 async def add_documents_route(spot_id: int = Form(...),doc1: UploadFile = File(...),
     doc2: UploadFile = File(...),
-    doc3: Optional[UploadFile] = File(None), db: Session = Depends(get_db)):
+    doc3: Optional[UploadFile] = File(None), db: AsyncSession = Depends(get_async_db)):
     try:
         response = await add_document(spot_id, doc1, doc2, doc3, db)
         return response
@@ -77,13 +76,13 @@ async def add_spot_route(spot_address: str = Form(...),
     image: Optional[list[str]] = Form(None),
     verification_status: int = Form(...),
 
-    db: Session = Depends(get_db)):
+    db: AsyncSession = Depends(get_async_db)):
     """
     Add a parking spot for the user.
 
     Args:
         spot_data (AddSpot): Spot data
-        db (Session, optional): SQLAlchemy database session. Defaults to Depends(get_db).
+        db (AsyncSession, optional): SQLAlchemy database session. Defaults to Depends(get_async_db).
 
     Returns:
         dict: Response message otherwise raise appropriate HTTPException and return the error message
@@ -123,29 +122,29 @@ async def add_spot_route(spot_address: str = Form(...),
 
 
 @router.get("/owner/{user_id}")
-def get_spots_of_owner(user_id: int, db: Session = Depends(get_db)):
+async def get_spots_of_owner(user_id: int, db: AsyncSession = Depends(get_async_read_db)):
     """
     Retrieve all spots owned by a specific user.
 
     Args:
         user_id (int): User ID
-        db (Session, optional): SQLAlchemy database session. Defaults to Depends(get_db).
+        db (AsyncSession, optional): SQLAlchemy database session. Defaults to Depends(get_async_read_db).
 
     Returns:
         List[dict]: List of spots for the specified user
     """
-    return get_spot_list_of_owner(user_id, db)
+    return await get_spot_list_of_owner(user_id, db)
 
 
 @router.put("/{spot_id}")
-async def update_spot(spot_id: int, updated_spot: EditSpot, db: Session = Depends(get_db)):
+async def update_spot(spot_id: int, updated_spot: EditSpot, db: AsyncSession = Depends(get_async_db)):
     """
     Update the details of a parking spot.
 
     Args:
         spot_id (int): The unique identifier of the parking spot to be updated.
         updated_spot (EditSpot): An object containing the updated details of the parking spot.
-        db (Session): The database session dependency.
+        db (AsyncSession): The database session dependency.
 
     Returns:
         dict: The updated parking spot details after applying the changes.
@@ -154,13 +153,13 @@ async def update_spot(spot_id: int, updated_spot: EditSpot, db: Session = Depend
 
 
 @router.delete("/{spot_id}")
-async def delete_selected_spot(spot_id: int, db: Session = Depends(get_db)):
+async def delete_selected_spot(spot_id: int, db: AsyncSession = Depends(get_async_db)):
     """
     Deletes a parking spot with the specified ID.
 
     Args:
         spot_id (int): The ID of the parking spot to be deleted.
-        db (Session, optional): The database session dependency. Defaults to the result of `Depends(get_db)`.
+        db (AsyncSession, optional): The database session dependency. Defaults to the result of `Depends(get_async_db)`.
 
     Returns:
         None: The result of the `delete_spot` function, which handles the deletion logic.
@@ -1,9 +1,9 @@
 # app/api/v1/endpoints/user.py
 
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.services.user_service import get_profile_data, update_profile_details, get_profile_unauth
-from app.db.session import get_db
+from app.db.session import get_async_db
 from app.schemas.user import UserProfile, UserUpdate, OwnerProfile
 from app.core.oauth import oauth2_scheme
 
@@ -19,14 +19,14 @@ class AuthenticationError(Exception):
 
 
 @router.get("/profile/{user_id}", response_model=UserProfile)
-async def get_profile(user_id: str, token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+async def get_profile(user_id: str, token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)):
     """
     Fetch authenticated user profile.
 
     Parameters:
         user_id (str): The ID of the user
         token (str): The OAuth2 token
-        db (Session): The database session
+        db (AsyncSession): The database session
 
     Returns:
         UserProfile: The user's profile information
@@ -53,7 +53,7 @@ async def get_profile(user_id: str, token: str = Depends(oauth2_scheme), db: Ses
 
 
 @router.put("/profile/{user_id}", response_model=UserProfile)
-async def update_profile(user_id: str, user_update: UserUpdate, token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+async def update_profile(user_id: str, user_update: UserUpdate, token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)):
     """
     Update authenticated user profile.
 
@@ -61,7 +61,7 @@ async def update_profile(user_id: str, user_update: UserUpdate, token: str = Dep
         user_id (str): The ID of the user
         user_update (UserUpdate): The user details to update
         token (str): The OAuth2 token
-        db (Session): The database session
+        db (AsyncSession): The database session
 
     Returns:
         UserProfile: The updated user's profile information
@@ -90,13 +90,13 @@ async def update_profile(user_id: str, user_update: UserUpdate, token: str = Dep
 
 
 @router.get("/owner/{user_id}", response_model=OwnerProfile)
-async def get_profile(user_id: str, db: Session = Depends(get_db)):
+async def get_profile(user_id: str, db: AsyncSession = Depends(get_async_db)):
     """
     Fetch authenticated user profile.
 
     Parameters:
         user_id (str): The ID of the user
-        db (Session): The database session
+        db (AsyncSession): The database session
 
     Returns:
         UserProfile: The user's profile information
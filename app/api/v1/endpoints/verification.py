@@ -1,9 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
-from app.db.session import get_db
-from app.schemas.verification import SpotVerification
-from app.services.verification_service import get_pending_spot_verifications, accept_request, reject_request
+from app.db.session import get_async_db
+from app.schemas.verification import SpotVerification, VerificationClaim, VerificationDecision, VerificationDecisionResult
+from app.services.verification_service import (
+    get_pending_spot_verifications, accept_request, reject_request, claim_verifications, decide_verifications
+)
 import base64
 
 def spot_to_dict(spot):
@@ -26,13 +28,13 @@ router = APIRouter()
 
 
 @router.get("/", response_model=List[SpotVerification])
-def get_validation_requests_list(db: Session = Depends(get_db)):
+async def get_validation_requests_list(db: AsyncSession = Depends(get_async_db)):
     """
     Retrieve a list of all spots pending verification (validation_status == 0), 
     along with their associated documents sorted by document type.
 
     Parameters:
-        db (Session): The database session
+        db (AsyncSession): The database session
 
     Returns:
         List[SpotVerification]: List of spots with their documents for verification
@@ -44,7 +46,7 @@ def get_validation_requests_list(db: Session = Depends(get_db)):
             500: Any other error occurs during the process (Exceptione)
     """
     try:
-        return_list = get_pending_spot_verifications(db)
+        return_list = await get_pending_spot_verifications(db)
         if not return_list:
             raise HTTPException(
                 status_code=404, detail="No pending verification requests found.")
@@ -65,13 +67,13 @@ def get_validation_requests_list(db: Session = Depends(get_db)):
 
 
 @router.put("/request/accept/{spot_id}")
-def accept_verification_request(spot_id: int, db: Session = Depends(get_db)):
+async def accept_verification_request(spot_id: int, db: AsyncSession = Depends(get_async_db)):
     """
     Accept a spot verification request by updating the spot's validation_status to 1.
 
     Parameters:
         spot_id (int): The ID of the spot to accept
-        db (Session): The database session
+        db (AsyncSession): The database session
 
     Returns:
         Spot: The updated spot object
@@ -84,7 +86,7 @@ def accept_verification_request(spot_id: int, db: Session = Depends(get_db)):
             500: Any other error occurs during the process (Exception)
     """
     try:
-        return_spot = accept_request(db, spot_id)
+        return_spot = await accept_request(db, spot_id)
         return spot_to_dict(return_spot)
     except KeyError as spot_not_found:
         raise HTTPException(status_code=404, detail=str(spot_not_found))
@@ -100,13 +102,13 @@ def accept_verification_request(spot_id: int, db: Session = Depends(get_db)):
 
 
 @router.put("/request/reject/{spot_id}")
-def reject_verification_request(spot_id: int, db: Session = Depends(get_db)):
+async def reject_verification_request(spot_id: int, db: AsyncSession = Depends(get_async_db)):
     """
     Reject a spot verification request by updating the spot's validation_status to -1.
 
     Parameters:
         spot_id (int): The ID of the spot to reject
-        db (Session): The database session
+        db (AsyncSession): The database session
 
     Returns:
         Spot: The updated spot object
@@ -118,7 +120,7 @@ def reject_verification_request(spot_id: int, db: Session = Depends(get_db)):
             500: Any other error occurs during the process (Exception)
     """
     try:
-        return_spot = reject_request(db, spot_id)
+        return_spot = await reject_request(db, spot_id)
         return spot_to_dict(return_spot)
     except KeyError as spot_not_found:
         raise HTTPException(status_code=404, detail=str(spot_not_found))
@@ -131,3 +133,73 @@ def reject_verification_request(spot_id: int, db: Session = Depends(get_db)):
     except Exception as general_error:
         raise HTTPException(
             status_code=500, detail=f"Internal server error: {str(general_error)}")
+
+
+@router.post("/queue/claim", response_model=List[SpotVerification])
+async def claim_verification_requests(claim: VerificationClaim, db: AsyncSession = Depends(get_async_db)):
+    """
+    Claim the next pending spots for an admin. Claimed spots are leased to the admin
+    for VERIFICATION_LEASE_SECONDS and are not handed to other admins meanwhile.
+
+    Parameters:
+        claim (VerificationClaim): The admin and the number of spots to claim
+        db (AsyncSession): The database session
+
+    Returns:
+        List[SpotVerification]: The claimed spots with their documents
+
+    Raises:
+        HTTPException:
+            404: If no pending spot is free to claim (KeyError)
+            500: Any other error occurs during the process (Exception)
+    """
+    try:
+        return await claim_verifications(db, claim.admin_id, claim.limit)
+    except KeyError as no_pending_spots:
+        raise HTTPException(status_code=404, detail=str(no_pending_spots))
+    except Exception as general_error:
+        raise HTTPException(
+            status_code=500, detail=f"Internal server error: {str(general_error)}")
+
+
+async def _decide(decision: VerificationDecision, status: int, db: AsyncSession):
+    try:
+        return await decide_verifications(db, decision.admin_id, decision.spot_ids, status)
+    except ValueError as value_error:
+        raise HTTPException(
+            status_code=400, detail=f"Bad request: {str(value_error)}")
+    except Exception as general_error:
+        raise HTTPException(
+            status_code=500, detail=f"Internal server error: {str(general_error)}")
+
+
+@router.post("/queue/accept", response_model=VerificationDecisionResult)
+async def accept_verification_requests(decision: VerificationDecision, db: AsyncSession = Depends(get_async_db)):
+    """
+    Accept a batch of pending spots in one update. Spots already decided or leased
+    to another admin are returned as skipped.
+
+    Parameters:
+        decision (VerificationDecision): The admin and the spots to accept
+        db (AsyncSession): The database session
+
+    Returns:
+        VerificationDecisionResult: The accepted and the skipped spot ids
+    """
+    return await _decide(decision, 1, db)
+
+
+@router.post("/queue/reject", response_model=VerificationDecisionResult)
+async def reject_verification_requests(decision: VerificationDecision, db: AsyncSession = Depends(get_async_db)):
+    """
+    Reject a batch of pending spots in one update. Spots already decided or leased
+    to another admin are returned as skipped.
+
+    Parameters:
+        decision (VerificationDecision): The admin and the spots to reject
+        db (AsyncSession): The database session
+
+    Returns:
+        VerificationDecisionResult: The rejected and the skipped spot ids
+    """
+    return await _decide(decision, -1, db)
@@ -0,0 +1,153 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from typing import List
+from app.schemas.waitlist import WaitlistJoin, WaitlistClaim, WaitlistEntryInfo
+from app.services.waitlist_service import join_waitlist, get_waitlist_entry, get_user_waitlist, leave_waitlist
+from app.services.booking_service import claim_waitlist_offer, PriceMismatchException
+from app.db.session import get_async_db, get_db
+from sqlalchemy.exc import SQLAlchemyError
+
+router = APIRouter()
+
+
+@router.post("/", response_model=WaitlistEntryInfo)
+def join_spot_waitlist(entry: WaitlistJoin, db: Session = Depends(get_db)):
+    """
+    Join the waitlist of a sold out spot.
+
+    Parameters:
+        entry (WaitlistJoin): Spot, booking window and number of slots wanted.
+        db (Session): The database session.
+
+    Returns:
+        WaitlistEntryInfo: The entry and its position in the queue.
+
+    Raises:
+        HTTPException:
+            404: If the spot is not found (KeyError)
+            400: If the booking window or slot count is invalid (ValueError)
+            500: If an internal server error occurs or a database error occurs
+    """
+    try:
+        return join_waitlist(db, entry)
+    except KeyError as not_found:
+        raise HTTPException(status_code=404, detail=not_found.args[0])
+    except ValueError as invalid:
+        raise HTTPException(status_code=400, detail=str(invalid))
+    except SQLAlchemyError as db_error:
+        raise HTTPException(status_code=500, detail="DB Error: " + str(db_error))
+    except Exception as general_error:
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(general_error)}")
+
+
+@router.get("/user/{user_id}", response_model=List[WaitlistEntryInfo])
+def read_user_waitlist(user_id: str, db: Session = Depends(get_db)):
+    """
+    Retrieve the open waitlist entries of a user.
+
+    Parameters:
+        user_id (str): The ID of the user.
+        db (Session): The database session.
+
+    Returns:
+        List[WaitlistEntryInfo]: Waiting and offered entries of the user.
+    """
+    try:
+        return get_user_waitlist(db, user_id)
+    except SQLAlchemyError as db_error:
+        raise HTTPException(status_code=500, detail="DB Error: " + str(db_error))
+    except Exception as general_error:
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(general_error)}")
+
+
+@router.get("/{entry_id}", response_model=WaitlistEntryInfo)
+def read_waitlist_entry(entry_id: int, db: Session = Depends(get_db)):
+    """
+    Retrieve a waitlist entry with its position in the queue.
+
+    Parameters:
+        entry_id (int): The ID of the waitlist entry.
+        db (Session): The database session.
+
+    Returns:
+        WaitlistEntryInfo: The entry.
+
+    Raises:
+        HTTPException:
+            404: If the entry is not found (KeyError)
+            500: If an internal server error occurs or a database error occurs
+    """
+    try:
+        return get_waitlist_entry(db, entry_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Waitlist entry not found")
+    except SQLAlchemyError as db_error:
+        raise HTTPException(status_code=500, detail="DB Error: " + str(db_error))
+    except Exception as general_error:
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(general_error)}")
+
+
+@router.delete("/{entry_id}", response_model=WaitlistEntryInfo)
+def leave_spot_waitlist(entry_id: int, db: Session = Depends(get_db)):
+    """
+    Leave the waitlist. Slots held for an open offer are passed to the next in line.
+
+    Parameters:
+        entry_id (int): The ID of the waitlist entry.
+        db (Session): The database session.
+
+    Returns:
+        WaitlistEntryInfo: The cancelled entry.
+
+    Raises:
+        HTTPException:
+            404: If the entry is not found (KeyError)
+            400: If the entry is no longer open (ValueError)
+            500: If an internal server error occurs or a database error occurs
+    """
+    try:
+        return leave_waitlist(db, entry_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Waitlist entry not found")
+    except ValueError as invalid:
+        raise HTTPException(status_code=400, detail=str(invalid))
+    except SQLAlchemyError as db_error:
+        raise HTTPException(status_code=500, detail="DB Error: " + str(db_error))
+    except Exception as general_error:
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(general_error)}")
+
+
+@router.post("/{entry_id}/claim")
+async def claim_offer(entry_id: int, claim: WaitlistClaim, db: AsyncSession = Depends(get_async_db)):
+    """
+    Claim the slots offered to a waitlist entry and create the Razorpay order for them.
+    The payment is then confirmed through /bookings/update-payment-status like any booking.
+
+    Parameters:
+        entry_id (int): The ID of the waitlist entry.
+        claim (WaitlistClaim): Amount to charge.
+        db (AsyncSession): The database session.
+
+    Returns:
+        dict: Order details
+
+    Raises:
+        HTTPException:
+            404: If the entry is not found (KeyError)
+            409: If the entry has no open offer (ValueError)
+            422: If the amount differs from the quote
+            500: If an internal server error occurs
+    """
+    try:
+        return await claim_waitlist_offer(db, entry_id, claim.total_amount)
+    except HTTPException:
+        raise
+    except PriceMismatchException as mismatch:
+        raise HTTPException(status_code=422, detail=mismatch.message)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Waitlist entry not found")
+    except ValueError as invalid:
+        raise HTTPException(status_code=409, detail=str(invalid))
+    except Exception as general_error:
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(general_error)}")
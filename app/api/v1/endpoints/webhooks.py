@@ -0,0 +1,49 @@
+import json
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import SQLAlchemyError
+from app.db.session import get_async_db
+from app.services.payment_webhook_service import verify_webhook_signature, enqueue_webhook_event
+
+router = APIRouter()
+
+
+@router.post("/razorpay")
+async def razorpay_webhook(request: Request,
+                           signature: Optional[str] = Header(None, alias="X-Razorpay-Signature"),
+                           event_id: Optional[str] = Header(None, alias="X-Razorpay-Event-Id"),
+                           db: AsyncSession = Depends(get_async_db)):
+    """
+    Receive a Razorpay webhook. The event is only verified and stored here,
+    the webhook worker applies it to the payment and its booking.
+
+    Parameters:
+        request (Request): Raw webhook request, the signature covers its exact body
+        signature (str): X-Razorpay-Signature header
+        event_id (str, optional): X-Razorpay-Event-Id header
+        db (AsyncSession): The database session.
+
+    Returns:
+        dict: Acknowledgement, also for redelivered events
+
+    Raises:
+        HTTPException:
+            400: If the signature or the body is invalid
+            500: If the event could not be stored, so Razorpay retries it
+    """
+    body = await request.body()
+    if not verify_webhook_signature(body, signature):
+        raise HTTPException(status_code=400, detail="Invalid webhook signature")
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid webhook body")
+    if not isinstance(payload, dict):
+        raise HTTPException(status_code=400, detail="Invalid webhook body")
+
+    try:
+        await db.run_sync(enqueue_webhook_event, event_id, body, payload)
+    except SQLAlchemyError as db_error:
+        raise HTTPException(status_code=500, detail="DB Error: " + str(db_error))
+    return {"status": "ok"}
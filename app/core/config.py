@@ -10,6 +10,8 @@ load_dotenv()
 class Settings(BaseSettings):
     PROJECT_NAME: str = "Smart Parking"
     API_V1_STR: str = "/api/v1"
+    # Debug mode adds diagnostics such as the X-DB-Query-* response headers
+    DEBUG: bool = os.getenv("DEBUG", "false").lower() == "true"
     # Database Configuration
     DB_USER: str = os.getenv("DB_USER")
     DB_PASSWORD: str = str(os.getenv("DB_PASSWORD", ""))
@@ -18,6 +20,36 @@ class Settings(BaseSettings):
     DB_NAME: str = os.getenv("DB_NAME", "smart_parking")
  
     DATABASE_URL: str = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+    # Same database through the async psycopg driver, used by the async def endpoints
+    ASYNC_DATABASE_URL: str = f"postgresql+psycopg://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+
+    # Connection pool, applied to the sync and the async engine alike, so a worker can
+    # hold up to 2 * (DB_POOL_SIZE + DB_MAX_OVERFLOW) connections
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    DB_POOL_TIMEOUT_SECONDS: float = float(os.getenv("DB_POOL_TIMEOUT_SECONDS", "30"))
+    DB_POOL_RECYCLE_SECONDS: int = int(os.getenv("DB_POOL_RECYCLE_SECONDS", "1800"))
+    DB_POOL_PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+    # Connections opened per pool at startup, capped at DB_POOL_SIZE
+    DB_POOL_WARM_CONNECTIONS: int = int(os.getenv("DB_POOL_WARM_CONNECTIONS", "2"))
+    # Saturation warnings, logged at most once per interval and pool
+    DB_POOL_SATURATION_ALERT_RATIO: float = float(os.getenv("DB_POOL_SATURATION_ALERT_RATIO", "0.8"))
+    DB_POOL_SLOW_WAIT_SECONDS: float = float(os.getenv("DB_POOL_SLOW_WAIT_SECONDS", "1"))
+    DB_POOL_ALERT_INTERVAL_SECONDS: float = float(os.getenv("DB_POOL_ALERT_INTERVAL_SECONDS", "60"))
+
+    # Read replicas for read-only endpoints, comma separated postgresql:// URLs. A replica
+    # further behind than DB_REPLICA_MAX_LAG_SECONDS is skipped in favour of the primary.
+    DB_REPLICA_URLS: str = os.getenv("DB_REPLICA_URLS", "")
+    DB_REPLICA_MAX_LAG_SECONDS: float = float(os.getenv("DB_REPLICA_MAX_LAG_SECONDS", "5"))
+    DB_REPLICA_LAG_CHECK_SECONDS: float = float(os.getenv("DB_REPLICA_LAG_CHECK_SECONDS", "5"))
+
+    # Requests past any of these are logged with their most repeated statements
+    QUERY_COUNT_WARN_THRESHOLD: int = int(os.getenv("QUERY_COUNT_WARN_THRESHOLD", "30"))
+    QUERY_TIME_WARN_MS: float = float(os.getenv("QUERY_TIME_WARN_MS", "500"))
+    QUERY_REPEAT_WARN_THRESHOLD: int = int(os.getenv("QUERY_REPEAT_WARN_THRESHOLD", "5"))
+
+    # Timezone used for booking times sent without an offset
+    DEFAULT_TIMEZONE: str = os.getenv("DEFAULT_TIMEZONE", "Asia/Kolkata")
 
     BACKEND_URL: str = os.getenv("BACKEND_URL", "http://localhost:8000")
     FRONTEND_URL: str = os.getenv("FRONTEND_URL", "http://localhost:5173")
@@ -52,10 +84,93 @@ class Settings(BaseSettings):
     # Payment Gateway (example)
     RAZORPAY_KEY_ID: str = os.getenv("RAZORPAY_KEY_ID")
     RAZORPAY_KEY_SECRET: str = os.getenv("RAZORPAY_KEY_SECRET")
+    RAZORPAY_WEBHOOK_SECRET: str = str(os.getenv("RAZORPAY_WEBHOOK_SECRET", ""))
+    RAZORPAY_API_URL: str = os.getenv("RAZORPAY_API_URL", "https://api.razorpay.com/v1")
 
     EMAIL_ADDRESS: str = os.getenv("EMAIL_ADDRESS")
     EMAIL_PASSWORD:str = os.getenv("EMAIL_PASSWORD")
 
+    # Background jobs
+    MISSED_BOOKING_SWEEP_INTERVAL_SECONDS: int = int(os.getenv("MISSED_BOOKING_SWEEP_INTERVAL_SECONDS", "60"))
+    MISSED_BOOKING_SWEEP_BATCH_SIZE: int = int(os.getenv("MISSED_BOOKING_SWEEP_BATCH_SIZE", "500"))
+    MISSED_BOOKING_SWEEP_MAX_BATCHES: int = int(os.getenv("MISSED_BOOKING_SWEEP_MAX_BATCHES", "20"))
+
+    # Idempotency-Key handling for booking and payment endpoints
+    IDEMPOTENCY_KEY_TTL_HOURS: int = int(os.getenv("IDEMPOTENCY_KEY_TTL_HOURS", "24"))
+    IDEMPOTENCY_IN_PROGRESS_TIMEOUT_SECONDS: int = int(os.getenv("IDEMPOTENCY_IN_PROGRESS_TIMEOUT_SECONDS", "120"))
+    IDEMPOTENCY_CACHE_SIZE: int = int(os.getenv("IDEMPOTENCY_CACHE_SIZE", "10000"))
+    IDEMPOTENCY_CACHE_TTL_SECONDS: int = int(os.getenv("IDEMPOTENCY_CACHE_TTL_SECONDS", "600"))
+    IDEMPOTENCY_PURGE_INTERVAL_SECONDS: int = int(os.getenv("IDEMPOTENCY_PURGE_INTERVAL_SECONDS", "3600"))
+
+    # Admin verification queue: spots claimed by an admin are hidden from the others
+    # until decided or until the lease runs out
+    VERIFICATION_LEASE_SECONDS: int = int(os.getenv("VERIFICATION_LEASE_SECONDS", "900"))
+    VERIFICATION_CLAIM_SIZE: int = int(os.getenv("VERIFICATION_CLAIM_SIZE", "10"))
+    VERIFICATION_CLAIM_MAX_SIZE: int = int(os.getenv("VERIFICATION_CLAIM_MAX_SIZE", "100"))
+
+    # Uploaded verification documents, validated by a background process pool
+    DOCUMENT_MAX_BYTES: int = int(os.getenv("DOCUMENT_MAX_BYTES", str(10 * 1024 * 1024)))
+    DOCUMENT_MAX_PAGES: int = int(os.getenv("DOCUMENT_MAX_PAGES", "50"))
+    DOCUMENT_VALIDATION_WORKERS: int = int(os.getenv("DOCUMENT_VALIDATION_WORKERS", "2"))
+    DOCUMENT_VALIDATION_BATCH_SIZE: int = int(os.getenv("DOCUMENT_VALIDATION_BATCH_SIZE", "10"))
+    # A claimed batch left unfinished by a worker that died is taken again after this long
+    DOCUMENT_VALIDATION_LEASE_SECONDS: int = int(os.getenv("DOCUMENT_VALIDATION_LEASE_SECONDS", "300"))
+    DOCUMENT_VALIDATION_INTERVAL_SECONDS: int = int(os.getenv("DOCUMENT_VALIDATION_INTERVAL_SECONDS", "5"))
+
+    # Waitlist for sold out spots
+    WAITLIST_CLAIM_WINDOW_SECONDS: int = int(os.getenv("WAITLIST_CLAIM_WINDOW_SECONDS", "300"))
+    WAITLIST_EXPIRY_INTERVAL_SECONDS: int = int(os.getenv("WAITLIST_EXPIRY_INTERVAL_SECONDS", "15"))
+
+    # Pricing rules, every booked hour is charged hourly_rate times its multipliers
+    PRICING_PEAK_HOURS: str = os.getenv("PRICING_PEAK_HOURS", "")  # e.g. "8-11,17-20", end exclusive
+    PRICING_PEAK_MULTIPLIER: float = float(os.getenv("PRICING_PEAK_MULTIPLIER", "1.0"))
+    PRICING_WEEKEND_MULTIPLIER: float = float(os.getenv("PRICING_WEEKEND_MULTIPLIER", "1.0"))
+    PRICING_MIN_BILLED_HOURS: int = int(os.getenv("PRICING_MIN_BILLED_HOURS", "1"))
+    PRICING_EXTRA_SLOT_DISCOUNT: float = float(os.getenv("PRICING_EXTRA_SLOT_DISCOUNT", "0.0"))
+    PRICING_MAX_BATCH_SIZE: int = int(os.getenv("PRICING_MAX_BATCH_SIZE", "500"))
+
+    # Booking history pages
+    BOOKING_PAGE_SIZE: int = int(os.getenv("BOOKING_PAGE_SIZE", "50"))
+    BOOKING_PAGE_MAX_SIZE: int = int(os.getenv("BOOKING_PAGE_MAX_SIZE", "200"))
+    # Rows fetched per round trip of the server side cursor behind booking exports
+    BOOKING_EXPORT_BATCH_SIZE: int = int(os.getenv("BOOKING_EXPORT_BATCH_SIZE", "2000"))
+
+    # Pages of a spot's reviews
+    REVIEW_PAGE_SIZE: int = int(os.getenv("REVIEW_PAGE_SIZE", "20"))
+    REVIEW_PAGE_MAX_SIZE: int = int(os.getenv("REVIEW_PAGE_MAX_SIZE", "100"))
+    # Rating summaries of map and search results, and their reconciliation against the reviews
+    RATING_SUMMARY_MAX_BATCH_SIZE: int = int(os.getenv("RATING_SUMMARY_MAX_BATCH_SIZE", "500"))
+    RATING_RECONCILE_INTERVAL_SECONDS: int = int(os.getenv("RATING_RECONCILE_INTERVAL_SECONDS", "86400"))
+
+    # Owner analytics, read from hourly rollups
+    ANALYTICS_MAX_RANGE_DAYS: int = int(os.getenv("ANALYTICS_MAX_RANGE_DAYS", "366"))
+
+    # Recompute the spot and owner earnings counters from payments
+    EARNINGS_RECONCILE_INTERVAL_SECONDS: int = int(os.getenv("EARNINGS_RECONCILE_INTERVAL_SECONDS", "86400"))
+
+    # Server-Sent Events availability feed
+    SSE_COALESCE_SECONDS: float = float(os.getenv("SSE_COALESCE_SECONDS", "0.5"))
+    SSE_HEARTBEAT_SECONDS: float = float(os.getenv("SSE_HEARTBEAT_SECONDS", "15"))
+    SSE_MAX_SPOT_IDS: int = int(os.getenv("SSE_MAX_SPOT_IDS", "200"))
+
+    # Owner notification WebSockets
+    WS_HEARTBEAT_SECONDS: float = float(os.getenv("WS_HEARTBEAT_SECONDS", "30"))
+    WS_SEND_BUFFER_SIZE: int = int(os.getenv("WS_SEND_BUFFER_SIZE", "100"))
+
+    # Razorpay webhook events, applied to payments and bookings by a background worker
+    PAYMENT_WEBHOOK_INTERVAL_SECONDS: int = int(os.getenv("PAYMENT_WEBHOOK_INTERVAL_SECONDS", "2"))
+    PAYMENT_WEBHOOK_BATCH_SIZE: int = int(os.getenv("PAYMENT_WEBHOOK_BATCH_SIZE", "100"))
+    PAYMENT_WEBHOOK_MAX_ATTEMPTS: int = int(os.getenv("PAYMENT_WEBHOOK_MAX_ATTEMPTS", "5"))
+
+    # Settle unconfirmed payments against the gateway
+    PAYMENT_RECONCILE_INTERVAL_SECONDS: int = int(os.getenv("PAYMENT_RECONCILE_INTERVAL_SECONDS", "300"))
+    PAYMENT_RECONCILE_PAGE_SIZE: int = int(os.getenv("PAYMENT_RECONCILE_PAGE_SIZE", "200"))
+    PAYMENT_RECONCILE_CONCURRENCY: int = int(os.getenv("PAYMENT_RECONCILE_CONCURRENCY", "10"))
+    PAYMENT_RECONCILE_MIN_AGE_SECONDS: int = int(os.getenv("PAYMENT_RECONCILE_MIN_AGE_SECONDS", "120"))
+    # Orders still unpaid this long after creation are abandoned and their slots released
+    PAYMENT_ABANDON_AFTER_SECONDS: int = int(os.getenv("PAYMENT_ABANDON_AFTER_SECONDS", "1800"))
+    GATEWAY_TIMEOUT_SECONDS: float = float(os.getenv("GATEWAY_TIMEOUT_SECONDS", "10"))
+
 @lru_cache()
 def get_settings():
     return Settings()
@@ -0,0 +1,31 @@
+# app/core/pagination.py
+
+import base64
+import json
+from datetime import datetime
+from typing import Union
+
+
+def encode_cursor(sort_value: Union[datetime, int], row_id: int) -> str:
+    """Opaque token for the (sort value, id) of the last row of a page."""
+    value = sort_value.isoformat() if isinstance(sort_value, datetime) else int(sort_value)
+    raw = json.dumps([value, row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple:
+    """
+    Read a token made by encode_cursor. Datetime sort values come back as datetimes,
+    numeric ones as ints.
+
+    Raises:
+        ValueError: If the token is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if isinstance(sort_value, str):
+            return datetime.fromisoformat(sort_value), int(row_id)
+        return int(sort_value), int(row_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
@@ -0,0 +1,155 @@
+# app/core/realtime.py
+#
+# In-process publish/subscribe hubs for pushing live updates to connected clients.
+# Publishers may run on any thread (request handlers, threadpool jobs); delivery is
+# handed to the event loop that owns the subscribers. Each worker process has its
+# own hub and only sees changes made through that worker.
+
+import asyncio
+from typing import Dict, Iterable, List, Optional, Set
+
+
+class AvailabilitySubscription:
+    """
+    One client's interest in a set of spots or a bounding box.
+    Only the latest update per spot is kept until the client reads it, so bursts of
+    changes are coalesced and memory stays bounded by the number of watched spots.
+    """
+
+    def __init__(self, spot_ids: Optional[Set[int]] = None, bbox: Optional[tuple] = None):
+        self.spot_ids = spot_ids
+        self.bbox = bbox  # (min_lon, min_lat, max_lon, max_lat)
+        self.pending: Dict[int, dict] = {}
+        self.wakeup = asyncio.Event()
+
+    def in_bbox(self, update: dict) -> bool:
+        min_lon, min_lat, max_lon, max_lat = self.bbox
+        return (update["latitude"] is not None and update["longitude"] is not None
+                and min_lon <= update["longitude"] <= max_lon
+                and min_lat <= update["latitude"] <= max_lat)
+
+    def push(self, update: dict):
+        self.pending[update["spot_id"]] = update
+        self.wakeup.set()
+
+    def drain(self) -> List[dict]:
+        """Take every pending update, one per spot."""
+        updates = list(self.pending.values())
+        self.pending.clear()
+        self.wakeup.clear()
+        return updates
+
+
+class AvailabilityHub:
+    """Fans out spot availability changes to the subscriptions interested in them."""
+
+    def __init__(self):
+        self._by_spot: Dict[int, Set[AvailabilitySubscription]] = {}
+        self._by_bbox: Set[AvailabilitySubscription] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def subscribe(self, spot_ids: Optional[Iterable[int]] = None,
+                  bbox: Optional[tuple] = None) -> AvailabilitySubscription:
+        """Register a subscription. Must be called from the event loop serving the client."""
+        self._loop = asyncio.get_running_loop()
+        subscription = AvailabilitySubscription(set(spot_ids) if spot_ids else None, bbox)
+        if subscription.spot_ids:
+            for spot_id in subscription.spot_ids:
+                self._by_spot.setdefault(spot_id, set()).add(subscription)
+        else:
+            self._by_bbox.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: AvailabilitySubscription):
+        for spot_id in subscription.spot_ids or ():
+            watchers = self._by_spot.get(spot_id)
+            if watchers is not None:
+                watchers.discard(subscription)
+                if not watchers:
+                    del self._by_spot[spot_id]
+        self._by_bbox.discard(subscription)
+
+    def has_subscribers(self) -> bool:
+        return bool(self._by_spot or self._by_bbox)
+
+    def publish(self, updates: List[dict]):
+        """Hand updates to the event loop. Safe to call from any thread, a no-op without subscribers."""
+        if not updates or self._loop is None or not self.has_subscribers():
+            return
+        try:
+            self._loop.call_soon_threadsafe(self._deliver, updates)
+        except RuntimeError:
+            # Event loop already closed during shutdown
+            pass
+
+    def _deliver(self, updates: List[dict]):
+        for update in updates:
+            for subscription in self._by_spot.get(update["spot_id"], ()):
+                subscription.push(update)
+            for subscription in self._by_bbox:
+                if subscription.in_bbox(update):
+                    subscription.push(update)
+
+
+availability_hub = AvailabilityHub()
+
+
+class OwnerConnection:
+    """
+    Outgoing side of one owner WebSocket.
+    Events wait in a bounded buffer; a client too slow to keep up is marked as
+    overflowed and disconnected rather than letting the buffer grow.
+    """
+
+    def __init__(self, owner_id: str, buffer_size: int):
+        self.owner_id = owner_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=buffer_size)
+        self.overflowed = asyncio.Event()
+
+    def push(self, event: dict):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed.set()
+
+
+class OwnerHub:
+    """Fans out booking and review events to the open WebSockets of each owner."""
+
+    def __init__(self):
+        self._by_owner: Dict[str, Set[OwnerConnection]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def connect(self, owner_id: str, buffer_size: int) -> OwnerConnection:
+        """Register a connection. Must be called from the event loop serving the socket."""
+        self._loop = asyncio.get_running_loop()
+        connection = OwnerConnection(owner_id, buffer_size)
+        self._by_owner.setdefault(owner_id, set()).add(connection)
+        return connection
+
+    def disconnect(self, connection: OwnerConnection):
+        connections = self._by_owner.get(connection.owner_id)
+        if connections is not None:
+            connections.discard(connection)
+            if not connections:
+                del self._by_owner[connection.owner_id]
+
+    def has_subscribers(self) -> bool:
+        return bool(self._by_owner)
+
+    def publish(self, owner_id: str, event: dict):
+        """Hand an event to the event loop. Safe to call from any thread."""
+        if self._loop is None or owner_id not in self._by_owner:
+            return
+        try:
+            self._loop.call_soon_threadsafe(self._deliver, owner_id, event)
+        except RuntimeError:
+            # Event loop already closed during shutdown
+            pass
+
+    def _deliver(self, owner_id: str, event: dict):
+        for connection in self._by_owner.get(owner_id, ()):
+            connection.push(event)
+
+
+owner_hub = OwnerHub()
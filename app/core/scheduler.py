@@ -0,0 +1,51 @@
+# app/core/scheduler.py
+
+import asyncio
+from typing import Callable, List
+from starlette.concurrency import run_in_threadpool
+
+
+async def run_periodic(name: str, job: Callable[[], object], interval_seconds: float):
+    """
+    Run a blocking job forever, sleeping between runs.
+    The job is executed in the threadpool so database work never blocks the event loop.
+
+    Parameters:
+        name (str): Name of the job, used in log lines
+        job (Callable): Blocking function to run on every tick
+        interval_seconds (float): Delay between the end of one run and the start of the next
+    """
+    while True:
+        try:
+            await run_in_threadpool(job)
+        except Exception as job_error:
+            print(f"[{name}] job failed:", str(job_error))
+        await asyncio.sleep(interval_seconds)
+
+
+def start_jobs(jobs: List[tuple]) -> List[asyncio.Task]:
+    """
+    Start a background task for every (name, job, interval_seconds) tuple.
+
+    Parameters:
+        jobs (List[tuple]): Jobs to schedule
+
+    Returns:
+        List[asyncio.Task]: The running tasks, to be passed to stop_jobs on shutdown
+    """
+    return [
+        asyncio.create_task(run_periodic(name, job, interval), name=name)
+        for name, job, interval in jobs
+    ]
+
+
+async def stop_jobs(tasks: List[asyncio.Task]):
+    """
+    Cancel the background tasks started by start_jobs and wait for them to finish.
+
+    Parameters:
+        tasks (List[asyncio.Task]): Tasks returned by start_jobs
+    """
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
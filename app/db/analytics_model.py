@@ -0,0 +1,14 @@
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, Float
+from app.db.db import Base
+
+
+class SpotHourlyRollup(Base):
+    """Per spot, per local hour totals, kept up to date as bookings are made and cancelled."""
+    __tablename__ = "spot_hourly_rollups"
+
+    spot_id = Column(Integer, ForeignKey("spots.spot_id"), primary_key=True)
+    bucket_start = Column(DateTime(timezone=True), primary_key=True)
+    bookings = Column(Integer, nullable=False, default=0)  # bookings starting in the hour
+    cancellations = Column(Integer, nullable=False, default=0)
+    occupied_slot_hours = Column(Float, nullable=False, default=0)
+    revenue = Column(Integer, nullable=False, default=0)  # amount of bookings starting in the hour
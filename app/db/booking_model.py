@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Index, text
 from sqlalchemy.sql import func
 from app.db.db import Base
 
@@ -6,12 +6,22 @@ from app.db.db import Base
 class Booking(Base):
     __tablename__ = "bookings"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     user_id = Column(String, nullable=False)
     spot_id = Column(Integer, nullable=False)
     total_slots = Column(Integer, nullable=False)
-    start_date_time = Column(String, nullable=False)
-    end_date_time = Column(String, nullable=False)
-    payment_id = Column(Integer, ForeignKey("payments.id"), nullable=False)
+    start_date_time = Column(DateTime(timezone=True), nullable=False)
+    end_date_time = Column(DateTime(timezone=True), nullable=False)
+    payment_id = Column(Integer, ForeignKey("payments.id"), nullable=False, index=True)
     status = Column(String, nullable=False, insert_default="Pending")
     created_at = Column(DateTime, server_default=func.now())
+
+    __table_args__ = (
+        # Availability and owner calendar windows for a spot
+        Index("ix_bookings_spot_id_start_end", "spot_id", "start_date_time", "end_date_time"),
+        # Booking history of a user, in keyset page order
+        Index("ix_bookings_user_id_start_id", "user_id", "start_date_time", "id"),
+        # Missed booking sweeper only ever scans bookings still waiting for check in
+        Index("ix_bookings_booked_end", "end_date_time", "id",
+              postgresql_where=text("status = 'Booked'")),
+    )
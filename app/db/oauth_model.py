@@ -1,6 +1,6 @@
 # app/db/oauth_model.py
 
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import Column, Integer, String, text
 from app.db.db import Base
 
 
@@ -17,3 +17,5 @@ class OAuthUser(Base):
     access_token = Column(String)
     # If provider supports refresh tokens
     refresh_token = Column(String, nullable=True)
+    # Sum of spots.total_earnings of the user's spots, kept by earnings_service
+    total_earnings = Column(Integer, nullable=False, server_default=text("0"))
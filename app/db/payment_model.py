@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy import Column, Integer, String, DateTime, JSON, Index, text
 from sqlalchemy.sql import func
 from app.db.db import Base
 
@@ -6,12 +6,40 @@ from app.db.db import Base
 class Payment(Base):
     __tablename__ = "payments"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     user_id = Column(String, nullable=False)
     spot_id = Column(Integer, nullable=False)  # (parking id)
     amount = Column(Integer, nullable=False)
     razorpay_order_id = Column(String, unique=True, nullable=False)
     razorpay_payment_id = Column(String, unique=True, nullable=True)
     razorpay_signature = Column(String, nullable=True)
-    status = Column(String, nullable=False, default="pending")
+    status = Column(String, nullable=False, default="pending")  # pending, failed, success, abandoned
     created_at = Column(DateTime, server_default=func.now())
+    # Booking window held by the order, so the booking can be created without the client
+    total_slots = Column(Integer, nullable=True)
+    start_date_time = Column(DateTime(timezone=True), nullable=True)
+    end_date_time = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        # Payment reconciliation pages through payments not settled yet
+        Index("ix_payments_unsettled", "id", postgresql_where=text("status IN ('pending', 'failed')")),
+    )
+
+
+class PaymentWebhookEvent(Base):
+    __tablename__ = "payment_webhook_events"
+
+    id = Column(String, primary_key=True)  # X-Razorpay-Event-Id, deduplicates redeliveries
+    event = Column(String, nullable=False)
+    payload = Column(JSON, nullable=False)
+    status = Column(String, nullable=False, default="pending")  # pending, processed, ignored, failed
+    attempts = Column(Integer, nullable=False, default=0)
+    error = Column(String, nullable=True)
+    received_at = Column(DateTime(timezone=True), server_default=func.now())
+    processed_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        # Worker picks up pending events oldest first
+        Index("ix_payment_webhook_events_pending", "received_at",
+              postgresql_where=text("status = 'pending'")),
+    )
@@ -0,0 +1,202 @@
+# app/db/pool_monitor.py
+
+import contextvars
+import threading
+import time
+from typing import Dict, List, Optional
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from app.core.config import settings
+
+# Connections checked out while serving the current request, keyed by connection record
+_request_connections: contextvars.ContextVar[Optional[dict]] = contextvars.ContextVar(
+    "request_connections", default=None)
+
+
+class PoolStats:
+    """Counters for one connection pool, updated from the pool events."""
+
+    def __init__(self, name: str, engine):
+        self.name = name
+        self.engine = engine
+        self.capacity = self.pool.size() + max(self.pool._max_overflow, 0)
+        self.checkouts = 0
+        self.waits = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.timeouts = 0
+        self.leaks = 0
+        self.peak_checked_out = 0
+        self._last_alert = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def pool(self):
+        return self.engine.pool
+
+    def record_wait(self, seconds: float, timed_out: bool):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.waits += 1
+                self.total_wait += seconds
+                self.max_wait = max(self.max_wait, seconds)
+        if timed_out:
+            print(f"[db-pool] {self.name}: no connection after {seconds:.1f}s, "
+                  f"{self.pool.checkedout()} of {self.capacity} checked out")
+        elif seconds >= settings.DB_POOL_SLOW_WAIT_SECONDS:
+            self.alert(f"waited {seconds:.2f}s for a connection")
+
+    def record_checkout(self):
+        checked_out = self.pool.checkedout()
+        with self._lock:
+            self.checkouts += 1
+            self.peak_checked_out = max(self.peak_checked_out, checked_out)
+        if self.capacity and checked_out >= self.capacity * settings.DB_POOL_SATURATION_ALERT_RATIO:
+            self.alert(f"{checked_out} of {self.capacity} connections checked out")
+
+    def alert(self, message: str):
+        """Log a saturation warning, at most once per DB_POOL_ALERT_INTERVAL_SECONDS."""
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_alert < settings.DB_POOL_ALERT_INTERVAL_SECONDS:
+                return
+            self._last_alert = now
+        print(f"[db-pool] {self.name} saturated: {message}")
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "name": self.name,
+                "size": self.pool.size(),
+                "max_overflow": max(self.pool._max_overflow, 0),
+                "checked_out": self.pool.checkedout(),
+                "checked_in": self.pool.checkedin(),
+                "overflow": max(self.pool.overflow(), 0),
+                "peak_checked_out": self.peak_checked_out,
+                "checkouts": self.checkouts,
+                "avg_wait_ms": round(self.total_wait / self.waits * 1000, 3) if self.waits else 0.0,
+                "max_wait_ms": round(self.max_wait * 1000, 3),
+                "timeouts": self.timeouts,
+                "leaked_sessions": self.leaks,
+            }
+
+
+# Stats of every instrumented pool, by id of the pool
+pool_stats: Dict[int, PoolStats] = {}
+
+
+class _TimedCheckout:
+    """Times how long a checkout waited for a free connection."""
+
+    def _do_get(self):
+        started = time.monotonic()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            stats = pool_stats.get(id(self))
+            if stats:
+                stats.record_wait(time.monotonic() - started, timed_out=True)
+            raise
+        stats = pool_stats.get(id(self))
+        if stats:
+            stats.record_wait(time.monotonic() - started, timed_out=False)
+        return connection
+
+
+class TimedQueuePool(_TimedCheckout, QueuePool):
+    pass
+
+
+class TimedAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    pass
+
+
+def pool_options(async_driver: bool = False) -> dict:
+    """Engine keyword arguments for a pool sized and tuned from Settings."""
+    return {
+        "poolclass": TimedAsyncQueuePool if async_driver else TimedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
+def instrument_engine(engine, name: str) -> PoolStats:
+    """
+    Collect checkout statistics for the pool of an engine and attribute its checkouts
+    to the request being served, so connections a request never returns are reported.
+    Pass async_engine.sync_engine for an async engine.
+    """
+    stats = PoolStats(name, engine)
+    pool_stats[id(engine.pool)] = stats
+
+    @event.listens_for(engine, "engine_disposed")
+    def _on_dispose(engine_):
+        # dispose() swaps in a fresh pool, keep timing its checkouts
+        for key in [key for key, value in pool_stats.items() if value is stats]:
+            del pool_stats[key]
+        pool_stats[id(engine.pool)] = stats
+
+    @event.listens_for(engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        stats.record_checkout()
+        held = _request_connections.get()
+        if held is not None:
+            held[connection_record] = (stats, time.monotonic())
+            connection_record.info["request_connections"] = held
+
+    @event.listens_for(engine, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        held = connection_record.info.pop("request_connections", None)
+        if held is not None:
+            held.pop(connection_record, None)
+
+    return stats
+
+
+def pool_snapshot() -> List[dict]:
+    """Current statistics of every instrumented pool."""
+    return [stats.snapshot() for stats in pool_stats.values()]
+
+
+class SessionLeakMiddleware:
+    """
+    ASGI middleware logging requests that finish with database connections still
+    checked out, i.e. sessions that were never closed. Runs after the response body
+    has been sent, so streaming responses closing their session at the end are not flagged.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] not in ("http", "websocket"):
+            return await self.app(scope, receive, send)
+
+        held: dict = {}
+        token = _request_connections.set(held)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _request_connections.reset(token)
+            if held:
+                report_leaks(f"{scope.get('method', 'WS')} {scope['path']}", held)
+
+
+def report_leaks(label: str, held: dict) -> int:
+    """Count and log the connections a finished request left checked out."""
+    now = time.monotonic()
+    leaked = list(held.items())
+    held.clear()
+    for connection_record, (stats, checked_out_at) in leaked:
+        connection_record.info.pop("request_connections", None)
+        with stats._lock:
+            stats.leaks += 1
+        print(f"[db-pool] {label} finished without closing its session, "
+              f"{stats.name} connection held for {now - checked_out_at:.1f}s")
+    return len(leaked)
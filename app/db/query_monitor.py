@@ -0,0 +1,149 @@
+# app/db/query_monitor.py
+
+import contextvars
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import List, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.core.config import settings
+
+# Statistics of the request being served, None outside of a request
+_current_queries: contextvars.ContextVar[Optional["QueryStats"]] = contextvars.ContextVar(
+    "current_queries", default=None)
+
+# QueryStats receiving the statements of every request while capture_queries is active
+_collectors: List["QueryStats"] = []
+_collectors_lock = threading.Lock()
+_installed = False
+
+
+class QueryStats:
+    """Statements run for one request, with their total time and how often each shape repeated."""
+
+    def __init__(self):
+        self.count = 0
+        self.total_time = 0.0
+        self.shapes: Counter = Counter()
+
+    def record(self, statement: str, seconds: float):
+        self.count += 1
+        self.total_time += seconds
+        self.shapes[statement] += 1
+
+    def merge(self, other: "QueryStats"):
+        self.count += other.count
+        self.total_time += other.total_time
+        self.shapes.update(other.shapes)
+
+    @property
+    def total_ms(self) -> float:
+        return self.total_time * 1000
+
+    def most_repeated(self) -> tuple:
+        """(statement, times run) of the shape run most often, ("", 0) without statements."""
+        return self.shapes.most_common(1)[0] if self.shapes else ("", 0)
+
+    def summary(self, limit: int = 5) -> str:
+        return "\n".join(f"{times}x {_short(statement)}" for statement, times in self.shapes.most_common(limit))
+
+
+def _short(statement: str, length: int = 160) -> str:
+    statement = " ".join(statement.split())
+    return statement if len(statement) <= length else statement[:length] + "..."
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_queries.get() is not None:
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_queries.get()
+    started = conn.info.get("query_started")
+    if stats is not None and started:
+        stats.record(statement, time.perf_counter() - started.pop())
+
+
+def install_query_listeners():
+    """Time every statement of every engine, including ones created later. Safe to call again."""
+    global _installed
+    if not _installed:
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        _installed = True
+
+
+@contextmanager
+def capture_queries():
+    """
+    Collect the statements run inside the block, directly or by requests served meanwhile.
+    Used by the tests to bound the number of queries an endpoint runs.
+    """
+    install_query_listeners()
+    stats = QueryStats()
+    token = _current_queries.set(stats)
+    with _collectors_lock:
+        _collectors.append(stats)
+    try:
+        yield stats
+    finally:
+        with _collectors_lock:
+            _collectors.remove(stats)
+        _current_queries.reset(token)
+
+
+class QueryCounterMiddleware:
+    """
+    ASGI middleware counting the SQL statements of each request. In DEBUG the count,
+    total time and the repeats of the most repeated statement are returned as
+    X-DB-Query-Count, X-DB-Query-Time-Ms and X-DB-Query-Max-Repeats headers (as of
+    when the response starts). Requests past the QUERY_*_WARN thresholds are logged
+    with their most repeated statements, which is how N+1 loops show up.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        install_query_listeners()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        stats = QueryStats()
+        token = _current_queries.set(stats)
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start" and settings.DEBUG:
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-db-query-count", str(stats.count).encode()),
+                    (b"x-db-query-time-ms", f"{stats.total_ms:.1f}".encode()),
+                    (b"x-db-query-max-repeats", str(stats.most_repeated()[1]).encode()),
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_headers)
+        finally:
+            _current_queries.reset(token)
+            report_queries(f"{scope['method']} {scope['path']}", stats)
+
+
+def report_queries(label: str, stats: QueryStats):
+    """Log a request past the query thresholds and hand its statistics to active collectors."""
+    with _collectors_lock:
+        for collector in _collectors:
+            collector.merge(stats)
+
+    repeated, times = stats.most_repeated()
+    problems = []
+    if stats.count > settings.QUERY_COUNT_WARN_THRESHOLD:
+        problems.append(f"{stats.count} statements")
+    if stats.total_ms > settings.QUERY_TIME_WARN_MS:
+        problems.append(f"{stats.total_ms:.0f} ms in the database")
+    if times >= settings.QUERY_REPEAT_WARN_THRESHOLD:
+        problems.append(f"the same statement {times} times, likely an N+1")
+    if problems:
+        print(f"[queries] {label}: " + ", ".join(problems) + "\n" + stats.summary(3))
@@ -0,0 +1,92 @@
+# app/db/replicas.py
+
+import time
+from typing import List, Optional
+from sqlalchemy import make_url, text
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from app.db.pool_monitor import instrument_engine, pool_options
+
+# Seconds the replica is behind the primary. A replica that has replayed everything it
+# received is current, however long ago the last transaction was.
+_REPLICA_LAG = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+
+class Replica:
+    """A read replica and the lag last measured on it."""
+
+    def __init__(self, name: str, engine: AsyncEngine):
+        self.name = name
+        self.engine = engine
+        self.lag: Optional[float] = None
+        self.error: Optional[str] = None
+        self.checked_at = float("-inf")
+
+
+class ReplicaRouter:
+    """
+    Picks the replica a read-only session runs on, round robin over the replicas
+    whose last measured lag is within max_lag_seconds. The lag of a replica is
+    measured at most once per check_interval_seconds, a replica that cannot be
+    reached counts as lagging until the next check. None means use the primary.
+    """
+
+    def __init__(self, replicas: List[Replica], max_lag_seconds: float, check_interval_seconds: float):
+        self.replicas = replicas
+        self.max_lag_seconds = max_lag_seconds
+        self.check_interval_seconds = check_interval_seconds
+        self._turn = 0
+
+    async def pick(self) -> Optional[AsyncEngine]:
+        replicas = self.replicas
+        for _ in range(len(replicas)):
+            self._turn = (self._turn + 1) % len(replicas)
+            replica = replicas[self._turn - 1]
+            if time.monotonic() - replica.checked_at >= self.check_interval_seconds:
+                await self.check(replica)
+            if replica.lag is not None and replica.lag <= self.max_lag_seconds:
+                return replica.engine
+        return None
+
+    async def check(self, replica: Replica):
+        """Measure the lag of a replica. Concurrent callers keep using the previous reading meanwhile."""
+        replica.checked_at = time.monotonic()
+        try:
+            async with replica.engine.connect() as conn:
+                replica.lag = float((await conn.execute(_REPLICA_LAG)).scalar())
+            replica.error = None
+        except Exception as replica_error:
+            if replica.error is None:
+                print(f"[db-replicas] {replica.name} unavailable, reading from the primary:", str(replica_error))
+            replica.lag = None
+            replica.error = str(replica_error)
+
+    def status(self) -> List[dict]:
+        return [
+            {
+                "name": replica.name,
+                "lag_seconds": replica.lag,
+                "in_rotation": replica.lag is not None and replica.lag <= self.max_lag_seconds,
+                "error": replica.error,
+            }
+            for replica in self.replicas
+        ]
+
+
+def create_replica_engines(urls: str) -> List[Replica]:
+    """
+    Build an async engine, pooled and instrumented like the primary, for each
+    comma separated postgresql:// URL.
+    """
+    replicas = []
+    for number, url in enumerate(filter(None, (url.strip() for url in urls.split(","))), start=1):
+        engine = create_async_engine(make_url(url).set(drivername="postgresql+psycopg"),
+                                     **pool_options(async_driver=True), connect_args={"client_encoding": "utf8"})
+        instrument_engine(engine.sync_engine, f"replica-{number}")
+        replicas.append(Replica(f"replica-{number}", engine))
+    return replicas
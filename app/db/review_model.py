@@ -1,5 +1,5 @@
 
-from sqlalchemy import Column, Integer, String, DateTime, LargeBinary, ForeignKey, ARRAY
+from sqlalchemy import Column, Integer, String, DateTime, LargeBinary, ForeignKey, ARRAY, Index, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.db.db import Base
@@ -19,3 +19,23 @@ class Review(Base):
     created_at = Column(DateTime, server_default=func.now())
 
     user = relationship("OAuthUser", backref="reviews")
+
+    __table_args__ = (
+        # Keyset pages of a spot's reviews, newest first or by rating
+        Index("ix_reviews_spot_created", "spot_id", "created_at", "id"),
+        Index("ix_reviews_spot_rating", "spot_id", "rating_score", "id"),
+    )
+
+
+class SpotRatingSummary(Base):
+    """Review count, rating sum and star histogram of a spot, kept by review_service."""
+    __tablename__ = "spot_rating_summaries"
+
+    spot_id = Column(Integer, ForeignKey("spots.spot_id"), primary_key=True)
+    review_count = Column(Integer, nullable=False, server_default=text("0"))
+    rating_sum = Column(Integer, nullable=False, server_default=text("0"))
+    rating_1 = Column(Integer, nullable=False, server_default=text("0"))
+    rating_2 = Column(Integer, nullable=False, server_default=text("0"))
+    rating_3 = Column(Integer, nullable=False, server_default=text("0"))
+    rating_4 = Column(Integer, nullable=False, server_default=text("0"))
+    rating_5 = Column(Integer, nullable=False, server_default=text("0"))
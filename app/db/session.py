@@ -1,27 +1,112 @@
 # app/db/session.py
 
+import asyncio
+from contextlib import asynccontextmanager
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from starlette.concurrency import run_in_threadpool
 from app.core.config import settings
+from app.db.analytics_model import SpotHourlyRollup
 from app.db.booking_model import Booking
+from app.db.idempotency_model import IdempotencyKey
 from app.db.oauth_model import OAuthUser
 from app.db.payment_model import Payment
 from app.db.review_model import Review
 from app.db.spot_model import Spot
+from app.db.waitlist_model import WaitlistEntry
 from app.db.db import Base
+from app.db.pool_monitor import instrument_engine, pool_options
+from app.db.replicas import ReplicaRouter, create_replica_engines
 
-# SQLAlchemy database URL
-DATABASE_URL = settings.DATABASE_URL
+# Engines are created by init_engines() when the application starts, not on import, so
+# importing the app (tests, workers, tooling) never touches the database. The schema is
+# managed by the Alembic migrations: run "alembic upgrade head" before starting the app.
+engine = None
+async_engine = None
 
-# Create database engine
-engine = create_engine(DATABASE_URL, connect_args={
-                       "check_same_thread": False} if "sqlite" in DATABASE_URL else {})
+# Session factories, bound to the engines by init_engines()
+SessionLocal = sessionmaker(autoflush=False)
 
-# Create a session factory
-SessionLocal = sessionmaker(autoflush=False, bind=engine)
+# Async session factory for the async def endpoints, so a query waits on the event loop
+# instead of blocking it. Objects stay loaded after commit, since lazy loads cannot
+# happen implicitly on an AsyncSession.
+AsyncSessionLocal = async_sessionmaker(autoflush=False, expire_on_commit=False)
+
+# Replicas serving the read-only endpoints, writes always go to the primary
+replica_router = ReplicaRouter([], max_lag_seconds=settings.DB_REPLICA_MAX_LAG_SECONDS,
+                               check_interval_seconds=settings.DB_REPLICA_LAG_CHECK_SECONDS)
+
+
+def init_engines():
+    """
+    Create the primary and replica engines and bind the session factories to them.
+    Connections are opened lazily, see warm_pools. Calling it again does nothing.
+    """
+    global engine, async_engine
+    if engine is not None:
+        return
+
+    database_url = settings.DATABASE_URL
+    engine = create_engine(database_url, **pool_options(), connect_args={
+                           "check_same_thread": False} if "sqlite" in database_url else {})
+    instrument_engine(engine, "sync")
+    SessionLocal.configure(bind=engine)
+
+    # psycopg 3 hands back undecoded bytes on SQL_ASCII databases, so the client
+    # encoding is pinned to match what psycopg2 returns
+    async_engine = create_async_engine(settings.ASYNC_DATABASE_URL, **pool_options(async_driver=True),
+                                       connect_args={"client_encoding": "utf8"})
+    instrument_engine(async_engine.sync_engine, "async")
+    AsyncSessionLocal.configure(bind=async_engine)
+
+    replica_router.replicas = create_replica_engines(settings.DB_REPLICA_URLS)
+
+
+async def warm_pools(connections: int = None):
+    """
+    Open connections up front so the first requests after a deploy do not pay for the
+    connection handshakes. Best effort: a pool that cannot be warmed is logged and
+    connects on demand as before.
+    """
+    connections = min(connections or settings.DB_POOL_WARM_CONNECTIONS, settings.DB_POOL_SIZE)
+    if connections < 1:
+        return
+
+    def _warm_sync():
+        held = [engine.connect() for _ in range(connections)]
+        for conn in held:
+            conn.close()
+
+    async def _warm(async_engine_):
+        held = [await async_engine_.connect() for _ in range(connections)]
+        for conn in held:
+            await conn.close()
+
+    pools = ["sync", "async"] + [replica.name for replica in replica_router.replicas]
+    results = await asyncio.gather(
+        run_in_threadpool(_warm_sync),
+        _warm(async_engine),
+        *(_warm(replica.engine) for replica in replica_router.replicas),
+        return_exceptions=True,
+    )
+    for name, result in zip(pools, results):
+        if isinstance(result, Exception):
+            print(f"[db-pool] could not warm the {name} pool:", str(result))
+
+
+async def dispose_engines():
+    """Close every pooled connection, on shutdown."""
+    global engine, async_engine
+    for replica in replica_router.replicas:
+        await replica.engine.dispose()
+    replica_router.replicas = []
+    if async_engine is not None:
+        await async_engine.dispose()
+    if engine is not None:
+        engine.dispose()
+    engine = async_engine = None
 
-# Create all tables
-Base.metadata.create_all(bind=engine)
 
 # Dependency to get a session instance
 
@@ -33,3 +118,26 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    """Yield a new async database session for dependency injection in FastAPI routes."""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+@asynccontextmanager
+async def AsyncReadSessionLocal():
+    """
+    Open an async session that only reads. It runs on a replica within
+    DB_REPLICA_MAX_LAG_SECONDS of the primary, or on the primary when there is none.
+    """
+    replica = await replica_router.pick()
+    async with AsyncSessionLocal(bind=replica) if replica else AsyncSessionLocal() as db:
+        yield db
+
+
+async def get_async_read_db():
+    """Yield an async read session (see AsyncReadSessionLocal) for routes that only read."""
+    async with AsyncReadSessionLocal() as db:
+        yield db
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Float, ARRAY, LargeBinary
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Float, ARRAY, LargeBinary, Index, text
 from sqlalchemy.sql import func
 from app.db.db import Base
 
@@ -6,16 +6,18 @@ from app.db.db import Base
 class Spot(Base):
     __tablename__ = "spots"
 
-    spot_id = Column(Integer, primary_key=True, index=True)
+    spot_id = Column(Integer, primary_key=True)
     owner_id = Column(String, ForeignKey(
         "oauth_users.provider_id"), index=True)
-    spot_title = Column(String, index=True)
-    address = Column(String, index=True)
-    latitude = Column(Float, index=True)
-    longitude = Column(Float, index=True)
-    hourly_rate = Column(Integer, index=True)
-    no_of_slots = Column(Integer, index=True)
-    available_slots = Column(Integer, index=True)
+    spot_title = Column(String)
+    address = Column(String)
+    latitude = Column(Float)
+    longitude = Column(Float)
+    hourly_rate = Column(Integer)
+    no_of_slots = Column(Integer)
+    # Not indexed on purpose: slot counters change on every booking and
+    # must stay eligible for HOT updates.
+    available_slots = Column(Integer)
     open_time = Column(String, nullable=False)
     close_time = Column(String, nullable=False)
     description = Column(String, nullable=True)
@@ -23,6 +25,17 @@ class Spot(Base):
     image = Column(ARRAY(LargeBinary), nullable=True)
     verification_status = Column(Integer)  # 0: pending, 1: approved, -1: rejected
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Payments of the spot's bookings, kept by earnings_service
+    total_earnings = Column(Integer, nullable=False, server_default=text("0"))
+    # Admin reviewing the pending spot and until when, see verification_service.claim_verifications
+    verification_claimed_by = Column(String, nullable=True)
+    verification_lease_until = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        # Verification queue, pending spots in spot_id order
+        Index("ix_spots_verification_pending", "spot_id",
+              postgresql_where=text("verification_status = 0")),
+    )
 
 class Document(Base):
     __tablename__ = "documents"
@@ -33,3 +46,14 @@ class Document(Base):
     content = Column(LargeBinary, nullable=False)   # PDF as BLOB
     filename = Column(String, nullable=False)
     uploaded_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Set by document_validation_service after the upload: pending, validating, valid or invalid
+    status = Column(String, nullable=False, server_default=text("'pending'"))
+    page_count = Column(Integer, nullable=True)
+    validation_error = Column(String, nullable=True)
+    validated_at = Column(DateTime(timezone=True), nullable=True)
+    validation_lease_until = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        # Validation worker backlog, including claims whose lease may have lapsed
+        Index("ix_documents_pending", "id", postgresql_where=text("status IN ('pending', 'validating')")),
+    )
@@ -0,0 +1,28 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Index, text
+from sqlalchemy.sql import func
+from app.db.db import Base
+
+
+class WaitlistEntry(Base):
+    __tablename__ = "waitlist_entries"
+
+    id = Column(Integer, primary_key=True)
+    spot_id = Column(Integer, ForeignKey("spots.spot_id"), nullable=False)
+    user_id = Column(String, nullable=False, index=True)
+    total_slots = Column(Integer, nullable=False)
+    start_date_time = Column(DateTime(timezone=True), nullable=False)
+    end_date_time = Column(DateTime(timezone=True), nullable=False)
+    status = Column(String, nullable=False, default="waiting")  # waiting, offered, claimed, expired, cancelled
+    offered_until = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        # Head of a spot's queue and queue positions
+        Index("ix_waitlist_entries_spot_waiting", "spot_id", "id",
+              postgresql_where=text("status = 'waiting'")),
+        # Expiry job: lapsed offers and windows that already ended
+        Index("ix_waitlist_entries_offered_until", "offered_until",
+              postgresql_where=text("status = 'offered'")),
+        Index("ix_waitlist_entries_waiting_end", "end_date_time",
+              postgresql_where=text("status = 'waiting'")),
+    )
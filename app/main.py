@@ -1,28 +1,94 @@
 import fastapi
+from contextlib import asynccontextmanager
 from fastapi.middleware.cors import CORSMiddleware
-from app.api.v1.endpoints import auth, user, booking, spot, parking, review, send_pdf, verification
-
-app = fastapi.FastAPI(title="Smart Parking")
-
-origins = [
-    "https://smart-parking-frontend.onrender.com",
-    "http://localhost:5173",
-]
-
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-    expose_headers=["Content-Disposition"]
-)
-
-app.include_router(auth.router, prefix="/api/v1/auth", tags=["Auth"])
-app.include_router(user.router, prefix="/users", tags=["Users"])
-app.include_router(booking.router, prefix="/bookings", tags=["Bookings"])
-app.include_router(spot.router, prefix="/spots", tags=["Spots"])
-app.include_router(parking.router, prefix="/spotdetails", tags=["Marker"])
-app.include_router(review.router, prefix="/reviews", tags=["Review"])
-app.include_router(send_pdf.router, prefix="/send-pdf", tags=["Send PDF"])
-app.include_router(verification.router, prefix="/verify-list", tags=["Spot Verification"])
+from app.api.v1.endpoints import auth, user, booking, spot, parking, review, send_pdf, verification, waitlist, pricing, analytics, notifications, webhooks, metrics
+from app.core.config import settings
+from app.core.scheduler import start_jobs, stop_jobs
+from app.db.pool_monitor import SessionLeakMiddleware
+from app.db.query_monitor import QueryCounterMiddleware
+from app.db.session import AsyncSessionLocal, dispose_engines, init_engines, warm_pools
+from app.services.sweeper_service import sweep_missed_bookings
+from app.services.idempotency_service import purge_expired_idempotency_keys, preload_response_cache
+from app.services.waitlist_service import expire_waitlist_job
+from app.services.earnings_service import reconcile_earnings_job
+from app.services.payment_webhook_service import process_webhook_events_job
+from app.services.payment_reconcile_service import reconcile_payments_job
+from app.services.document_validation_service import validate_documents_job, shutdown_validation_pool
+from app.services.review_service import reconcile_rating_summaries_job
+
+
+@asynccontextmanager
+async def lifespan(app: fastapi.FastAPI):
+    """
+    Open the database pools, warm them and the caches, then start the background jobs.
+    On shutdown the jobs are stopped before the pools they use are closed.
+    """
+    init_engines()
+    await warm_pools()
+    try:
+        async with AsyncSessionLocal() as db:
+            cached = await preload_response_cache(db)
+        print(f"[startup] preloaded {cached} idempotent responses")
+    except Exception as preload_error:
+        print("[startup] could not preload the idempotency cache:", str(preload_error))
+
+    tasks = start_jobs([
+        ("missed-booking-sweeper", sweep_missed_bookings, settings.MISSED_BOOKING_SWEEP_INTERVAL_SECONDS),
+        ("idempotency-key-purge", purge_expired_idempotency_keys, settings.IDEMPOTENCY_PURGE_INTERVAL_SECONDS),
+        ("waitlist-expiry", expire_waitlist_job, settings.WAITLIST_EXPIRY_INTERVAL_SECONDS),
+        ("earnings-reconcile", reconcile_earnings_job, settings.EARNINGS_RECONCILE_INTERVAL_SECONDS),
+        ("payment-webhook-worker", process_webhook_events_job, settings.PAYMENT_WEBHOOK_INTERVAL_SECONDS),
+        ("payment-reconcile", reconcile_payments_job, settings.PAYMENT_RECONCILE_INTERVAL_SECONDS),
+        ("document-validation", validate_documents_job, settings.DOCUMENT_VALIDATION_INTERVAL_SECONDS),
+        ("rating-reconcile", reconcile_rating_summaries_job, settings.RATING_RECONCILE_INTERVAL_SECONDS),
+    ])
+    try:
+        yield
+    finally:
+        await stop_jobs(tasks)
+        shutdown_validation_pool()
+        await dispose_engines()
+
+
+def create_app() -> fastapi.FastAPI:
+    """
+    Build the application: middleware and routers only. Nothing here touches the
+    database or the network, that happens in the lifespan when the server starts.
+    """
+    app = fastapi.FastAPI(title="Smart Parking", lifespan=lifespan)
+
+    origins = [
+        "https://smart-parking-frontend.onrender.com",
+        "http://localhost:5173",
+    ]
+
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+        expose_headers=["Content-Disposition", "X-Next-Cursor", "X-Review-Count", "X-Rating-Average",
+                        "X-Rating-Histogram"]
+    )
+    app.add_middleware(SessionLeakMiddleware)
+    app.add_middleware(QueryCounterMiddleware)
+
+    app.include_router(auth.router, prefix="/api/v1/auth", tags=["Auth"])
+    app.include_router(user.router, prefix="/users", tags=["Users"])
+    app.include_router(booking.router, prefix="/bookings", tags=["Bookings"])
+    app.include_router(spot.router, prefix="/spots", tags=["Spots"])
+    app.include_router(parking.router, prefix="/spotdetails", tags=["Marker"])
+    app.include_router(review.router, prefix="/reviews", tags=["Review"])
+    app.include_router(send_pdf.router, prefix="/send-pdf", tags=["Send PDF"])
+    app.include_router(verification.router, prefix="/verify-list", tags=["Spot Verification"])
+    app.include_router(waitlist.router, prefix="/waitlist", tags=["Waitlist"])
+    app.include_router(pricing.router, prefix="/pricing", tags=["Pricing"])
+    app.include_router(analytics.router, prefix="/analytics", tags=["Analytics"])
+    app.include_router(notifications.router, prefix="/notifications", tags=["Notifications"])
+    app.include_router(webhooks.router, prefix="/webhooks", tags=["Webhooks"])
+    app.include_router(metrics.router, prefix="/metrics", tags=["Metrics"])
+    return app
+
+
+app = create_app()
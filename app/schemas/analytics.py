@@ -0,0 +1,24 @@
+from datetime import date, datetime
+from typing import Optional
+from pydantic import BaseModel
+from app.schemas.booking import LocalDateTime
+
+
+class AnalyticsRange(BaseModel):
+    start: LocalDateTime
+    end: LocalDateTime
+    spot_id: Optional[int] = None
+
+
+class OccupancyBucket(BaseModel):
+    bucket_start: datetime
+    bookings: int
+    cancellations: int
+    occupied_slot_hours: float
+    occupancy_rate: float
+
+
+class RevenueDay(BaseModel):
+    day: date
+    bookings: int
+    revenue: int
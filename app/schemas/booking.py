@@ -1,12 +1,26 @@
-from pydantic import BaseModel
+from datetime import datetime
+from typing import Annotated, List, Literal, Optional
+from zoneinfo import ZoneInfo
+from pydantic import AfterValidator, BaseModel, Field
+from app.core.config import settings
+
+
+def localize(value: datetime) -> datetime:
+    """Attach the platform timezone to booking times sent without an offset."""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=ZoneInfo(settings.DEFAULT_TIMEZONE))
+    return value
+
+
+LocalDateTime = Annotated[datetime, AfterValidator(localize)]
 
 
 class BookingCreate(BaseModel):
     user_id: str
     spot_id: int
     total_slots: int
-    start_date_time: str
-    end_date_time: str
+    start_date_time: LocalDateTime
+    end_date_time: LocalDateTime
     total_amount: int
     receipt: str
 
@@ -14,3 +28,16 @@ class BookingUpdate(BaseModel):
     spot_id: int
     total_slots: int
 
+
+class BookingHistoryQuery(BaseModel):
+    cursor: Optional[str] = None
+    limit: int = Field(settings.BOOKING_PAGE_SIZE, ge=1, le=settings.BOOKING_PAGE_MAX_SIZE)
+    status: Optional[List[str]] = None
+    start_from: Optional[LocalDateTime] = None
+    start_to: Optional[LocalDateTime] = None
+
+
+class BookingExportQuery(BaseModel):
+    format: Literal["ndjson", "csv"] = "ndjson"
+    start_from: Optional[LocalDateTime] = None
+    start_to: Optional[LocalDateTime] = None
@@ -0,0 +1,24 @@
+from typing import Optional
+from pydantic import BaseModel
+
+
+class PoolStatus(BaseModel):
+    name: str
+    size: int
+    max_overflow: int
+    checked_out: int
+    checked_in: int
+    overflow: int
+    peak_checked_out: int
+    checkouts: int
+    avg_wait_ms: float
+    max_wait_ms: float
+    timeouts: int
+    leaked_sessions: int
+
+
+class ReplicaStatus(BaseModel):
+    name: str
+    lag_seconds: Optional[float] = None
+    in_rotation: bool
+    error: Optional[str] = None
@@ -1,9 +1,10 @@
 from pydantic import BaseModel 
+from app.schemas.booking import LocalDateTime
 
 class Payment(BaseModel):
   payment_id: int
   razorpay_signature: str
   razorpay_payment_id: str
-  start_time: str
-  end_time: str
-  total_slots: int
\ No newline at end of file
+  start_time: LocalDateTime
+  end_time: LocalDateTime
+  total_slots: int
@@ -0,0 +1,21 @@
+from typing import List, Optional
+from pydantic import BaseModel, Field
+from app.core.config import settings
+from app.schemas.booking import LocalDateTime
+
+
+class QuoteRequest(BaseModel):
+    spot_id: int
+    total_slots: int
+    start_date_time: LocalDateTime
+    end_date_time: LocalDateTime
+
+
+class BatchQuoteRequest(BaseModel):
+    items: List[QuoteRequest] = Field(..., max_length=settings.PRICING_MAX_BATCH_SIZE)
+
+
+class Quote(QuoteRequest):
+    billed_hours: Optional[int] = None
+    amount: Optional[int] = None
+    error: Optional[str] = None
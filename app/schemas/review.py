@@ -1,6 +1,7 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Dict, Literal, Optional
 from datetime import datetime
+from app.core.config import settings
 
 
 class ReviewBase(BaseModel):
@@ -36,3 +37,17 @@ class Review(ReviewInDBBase):
 
 class ReviewInDB(ReviewInDBBase):
     pass
+
+
+class ReviewPageQuery(BaseModel):
+    cursor: Optional[str] = None
+    limit: int = Field(settings.REVIEW_PAGE_SIZE, ge=1, le=settings.REVIEW_PAGE_MAX_SIZE)
+    sort: Literal["newest", "highest", "lowest"] = "newest"
+    include_images: bool = True
+
+
+class RatingSummary(BaseModel):
+    spot_id: int
+    review_count: int
+    average_rating: Optional[float] = None
+    histogram: Dict[int, int]  # stars -> number of reviews
@@ -1,12 +1,17 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field
+from typing import List, Optional
 from datetime import datetime
+from app.core.config import settings
 
 class DocumentInfo(BaseModel):
+    document_id: int
     file_name: str
     file_type: str
-    file_data: str
+    url: str
     uploaded_at: Optional[datetime]
+    status: str  # pending, validating, valid or invalid
+    page_count: Optional[int] = None
+    validation_error: Optional[str] = None
 
 class SpotVerification(BaseModel):
     spot_id: int
@@ -16,4 +21,16 @@ class SpotVerification(BaseModel):
     owner_id: str
     identity_proof_document: DocumentInfo
     ownership_proof_document: DocumentInfo
-    supporting_document: Optional[DocumentInfo]
\ No newline at end of file
+    supporting_document: Optional[DocumentInfo]
+
+class VerificationClaim(BaseModel):
+    admin_id: str
+    limit: int = Field(settings.VERIFICATION_CLAIM_SIZE, ge=1, le=settings.VERIFICATION_CLAIM_MAX_SIZE)
+
+class VerificationDecision(BaseModel):
+    admin_id: str
+    spot_ids: List[int] = Field(..., min_length=1, max_length=settings.VERIFICATION_CLAIM_MAX_SIZE)
+
+class VerificationDecisionResult(BaseModel):
+    decided: List[int]
+    skipped: List[int]
\ No newline at end of file
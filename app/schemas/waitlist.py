@@ -0,0 +1,28 @@
+from datetime import datetime
+from typing import Optional
+from pydantic import BaseModel
+from app.schemas.booking import LocalDateTime
+
+
+class WaitlistJoin(BaseModel):
+    user_id: str
+    spot_id: int
+    total_slots: int
+    start_date_time: LocalDateTime
+    end_date_time: LocalDateTime
+
+
+class WaitlistClaim(BaseModel):
+    total_amount: int
+
+
+class WaitlistEntryInfo(BaseModel):
+    id: int
+    user_id: str
+    spot_id: int
+    total_slots: int
+    start_date_time: datetime
+    end_date_time: datetime
+    status: str
+    offered_until: Optional[datetime] = None
+    position: Optional[int] = None
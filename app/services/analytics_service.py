@@ -0,0 +1,139 @@
+from datetime import timedelta
+from typing import List
+from zoneinfo import ZoneInfo
+from sqlalchemy import func, text
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db.analytics_model import SpotHourlyRollup
+from app.db.spot_model import Spot
+from app.schemas.analytics import AnalyticsRange, OccupancyBucket, RevenueDay
+
+# Spreads one booking over the local hours it covers. Counts and revenue go to the
+# hour the booking starts in, occupied slot-hours to every hour it overlaps.
+_ROLLUP_UPSERT = text("""
+    INSERT INTO spot_hourly_rollups AS r
+        (spot_id, bucket_start, bookings, cancellations, occupied_slot_hours, revenue)
+    SELECT :spot_id, bucket,
+           CASE WHEN bucket = first_bucket THEN :bookings ELSE 0 END,
+           CASE WHEN bucket = first_bucket THEN :cancellations ELSE 0 END,
+           :slot_sign * :total_slots * GREATEST(EXTRACT(EPOCH FROM
+               LEAST(bucket + interval '1 hour', :end_at) - GREATEST(bucket, :start_at)), 0) / 3600,
+           CASE WHEN bucket = first_bucket THEN :revenue ELSE 0 END
+    FROM (SELECT date_trunc('hour', CAST(:start_at AS timestamptz), :tz) AS first_bucket) AS f,
+         generate_series(f.first_bucket,
+                         GREATEST(CAST(:end_at AS timestamptz) - interval '1 microsecond', f.first_bucket),
+                         interval '1 hour') AS bucket
+    ON CONFLICT (spot_id, bucket_start) DO UPDATE SET
+        bookings = r.bookings + EXCLUDED.bookings,
+        cancellations = r.cancellations + EXCLUDED.cancellations,
+        occupied_slot_hours = r.occupied_slot_hours + EXCLUDED.occupied_slot_hours,
+        revenue = r.revenue + EXCLUDED.revenue
+""")
+
+
+def _apply(db: Session, booking, bookings: int, cancellations: int, slot_sign: int, revenue: int):
+    db.execute(_ROLLUP_UPSERT, {
+        "spot_id": booking.spot_id,
+        "start_at": booking.start_date_time,
+        "end_at": booking.end_date_time,
+        "total_slots": booking.total_slots,
+        "bookings": bookings,
+        "cancellations": cancellations,
+        "slot_sign": slot_sign,
+        "revenue": revenue,
+        "tz": settings.DEFAULT_TIMEZONE,
+    })
+
+
+def record_booking(db: Session, booking, amount: int):
+    """Add a paid booking to the rollups, in the caller's transaction."""
+    _apply(db, booking, bookings=1, cancellations=0, slot_sign=1, revenue=amount)
+
+
+def record_cancellation(db: Session, booking):
+    """Take a cancelled booking's slots out of the occupancy rollups, in the caller's transaction."""
+    _apply(db, booking, bookings=0, cancellations=1, slot_sign=-1, revenue=0)
+
+
+def _check_range(window: AnalyticsRange):
+    if window.end <= window.start:
+        raise ValueError("Range must end after it starts")
+    if window.end - window.start > timedelta(days=settings.ANALYTICS_MAX_RANGE_DAYS):
+        raise ValueError(f"Range cannot exceed {settings.ANALYTICS_MAX_RANGE_DAYS} days")
+
+
+def _owner_rollups(db: Session, owner_id: str, window: AnalyticsRange, *columns):
+    query = (
+        db.query(*columns)
+        .join(Spot, SpotHourlyRollup.spot_id == Spot.spot_id)
+        .filter(Spot.owner_id == owner_id)
+        .filter(SpotHourlyRollup.bucket_start >= window.start,
+                SpotHourlyRollup.bucket_start < window.end)
+    )
+    if window.spot_id is not None:
+        query = query.filter(SpotHourlyRollup.spot_id == window.spot_id)
+    return query
+
+
+def get_owner_occupancy(db: Session, owner_id: str, window: AnalyticsRange) -> List[OccupancyBucket]:
+    """
+    Hourly occupancy of an owner's spots, read from the rollups.
+    Hours without any booking are left out, hours are reported in the platform timezone.
+
+    Parameters:
+        db (Session): SQLAlchemy database session
+        owner_id (str): Owner whose spots are reported
+        window (AnalyticsRange): Time range, optionally narrowed to one spot
+
+    Returns:
+        List[OccupancyBucket]: One entry per hour, occupancy_rate relative to the slots of the spots
+
+    Raises:
+        ValueError: If the range is empty or too long.
+    """
+    _check_range(window)
+    capacity_query = db.query(func.coalesce(func.sum(Spot.no_of_slots), 0)).filter(Spot.owner_id == owner_id)
+    if window.spot_id is not None:
+        capacity_query = capacity_query.filter(Spot.spot_id == window.spot_id)
+    capacity = capacity_query.scalar()
+
+    rows = _owner_rollups(
+        db, owner_id, window,
+        SpotHourlyRollup.bucket_start,
+        func.sum(SpotHourlyRollup.bookings).label("bookings"),
+        func.sum(SpotHourlyRollup.cancellations).label("cancellations"),
+        func.sum(SpotHourlyRollup.occupied_slot_hours).label("occupied_slot_hours"),
+    ).group_by(SpotHourlyRollup.bucket_start).order_by(SpotHourlyRollup.bucket_start).all()
+
+    local = ZoneInfo(settings.DEFAULT_TIMEZONE)
+    return [
+        OccupancyBucket(
+            bucket_start=row.bucket_start.astimezone(local),
+            bookings=row.bookings,
+            cancellations=row.cancellations,
+            occupied_slot_hours=round(row.occupied_slot_hours, 4),
+            occupancy_rate=round(row.occupied_slot_hours / capacity, 4) if capacity else 0.0,
+        )
+        for row in rows
+    ]
+
+
+def get_owner_revenue(db: Session, owner_id: str, window: AnalyticsRange) -> List[RevenueDay]:
+    """
+    Daily bookings and revenue of an owner's spots, summed from the hourly rollups
+    by local day.
+
+    Raises:
+        ValueError: If the range is empty or too long.
+    """
+    _check_range(window)
+    day = func.date_trunc("day", SpotHourlyRollup.bucket_start, settings.DEFAULT_TIMEZONE)
+    local_day = func.timezone(settings.DEFAULT_TIMEZONE, day).label("day")
+    rows = _owner_rollups(
+        db, owner_id, window,
+        local_day,
+        func.sum(SpotHourlyRollup.bookings).label("bookings"),
+        func.sum(SpotHourlyRollup.revenue).label("revenue"),
+    ).group_by(local_day).order_by(local_day).all()
+
+    return [RevenueDay(day=row.day.date(), bookings=row.bookings, revenue=row.revenue) for row in rows]
@@ -1,20 +1,42 @@
+import csv
+import hashlib
+import hmac
+import io
+import json
 import razorpay
-from sqlalchemy.orm import Session
+from functools import lru_cache
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
 from app.core.config import settings
 from app.db.booking_model import Booking
 from app.db.payment_model import Payment
 from app.db.oauth_model import OAuthUser
 from app.db.spot_model import Spot
+from app.db.waitlist_model import WaitlistEntry
+from app.schemas.booking import BookingCreate, BookingHistoryQuery, BookingExportQuery
+from app.core.pagination import encode_cursor, decode_cursor
 from fastapi import HTTPException
-from sqlalchemy import text
+from sqlalchemy import select, text, tuple_, update
 from sqlalchemy.exc import IntegrityError
-from datetime import datetime
+from app.services.sweeper_service import release_missed_bookings
+from app.services.waitlist_service import hold_released_slots
+from app.services.pricing_service import quote_amount, quote_error
+from app.services.analytics_service import record_booking, record_cancellation
+from app.services.earnings_service import record_earning
+from app.services.parking_service import publish_availability
+from app.services.notification_service import notify_booking
+from datetime import datetime, timezone
 
 # Load Razorpay keys
 RAZORPAY_KEY_ID = settings.RAZORPAY_KEY_ID
 RAZORPAY_KEY_SECRET = settings.RAZORPAY_KEY_SECRET
 
-razorpay_client = razorpay.Client(auth=(RAZORPAY_KEY_ID, RAZORPAY_KEY_SECRET))
+
+@lru_cache()
+def get_razorpay_client() -> razorpay.Client:
+    """Razorpay client, built on first use instead of when the module is imported."""
+    return razorpay.Client(auth=(RAZORPAY_KEY_ID, RAZORPAY_KEY_SECRET))
+
 
 # Custom Exceptions
 
@@ -27,6 +49,26 @@ class SlotUnavailableException(Exception):
         super().__init__(self.message)
 
 
+class PriceMismatchException(Exception):
+    """Raised when the amount sent by the client differs from the server side quote."""
+
+    def __init__(self, quoted_amount: int):
+        self.quoted_amount = quoted_amount
+        self.message = f"Amount does not match the quoted price of {quoted_amount}."
+        super().__init__(self.message)
+
+
+def _check_amount(spot, booking_data):
+    """Reject windows that cannot be quoted and amounts that differ from the quote for the window."""
+    error = quote_error(booking_data, spot)
+    if error:
+        raise HTTPException(status_code=400, detail=error)
+    quoted = quote_amount(spot.hourly_rate, booking_data.total_slots,
+                          booking_data.start_date_time, booking_data.end_date_time)
+    if booking_data.total_amount != quoted:
+        raise PriceMismatchException(quoted)
+
+
 class PaymentFailedException(Exception):
     """Raised when the payment process fails."""
 
@@ -44,12 +86,12 @@ class BookingFailedException(Exception):
 
 
 # Check slot availability before processing payment
-def check_available_slots(db: Session, spot_id: int, total_slots: int):
+async def check_available_slots(db: AsyncSession, spot_id: int, total_slots: int):
     """
     Check if the required number of slots are available for booking.
 
     Parameters:
-        db (Session): SQLAlchemy database session
+        db (AsyncSession): SQLAlchemy database session
         spot_id (int): Spot ID
         total_slots (int): Number of slots to book
 
@@ -63,7 +105,7 @@ def check_available_slots(db: Session, spot_id: int, total_slots: int):
     """
     try:
         query = text("SELECT * FROM spots WHERE spot_id = :spot_id")
-        result = db.execute(query, {"spot_id": spot_id})
+        result = await db.execute(query, {"spot_id": spot_id})
         spot = result.fetchone()
 
         if not spot:
@@ -75,33 +117,76 @@ def check_available_slots(db: Session, spot_id: int, total_slots: int):
             query = text(
                 "UPDATE spots SET available_slots = available_slots - :total_slots WHERE spot_id = :spot_id"
             )
-            db.execute(query, {"spot_id": spot_id, "total_slots": total_slots})
-            db.commit()
+            await db.execute(query, {"spot_id": spot_id, "total_slots": total_slots})
+            await db.commit()
+            await db.run_sync(publish_availability, [spot_id])
             return True
         else:
             return False
 
     except SlotUnavailableException as slot_error:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=400, detail=str(slot_error))
 
     except Exception as db_error:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=500, detail=f"Database error: {str(db_error)}")
 
+async def _create_payment_order(db: AsyncSession, booking_data):
+    """
+    Create the Razorpay order for a booking and the pending Payment row tracking it.
+    Runs inside the caller's transaction, which is responsible for holding the slots.
+    The Razorpay SDK is blocking, so the order is created in the threadpool.
+    """
+    try:
+        order_data = {
+            "amount": booking_data.total_amount * 100,
+            "currency": "INR",
+            "receipt": f"receipt_{booking_data.user_id}",
+            "payment_capture": 1
+        }
+        razorpay_order = await run_in_threadpool(get_razorpay_client().order.create, order_data)
+    except Exception as payment_error:
+        raise HTTPException(status_code=402, detail=f"Razorpay Error: {str(payment_error)}")
+
+    new_payment = Payment(
+        user_id=booking_data.user_id,
+        spot_id=booking_data.spot_id,
+        amount=booking_data.total_amount,
+        razorpay_order_id=razorpay_order["id"],
+        status="pending",
+        total_slots=booking_data.total_slots,
+        start_date_time=booking_data.start_date_time,
+        end_date_time=booking_data.end_date_time,
+    )
+    db.add(new_payment)
+    return razorpay_order, new_payment
+
+
+def _order_details(razorpay_order, payment: Payment):
+    return {
+        "order_id": razorpay_order["id"],
+        "amount": razorpay_order["amount"],
+        "currency": razorpay_order["currency"],
+        "payment_id": payment.id,
+        "payment_status": "pending",
+        "receipt": razorpay_order["receipt"]
+    }
+
 # Create a new booking
 
 
-async def create_booking(db: Session, booking_data):
+async def create_booking(db: AsyncSession, booking_data):
     """
     Create a new booking for the user and add the details to the database.
-    first check if the required number of slots are available for booking.
+    first check if the required number of slots are available for booking,
+    and that total_amount matches the server side quote for the window.
     then create a Razorpay order for the payment.
     store the payment info in the database.
    
     Parameters:
-        db (Session): SQLAlchemy database session
+        db (AsyncSession): SQLAlchemy database session
         booking_data (BookingCreate): Booking data
 
     Returns:
@@ -113,40 +198,33 @@ async def create_booking(db: Session, booking_data):
         return order details else raise an exception
     """
     try:
-        with db.begin():  # SQLAlchemy recommended transaction
+        async with db.begin():  # SQLAlchemy recommended transaction
+            # Cheap unlocked check first, so sold out spots don't queue up on the row lock
+            spot = (await db.execute(text(
+                "SELECT available_slots, hourly_rate, no_of_slots FROM spots WHERE spot_id = :spot_id"
+            ), {"spot_id": booking_data.spot_id})).fetchone()
+
+            if spot is None:
+                raise HTTPException(status_code=400, detail="No Slot Available")
+            _check_amount(spot, booking_data)
+            if spot.available_slots < booking_data.total_slots:
+                raise SlotUnavailableException("No Slot Available. Join the waitlist to be offered the next free slot.")
+
             # Lock and check availability
-            slot = db.execute(text("""
+            slot = (await db.execute(text("""
                 SELECT * FROM spots
                 WHERE spot_id = :spot_id AND available_slots >= :total_slots
                 FOR UPDATE
             """), {
                 "spot_id": booking_data.spot_id,
                 "total_slots": booking_data.total_slots
-            }).fetchone()
+            })).fetchone()
 
             if not slot:
-                raise HTTPException(status_code=400, detail="No Slot Available")
+                raise SlotUnavailableException("No Slot Available. Join the waitlist to be offered the next free slot.")
 
-            try:
-                order_data = {
-                    "amount": booking_data.total_amount * 100,
-                    "currency": "INR",
-                    "receipt": f"receipt_{booking_data.user_id}",
-                    "payment_capture": 1
-                }
-                razorpay_order = razorpay_client.order.create(order_data)
-            except Exception as payment_error:
-                raise HTTPException(status_code=402, detail=f"Razorpay Error: {str(payment_error)}")
-
-            new_payment = Payment(
-                user_id=booking_data.user_id,
-                spot_id=booking_data.spot_id,
-                amount=booking_data.total_amount,
-                razorpay_order_id=razorpay_order["id"],
-                status="pending"
-            )
-            db.add(new_payment)
-            db.execute(text("""
+            razorpay_order, new_payment = await _create_payment_order(db, booking_data)
+            await db.execute(text("""
                 UPDATE spots SET available_slots = available_slots - :total_slots
                 WHERE spot_id = :spot_id
             """), {
@@ -154,17 +232,11 @@ async def create_booking(db: Session, booking_data):
                 "total_slots": booking_data.total_slots
             })
 
-        db.refresh(new_payment)
-        return {
-            "order_id": razorpay_order["id"],
-            "amount": razorpay_order["amount"],
-            "currency": razorpay_order["currency"],
-            "payment_id": new_payment.id,
-            "payment_status": "pending",
-            "receipt": razorpay_order["receipt"]
-        }
+        await db.refresh(new_payment)
+        await db.run_sync(publish_availability, [booking_data.spot_id])
+        return _order_details(razorpay_order, new_payment)
 
-    except HTTPException as http_error:
+    except (HTTPException, SlotUnavailableException, PriceMismatchException) as http_error:
         raise http_error
 
     except IntegrityError as db_error:
@@ -173,97 +245,173 @@ async def create_booking(db: Session, booking_data):
     except Exception as unexpected_error:
         raise HTTPException(status_code=500, detail=f"Unexpected error: {str(unexpected_error)}")
 
-async def update_booking(db: Session, payment_data: Payment):
+async def claim_waitlist_offer(db: AsyncSession, entry_id: int, total_amount: int):
+    """
+    Turn a waitlist offer into a pending booking payment.
+    The slots were already held for the entry when the offer was made,
+    so only the Razorpay order and the Payment row are created here.
+
+    Parameters:
+        db (AsyncSession): SQLAlchemy database session
+        entry_id (int): Waitlist entry holding the offer
+        total_amount (int): Amount to charge
+
+    Returns:
+        dict: Order details, same as create_booking
+
+    Raises:
+        KeyError: If the entry is not found.
+        ValueError: If the entry has no open offer.
+    """
+    try:
+        entry = (await db.execute(
+            select(WaitlistEntry).where(WaitlistEntry.id == entry_id).with_for_update())).scalars().first()
+        if not entry:
+            raise KeyError("Waitlist entry not found")
+        if entry.status != "offered" or entry.offered_until < datetime.now(timezone.utc):
+            raise ValueError("There is no open offer for this waitlist entry")
+
+        spot = (await db.execute(
+            select(Spot.hourly_rate, Spot.no_of_slots).where(Spot.spot_id == entry.spot_id))).first()
+        booking_data = BookingCreate(
+            user_id=entry.user_id,
+            spot_id=entry.spot_id,
+            total_slots=entry.total_slots,
+            start_date_time=entry.start_date_time,
+            end_date_time=entry.end_date_time,
+            total_amount=total_amount,
+            receipt=f"waitlist_{entry.id}",
+        )
+        _check_amount(spot, booking_data)
+        razorpay_order, new_payment = await _create_payment_order(db, booking_data)
+        entry.status = "claimed"
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
+
+    await db.refresh(new_payment)
+    return _order_details(razorpay_order, new_payment)
+
+
+# Marks the payment successful and books it in one statement, for the slots and window
+# the payment was quoted and held for. A payment that is already successful matches no
+# row, so concurrent or repeated confirmations book once. Abandoned payments already gave
+# their slots back and are not booked either.
+_CONFIRM_PAYMENT = text("""
+    WITH confirmed AS (
+        UPDATE payments
+        SET status = 'success', razorpay_payment_id = :razorpay_payment_id,
+            razorpay_signature = :razorpay_signature
+        WHERE id = :payment_id AND status IN ('pending', 'failed')
+        RETURNING id, user_id, spot_id, amount, razorpay_order_id, total_slots, start_date_time, end_date_time
+    )
+    INSERT INTO bookings (user_id, spot_id, total_slots, start_date_time, end_date_time, payment_id, status)
+    SELECT user_id, spot_id, total_slots, start_date_time, end_date_time, id, 'Booked' FROM confirmed
+    RETURNING id, spot_id, total_slots, start_date_time, end_date_time,
+              (SELECT amount FROM confirmed) AS amount,
+              (SELECT razorpay_order_id FROM confirmed) AS razorpay_order_id
+""")
+
+
+def verify_payment_signature(razorpay_order_id: str, razorpay_payment_id: str, signature: str) -> bool:
+    """
+    Check the signature Razorpay checkout returns to the client: the hex HMAC-SHA256 of
+    "order_id|payment_id" keyed with RAZORPAY_KEY_SECRET. Computed locally, compared in constant time.
+    """
+    message = f"{razorpay_order_id}|{razorpay_payment_id}".encode()
+    expected = hmac.new(str(RAZORPAY_KEY_SECRET).encode(), message, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature or "")
+
+
+def _payment_status(payment):
+    return {
+        "payment_status": payment.status,
+        "razorpay_signature": payment.razorpay_signature,
+        "razorpay_order_id": payment.razorpay_order_id
+    }
+
+
+async def update_booking(db: AsyncSession, payment_data: Payment):
     """
-    Update the payment status, create booking, and update spot availability.
-    also handling a concurrency issue by locking the payment and spot rows.
-    if the payment is successful, create a booking and update the spot availability.
-    else exception is raised and the spot availability is restored.
+    Confirm a payment and create its booking.
+    The signature is checked against the payment's order before anything is written.
+    The payment update and the booking insert are then a single statement, and the
+    booking takes the slots and window stored with the payment when it was created;
+    the ones sent with the confirmation are ignored. Confirming a payment that is
+    already successful (by an earlier call or the webhook worker) returns its status
+    without booking again.
 
     Parameters:
-        db (Session): SQLAlchemy database session
+        db (AsyncSession): SQLAlchemy database session
         payment_data (Payment): Payment data
 
     Returns:
         dict: Payment status and Razorpay details
-    
+
+    Raises:
+        HTTPException:
+            400: If the signature does not match the order
+            404: If the payment is not found
+            409: If the payment has no booking window stored with it
+
     Example:
         update_booking(db, payment_data)
         update the payment status and create a booking
         return payment status and Razorpay details else raise an exception
     """
     try:
-       
-        # Start a transaction block
-        payment = db.query(Payment).filter(Payment.id == payment_data.payment_id).with_for_update().one_or_none()
-
+        payment_query = select(Payment.status, Payment.razorpay_signature, Payment.razorpay_order_id,
+                               Payment.total_slots).where(Payment.id == payment_data.payment_id)
+        payment = (await db.execute(payment_query)).first()
         if not payment:
             raise HTTPException(status_code=404, detail="Payment not found.")
-
-        # Update payment details
-        payment.status = "success"
-        payment.razorpay_signature = payment_data.razorpay_signature
-        payment.razorpay_payment_id = payment_data.razorpay_payment_id
-        db.commit()
-        db.refresh(payment)
-
-        # Create booking only if payment is successful
-        if payment.status == "success":
-           
-            # Lock the Spot row to prevent race condition
-            spot = db.query(Spot).filter(Spot.spot_id == payment.spot_id).with_for_update().one_or_none()
-
-            if not spot:
-                raise HTTPException(status_code=404, detail="Spot not found.")
-
-            booking = Booking(
-                user_id=payment.user_id,
-                spot_id=payment.spot_id,
-                start_date_time=payment_data.start_time,
-                end_date_time=payment_data.end_time,
-                payment_id=payment.id,
-                total_slots=payment_data.total_slots,
-                status="Booked"
-            )
-
-            db.add(booking)
-           
-            db.commit()
-            db.refresh(booking)
-
-            print("Booking created successfully")
+        if payment.status not in ("pending", "failed"):
+            await db.rollback()
+            return _payment_status(payment)
+        if not verify_payment_signature(payment.razorpay_order_id, payment_data.razorpay_payment_id,
+                                        payment_data.razorpay_signature):
+            raise HTTPException(status_code=400, detail="Invalid payment signature.")
+        if payment.total_slots is None:
+            raise HTTPException(status_code=409, detail="Payment has no booking window.")
+
+        booking = (await db.execute(_CONFIRM_PAYMENT, {
+            "payment_id": payment_data.payment_id,
+            "razorpay_payment_id": payment_data.razorpay_payment_id,
+            "razorpay_signature": payment_data.razorpay_signature,
+        })).first()
+        if booking is None:
+            # Settled by a concurrent confirmation or the webhook worker meanwhile
+            await db.rollback()
+            return _payment_status((await db.execute(payment_query)).first())
+
+        await db.run_sync(record_booking, booking, booking.amount)
+        await db.run_sync(record_earning, booking.spot_id, booking.amount)
+        await db.commit()
+        await db.run_sync(notify_booking, booking.id, "created")
 
         return {
-            "payment_status": payment.status,
-            "razorpay_signature": payment.razorpay_signature,
-            "razorpay_order_id": payment.razorpay_order_id
+            "payment_status": "success",
+            "razorpay_signature": payment_data.razorpay_signature,
+            "razorpay_order_id": booking.razorpay_order_id
         }
 
     except HTTPException as http_err:
-        db.rollback()
+        await db.rollback()
         print("Handled error:", http_err.detail)
         raise http_err
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         print("Unhandled error:", str(e))
         raise HTTPException(status_code=500, detail="An unexpected error occurred while processing your booking.")
-    finally:
-        try:
-            if not (payment and payment.status == "success"):
-                spot.available_slots += payment_data.total_slots
-                db.commit()
-        except Exception as e:
-            print("Error during slot release in finally block:", str(e))
-        finally:
-            db.close()
 
 
-async def get_bookings(db: Session):
+async def get_bookings(db: AsyncSession):
     """
     Retrieve all bookings from the database with additional fields from Spot and Payment tables.
 
     Parameters:
-        db (Session): SQLAlchemy database session
+        db (AsyncSession): SQLAlchemy database session
 
     Returns:
         List[dict]: List of all bookings with additional fields
@@ -274,8 +422,8 @@ async def get_bookings(db: Session):
         return list of all bookings with additional fields
     """
     try:
-        bookings = (
-            db.query(
+        bookings = (await db.execute(
+            select(
                 Booking,
                 Spot.spot_title,
                 Spot.address.label("spot_address"),
@@ -284,8 +432,7 @@ async def get_bookings(db: Session):
             )
             .join(Spot, Booking.spot_id == Spot.spot_id)
             .join(Payment, Booking.payment_id == Payment.id)
-            .all()
-        )
+        )).all()
 
         return [
             {
@@ -309,207 +456,265 @@ async def get_bookings(db: Session):
             status_code=500, detail=f"Database error: {str(db_error)}")
 
 
-async def get_booking_by_user(db: Session, user_id: int):
+# Columns of a booking history row, shared by the user, spot and owner views
+_HISTORY_COLUMNS = (
+    Booking.id,
+    Booking.user_id,
+    Booking.spot_id,
+    Spot.spot_title,
+    Spot.address.label("spot_address"),
+    Booking.total_slots,
+    Booking.start_date_time,
+    Booking.end_date_time,
+    Booking.payment_id,
+    Payment.amount.label("payment_amount"),
+    Payment.status.label("payment_status"),
+    Booking.status,
+)
+
+
+async def _booking_page(db: AsyncSession, stmt, page: BookingHistoryQuery):
     """
-    Retrieve all bookings for a specific user with additional fields from Spot and Payment tables.
+    Apply the history filters and one keyset page, newest first, to a booking query and run it.
+    Filters run in SQL and at most limit + 1 rows are read, whatever the size of the history.
+
+    Returns:
+        dict: "items" of the page and "next_cursor", None on the last page
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    if page.cursor:
+        after_start, after_id = decode_cursor(page.cursor)
+        stmt = stmt.where(
+            Booking.start_date_time <= after_start,
+            tuple_(Booking.start_date_time, Booking.id) < tuple_(after_start, after_id))
+    if page.status:
+        stmt = stmt.where(Booking.status.in_(page.status))
+    if page.start_from:
+        stmt = stmt.where(Booking.start_date_time >= page.start_from)
+    if page.start_to:
+        stmt = stmt.where(Booking.start_date_time < page.start_to)
+
+    rows = (await db.execute(
+        stmt.order_by(Booking.start_date_time.desc(), Booking.id.desc()).limit(page.limit + 1))).all()
+    next_cursor = None
+    if len(rows) > page.limit:
+        rows = rows[:page.limit]
+        next_cursor = encode_cursor(rows[-1].start_date_time, rows[-1].id)
+    return {"items": [dict(row._mapping) for row in rows], "next_cursor": next_cursor}
+
+
+def _export_value(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+async def export_bookings(db: AsyncSession, export: BookingExportQuery):
+    """
+    Stream every booking, with the same fields as the history views, as NDJSON or CSV.
+    Rows are read through a server side cursor BOOKING_EXPORT_BATCH_SIZE at a time and
+    each batch is written out before the next is fetched, so memory stays flat whatever
+    the number of bookings. The caller keeps the session open until the stream ends.
 
     Parameters:
-        db (Session): SQLAlchemy database session
+        db (AsyncSession): SQLAlchemy database session
+        export (BookingExportQuery): Output format and optional start time range
+
+    Yields:
+        str: Chunks of the export
+    """
+    stmt = (
+        select(*_HISTORY_COLUMNS)
+        .join(Spot, Booking.spot_id == Spot.spot_id)
+        .join(Payment, Booking.payment_id == Payment.id)
+        .order_by(Booking.id)
+    )
+    if export.start_from:
+        stmt = stmt.where(Booking.start_date_time >= export.start_from)
+    if export.start_to:
+        stmt = stmt.where(Booking.start_date_time < export.start_to)
+
+    result = await db.stream(stmt, execution_options={"yield_per": settings.BOOKING_EXPORT_BATCH_SIZE})
+    columns = list(result.keys())
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if export.format == "csv":
+        writer.writerow(columns)
+
+    async for rows in result.partitions():
+        for row in rows:
+            if export.format == "csv":
+                writer.writerow([_export_value(value) for value in row])
+            else:
+                buffer.write(json.dumps(dict(zip(columns, map(_export_value, row)))))
+                buffer.write("\n")
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+async def get_booking_by_user(db: AsyncSession, user_id: int, page: BookingHistoryQuery = None):
+    """
+    Retrieve one page of the bookings of a specific user with additional fields from Spot and Payment tables.
+
+    Parameters:
+        db (AsyncSession): SQLAlchemy database session
         user_id (int): User ID
+        page (BookingHistoryQuery, optional): Cursor, page size and filters
 
     Returns:
-        List[dict]: List of bookings for the specified user with additional fields
+        dict: Bookings of the page, newest first, and the cursor of the next page
 
     Example:
         get_booking_by_user(db, 1)
-        retrieve all bookings for user ID 1
-        return list of bookings for the user with additional fields
+        retrieve the latest bookings for user ID 1
+        return the page and the cursor to continue from
     """
     try:
-        bookings = (
-            db.query(
-                Booking,
-                Spot.spot_title,
-                Spot.address.label("spot_address"),
-                Payment.amount,
-                Payment.status.label("payment_status")
-            )
+        stmt = (
+            select(*_HISTORY_COLUMNS)
             .join(Spot, Booking.spot_id == Spot.spot_id)
             .join(Payment, Booking.payment_id == Payment.id)
-            .filter(Booking.user_id == str(user_id))
-            .all()
+            .where(Booking.user_id == str(user_id))
         )
-
-        return [
-            {
-                "id": booking.Booking.id,
-                "user_id": booking.Booking.user_id,
-                "spot_id": booking.Booking.spot_id,
-                "spot_title": booking.spot_title,
-                "spot_address": booking.spot_address,
-                "total_slots": booking.Booking.total_slots,
-                "start_date_time": booking.Booking.start_date_time,
-                "end_date_time": booking.Booking.end_date_time,
-                "payment_id": booking.Booking.payment_id,
-                "payment_amount": booking.amount,
-                "payment_status": booking.payment_status,
-                "status": booking.Booking.status
-            }
-            for booking in bookings
-        ]
+        return await _booking_page(db, stmt, page or BookingHistoryQuery())
+    except ValueError:
+        raise
     except Exception as db_error:
         raise HTTPException(
             status_code=500, detail=f"Database error: {str(db_error)}")
 
 
-async def get_booking_by_spot(db: Session, spot_id: int):
+async def get_booking_by_spot(db: AsyncSession, spot_id: int, page: BookingHistoryQuery = None):
     """
-    Retrieve all bookings for a specific spot with additional fields from Spot and Payment tables.
+    Retrieve one page of the bookings of a specific spot with additional fields from Spot and Payment tables.
 
     Parameters:
-        db (Session): SQLAlchemy database session
+        db (AsyncSession): SQLAlchemy database session
         spot_id (int): Spot ID
+        page (BookingHistoryQuery, optional): Cursor, page size and filters
 
     Returns:
-        List[dict]: List of bookings for the specified spot with additional fields
+        dict: Bookings of the page, newest first, and the cursor of the next page
 
     Example:
         get_booking_by_spot(db, 1)
-        retrieve all bookings for spot ID 1
-        return list of bookings for the spot with additional fields
+        retrieve the latest bookings for spot ID 1
+        return the page and the cursor to continue from
     """
     try:
-        bookings = (
-            db.query(
-                Booking,
-                OAuthUser.name.label("user_name"),
-                Spot.spot_title,
-                Spot.address.label("spot_address"),
-                Payment.amount,
-                Payment.status.label("payment_status")
-            )
+        stmt = (
+            select(*_HISTORY_COLUMNS, OAuthUser.name.label("user_name"))
             .join(Spot, Booking.spot_id == Spot.spot_id)
             .join(Payment, Booking.payment_id == Payment.id)
             .join(OAuthUser, Booking.user_id == OAuthUser.provider_id)  # Corrected join
-            .filter(Booking.spot_id == spot_id)
-            .all()
+            .where(Booking.spot_id == spot_id)
         )
-
-        return [
-            {
-                "id": booking.Booking.id,
-                "user_id": booking.Booking.user_id,
-                "user_name": booking.user_name,
-                "spot_id": booking.Booking.spot_id,
-                "spot_title": booking.spot_title,
-                "spot_address": booking.spot_address,
-                "total_slots": booking.Booking.total_slots,
-                "start_date_time": booking.Booking.start_date_time,
-                "end_date_time": booking.Booking.end_date_time,
-                "payment_id": booking.Booking.payment_id,
-                "payment_amount": booking.amount,
-                "payment_status": booking.payment_status,
-                "status": booking.Booking.status
-            }
-            for booking in bookings
-        ]
+        return await _booking_page(db, stmt, page or BookingHistoryQuery())
+    except ValueError:
+        raise
     except Exception as db_error:
         raise HTTPException(
             status_code=500, detail=f"Database error: {str(db_error)}")
 
 
-async def get_bookings_of_spots_of_owner(db: Session, user_id: int):
+async def get_bookings_of_spots_of_owner(db: AsyncSession, user_id: int, page: BookingHistoryQuery = None):
     """
-    Retrieve all bookings for the spots of a specific owner with additional fields from Spot and Payment tables.
+    Retrieve one page of the bookings for the spots of a specific owner with additional fields from Spot and Payment tables.
 
     Parameters:
-        db (Session): SQLAlchemy database session
+        db (AsyncSession): SQLAlchemy database session
         user_id (int): User ID
+        page (BookingHistoryQuery, optional): Cursor, page size and filters
 
     Returns:
-        List[dict]: List of bookings for the spots of the specified owner with additional fields
+        dict: Bookings of the page, newest first, and the cursor of the next page
 
     Example:
         get_bookings_of_spots_of_owner(db, 1)
-        retrieve all bookings for the spots of owner ID 1
-        return list of bookings for the spots of the owner with additional fields
+        retrieve the latest bookings for the spots of owner ID 1
+        return the page and the cursor to continue from
     """
     try:
-        bookings = (
-            db.query(
-                Booking,
-                Spot.spot_title,
-                Spot.address.label("spot_address"),
-                Payment.amount,
-                Payment.status.label("payment_status")
-            )
+        stmt = (
+            select(*_HISTORY_COLUMNS)
             .join(Spot, Booking.spot_id == Spot.spot_id)
             .join(Payment, Booking.payment_id == Payment.id)
-            .filter(Spot.owner_id == str(user_id))
-            .all()
+            .where(Spot.owner_id == str(user_id))
         )
-
-        return [
-            {
-                "id": booking.Booking.id,
-                "user_id": booking.Booking.user_id,
-                "spot_id": booking.Booking.spot_id,
-                "spot_title": booking.spot_title,
-                "spot_address": booking.spot_address,
-                "total_slots": booking.Booking.total_slots,
-                "start_date_time": booking.Booking.start_date_time,
-                "end_date_time": booking.Booking.end_date_time,
-                "payment_id": booking.Booking.payment_id,
-                "payment_amount": booking.amount,
-                "payment_status": booking.payment_status,
-                "status": booking.Booking.status
-            }
-            for booking in bookings
-        ]
+        return await _booking_page(db, stmt, page or BookingHistoryQuery())
+    except ValueError:
+        raise
     except Exception as db_error:
         raise HTTPException(
             status_code=500, detail=f"Database error: {str(db_error)}")
 
 
-async def cancel_booking(db: Session, booking_id):
+async def _raise_status_conflict(db: AsyncSession, booking_id, action: str):
+    """Raise the error of a guarded status change that matched no booking: unknown, or in the wrong status."""
+    status = (await db.execute(select(Booking.status).where(Booking.id == int(booking_id)))).scalar()
+    await db.rollback()
+    if status is None:
+        raise HTTPException(status_code=404, detail="Booking not found")
+    raise HTTPException(status_code=409, detail=f"A booking in status {status} cannot be {action}")
+
+
+async def cancel_booking(db: AsyncSession, booking_id):
     """
     Cancel a booking by updating its status to "Cancelled" in the database.
+    Only a "Booked" booking can be cancelled; the status change is guarded in the
+    UPDATE itself, so the slots are given back once however often it is called.
 
     Parameters:
-        db (Session): SQLAlchemy database session
+        db (AsyncSession): SQLAlchemy database session
         booking_id (int): The ID of the booking to be cancelled
 
     Returns:
-        int: The number of rows updated in the database (should be 1 if successful)
+        Booking: The cancelled booking
+
+    Raises:
+        HTTPException:
+            404: If the booking is not found
+            409: If the booking is not in the "Booked" status
 
     Example:
         cancel_booking(db, 123)
         cancel the booking with ID 123 by setting its status to "Cancelled"
-        return the number of rows updated
+        return the cancelled booking
     """
     try:
-        db.query(Booking).filter(Booking.id == str(booking_id)).update({
-            "status": "Cancelled"
-        })
-        booking = db.query(Booking).filter(Booking.id == str(booking_id)).one()
-        spot = db.query(Spot).filter(Booking.id == str(booking_id)).filter(
-            Booking.spot_id == Spot.spot_id).one()
-        db.query(Spot).filter(Booking.id == str(booking_id)).filter(Booking.spot_id == Spot.spot_id).update({
-            "available_slots": spot.available_slots + booking.total_slots
-        })
-        db.commit()
+        booking = (await db.execute(
+            update(Booking)
+            .where(Booking.id == int(booking_id), Booking.status == "Booked")
+            .values(status="Cancelled")
+            .returning(Booking)
+            .execution_options(synchronize_session=False))).scalars().first()
+        if booking is None:
+            await _raise_status_conflict(db, booking_id, "cancelled")
+        await db.run_sync(record_cancellation, booking)
+        await db.execute(update(Spot).where(Spot.spot_id == booking.spot_id).values(
+            available_slots=Spot.available_slots + booking.total_slots))
+        await db.run_sync(hold_released_slots, booking.spot_id)
+        await db.commit()
+        await db.run_sync(publish_availability, [booking.spot_id])
+        await db.run_sync(notify_booking, int(booking_id), "cancelled")
         return booking
+    except HTTPException as http_error:
+        await db.rollback()
+        raise http_error
     except Exception as db_error:
         raise HTTPException(
             status_code=500, detail=f"Database error: {str(db_error)}")
 
 
-async def check_in_booking(db: Session, booking_id):
+async def check_in_booking(db: AsyncSession, booking_id):
     """
     Check in a booking by updating its status to "Checked In" in the database.
 
     Parameters:
-        db (Session): SQLAlchemy database session
+        db (AsyncSession): SQLAlchemy database session
         booking_id (int): The ID of the booking to be checked in
 
     Returns:
@@ -521,55 +726,68 @@ async def check_in_booking(db: Session, booking_id):
         return the number of rows updated
     """
     try:
-        booking = db.query(Booking).filter(Booking.id == str(booking_id)).update({
-            "status": "Checked In"
-        })
-        db.commit()
+        booking = (await db.execute(
+            update(Booking).where(Booking.id == int(booking_id)).values(status="Checked In"))).rowcount
+        await db.commit()
+        await db.run_sync(notify_booking, int(booking_id), "checked_in")
         return booking
     except Exception as db_error:
         raise HTTPException(
             status_code=500, detail=f"Database error: {str(db_error)}")
 
 
-async def check_out_booking(db: Session, booking_id):
+async def check_out_booking(db: AsyncSession, booking_id):
     """
     Check out a booking by updating its status to "Completed" in the database.
+    Only a "Booked" or "Checked In" booking can be checked out, so its slots are
+    given back once.
 
     Parameters:
-        db (Session): SQLAlchemy database session
+        db (AsyncSession): SQLAlchemy database session
         booking_id (int): The ID of the booking to be checked out
 
     Returns:
-        int: The number of rows updated in the database (should be 1 if successful)
+        Booking: The completed booking
+
+    Raises:
+        HTTPException:
+            404: If the booking is not found
+            409: If the booking was already completed, cancelled or missed
 
     Example:
         check_out_booking(db, 123)
         check out the booking with ID 123 by setting its status to "Completed"
-        return the number of rows updated
+        return the completed booking
     """
     try:
-        db.query(Booking).filter(Booking.id == str(booking_id)).update({
-            "status": "Completed"
-        })
-
-        booking = db.query(Booking).filter(Booking.id == str(booking_id)).one()
-        spot = db.query(Spot).filter(Booking.id == str(booking_id)).filter(
-            Booking.spot_id == Spot.spot_id).one()
-        db.query(Spot).filter(Booking.id == str(booking_id)).filter(Booking.spot_id == Spot.spot_id).update({
-            "available_slots": spot.available_slots + booking.total_slots
-        })
-        db.commit()
+        booking = (await db.execute(
+            update(Booking)
+            .where(Booking.id == int(booking_id), Booking.status.in_(["Booked", "Checked In"]))
+            .values(status="Completed")
+            .returning(Booking)
+            .execution_options(synchronize_session=False))).scalars().first()
+        if booking is None:
+            await _raise_status_conflict(db, booking_id, "checked out")
+        await db.execute(update(Spot).where(Spot.spot_id == booking.spot_id).values(
+            available_slots=Spot.available_slots + booking.total_slots))
+        await db.run_sync(hold_released_slots, booking.spot_id)
+        await db.commit()
+        await db.run_sync(publish_availability, [booking.spot_id])
+        await db.run_sync(notify_booking, int(booking_id), "completed")
         return booking
+    except HTTPException as http_error:
+        await db.rollback()
+        raise http_error
     except Exception as db_error:
         raise HTTPException(
             status_code=500, detail=f"Database error: {str(db_error)}")
     
-async def update_available_slots(db: Session, booking_data):
+async def update_available_slots(db: AsyncSession, booking_data):
     """
     Update the booking slots for a specific booking.
 
     Parameters:
-        db (Session): SQLAlchemy database session
+        db (AsyncSession): SQLAlchemy database session
         booking_data (BookingUpdate): Booking data
 
     Returns:
@@ -581,21 +799,27 @@ async def update_available_slots(db: Session, booking_data):
         return updated booking details else raise an exception
     """
     try:
-        spot = db.query(Spot).filter(Spot.spot_id == booking_data.spot_id).with_for_update().one_or_none()
+        spot = (await db.execute(
+            select(Spot).where(Spot.spot_id == booking_data.spot_id).with_for_update())).scalar_one_or_none()
         spot.available_slots += booking_data.total_slots
-        db.commit()
+        await db.flush()
+        await db.run_sync(hold_released_slots, booking_data.spot_id)
+        await db.commit()
+        await db.run_sync(publish_availability, [booking_data.spot_id])
         return {"message": "Booking updated successfully"}
     except Exception as db_error:
         raise HTTPException(
             status_code=500, detail=f"Database error: {str(db_error)}")
 
-async def refresh_bookings(user_id, db:Session):
+async def refresh_bookings(user_id, db: AsyncSession):
     """
-    Refreshes the bookings for a given user by updating their statuses and resetting the available slots for the associated parking spots.
+    Refreshes the bookings for a given user by marking expired, un-checked-in bookings as
+    "Missed Booking" and releasing their slots.
+    The scheduled sweeper already does this for every user, so clients no longer need to call it.
     
     Parameters:
         user_id (int): The ID of the user whose bookings need to be refreshed.
-        db (Session): The database session used to query and update the database.
+        db (AsyncSession): The database session used to query and update the database.
 
     Raises:
         HTTPException (500): If a database error occurs during the operation.
@@ -605,22 +829,8 @@ async def refresh_bookings(user_id, db:Session):
     """
     
     try:
-        # Fetch all bookings for the user
-        bookings = db.query(Booking).filter(Booking.user_id == user_id).all()
-
-        for booking in bookings:
-            # Check if the booking end time has passed and status is not "Checked In"
-            if booking.end_date_time < datetime.now() and booking.status != "Checked In":
-                # Update booking status to "Missed Booking"
-                booking.status = "Missed Booking"
-
-            # Reset the available slots for the spot
-            spot = db.query(Spot).filter(Spot.spot_id == booking.spot_id).with_for_update().one_or_none()
-            if spot:
-                spot.available_slots += booking.total_slots
-
-        db.commit()
+        await db.run_sync(release_missed_bookings, user_id=str(user_id))
         return {"message": "Bookings refreshed successfully"}
     except Exception as db_error:
         raise HTTPException(
-            status_code=500, detail=f"Database error: {str(db_error)}")
\ No newline at end of file
+            status_code=500, detail=f"Database error: {str(db_error)}")
@@ -0,0 +1,169 @@
+import io
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+from functools import partial
+from typing import Optional
+from pypdf import PdfReader, PdfWriter
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db.session import SessionLocal
+
+# Claims a batch of pending documents, and claims left behind by a worker that died,
+# by marking them as validating until the lease runs out
+_CLAIM = text("""
+    WITH claimed AS (
+        SELECT id FROM documents
+        WHERE status = 'pending' OR (status = 'validating' AND validation_lease_until < :now)
+        ORDER BY id
+        LIMIT :batch_size
+        FOR UPDATE SKIP LOCKED
+    )
+    UPDATE documents SET status = 'validating', validation_lease_until = :lease_until
+    FROM claimed
+    WHERE documents.id = claimed.id
+    RETURNING documents.id, documents.content
+""")
+
+# Records the outcome of a document, only while the claim it was validated under still holds
+_RECORD = text("""
+    UPDATE documents
+    SET status = :status, page_count = :page_count, validation_error = :error,
+        validated_at = :validated_at, content = COALESCE(:content, content), validation_lease_until = NULL
+    WHERE id = :id AND status = 'validating' AND validation_lease_until = :lease_until
+""")
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def validate_pdf(content: bytes, max_bytes: int, max_pages: int) -> dict:
+    """
+    Check that content is a PDF of at most max_bytes and max_pages that pypdf can parse
+    in strict mode and that is not encrypted, and normalize it: a valid file is written
+    back out by pypdf, which drops anything around the document and rebuilds its
+    cross-reference table. Runs in a worker process, see validate_documents.
+
+    Parameters:
+        content (bytes): The uploaded file
+        max_bytes (int): Largest accepted file
+        max_pages (int): Most pages accepted
+
+    Returns:
+        dict: "status" (valid or invalid), "page_count", "error" and, for valid files,
+        the normalized "content"
+    """
+    def invalid(error: str, page_count: Optional[int] = None) -> dict:
+        return {"status": "invalid", "page_count": page_count, "error": error, "content": None}
+
+    if len(content) > max_bytes:
+        return invalid(f"File is larger than {max_bytes} bytes")
+    if not content.startswith(b"%PDF-"):
+        return invalid("Not a PDF file")
+
+    try:
+        reader = PdfReader(io.BytesIO(content), strict=True)
+        if reader.is_encrypted:
+            return invalid("Encrypted PDFs are not accepted")
+        page_count = len(reader.pages)
+        if page_count == 0:
+            return invalid("PDF has no pages", page_count)
+        if page_count > max_pages:
+            return invalid(f"PDF has {page_count} pages, at most {max_pages} are accepted", page_count)
+        # Cloning resolves every object the document references, so a corrupt body fails here
+        normalized = io.BytesIO()
+        PdfWriter(clone_from=reader).write(normalized)
+    except Exception as error:
+        return invalid(f"PDF could not be parsed: {error}")
+
+    return {"status": "valid", "page_count": page_count, "error": None, "content": normalized.getvalue()}
+
+
+def _validation_pool() -> ProcessPoolExecutor:
+    """
+    The worker pool, started on first use. Workers are spawned rather than forked:
+    the pool is created from a multithreaded server process, and a forked child would
+    inherit locks held by other threads and copies of the open database connections.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=settings.DOCUMENT_VALIDATION_WORKERS,
+                                        mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+def shutdown_validation_pool():
+    """Stop the worker processes, called when the application shuts down."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(cancel_futures=True)
+            _pool = None
+
+
+def validate_documents(db: Session, batch_size: int = None) -> int:
+    """
+    Validate a batch of pending documents in the worker process pool and record the
+    outcome on each: status valid or invalid, page count and the reason a file was
+    refused. Valid files are stored as normalized by validate_pdf.
+    The batch is claimed and committed first, so no transaction or connection is held
+    while the workers run; rows claimed by a concurrent worker are skipped. Results are
+    written only to documents still under this claim.
+
+    Parameters:
+        db (Session): SQLAlchemy database session
+        batch_size (int, optional): Documents taken per pass
+
+    Returns:
+        int: Number of documents validated
+    """
+    batch_size = batch_size or settings.DOCUMENT_VALIDATION_BATCH_SIZE
+    now = datetime.now(timezone.utc)
+    lease_until = now + timedelta(seconds=settings.DOCUMENT_VALIDATION_LEASE_SECONDS)
+    try:
+        claimed = db.execute(_CLAIM, {"now": now, "lease_until": lease_until, "batch_size": batch_size}).fetchall()
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    if not claimed:
+        return 0
+
+    check = partial(validate_pdf, max_bytes=settings.DOCUMENT_MAX_BYTES, max_pages=settings.DOCUMENT_MAX_PAGES)
+    results = list(_validation_pool().map(check, [bytes(document.content) for document in claimed]))
+
+    validated_at = datetime.now(timezone.utc)
+    recorded = 0
+    try:
+        for document, result in zip(claimed, results):
+            recorded += db.execute(_RECORD, {
+                "id": document.id,
+                "lease_until": lease_until,
+                "status": result["status"],
+                "page_count": result["page_count"],
+                "error": result["error"],
+                "content": result["content"],
+                "validated_at": validated_at,
+            }).rowcount
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return recorded
+
+
+def validate_documents_job():
+    """
+    Scheduled entry point for the document validation worker.
+    Opens its own session since it runs outside of any request.
+    """
+    db = SessionLocal()
+    try:
+        validated = validate_documents(db)
+        if validated:
+            print(f"[document-validation] validated {validated} documents")
+    finally:
+        db.close()
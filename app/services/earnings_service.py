@@ -0,0 +1,91 @@
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+from app.db.session import SessionLocal
+
+# Earnings of a spot are the payments of its bookings, as the owner views used to sum them.
+# Cancelled bookings keep their payment (there is no refund flow), so they still count.
+_RECONCILE = text("""
+    WITH spot_totals AS (
+        SELECT s.spot_id, s.owner_id, COALESCE(SUM(p.amount), 0) AS total
+        FROM spots s
+        LEFT JOIN bookings b ON b.spot_id = s.spot_id
+        LEFT JOIN payments p ON p.id = b.payment_id
+        GROUP BY s.spot_id
+    ),
+    owner_totals AS (
+        SELECT u.provider_id, COALESCE(SUM(t.total), 0) AS total
+        FROM oauth_users u
+        LEFT JOIN spot_totals t ON t.owner_id = u.provider_id
+        GROUP BY u.provider_id
+    ),
+    fixed_spots AS (
+        UPDATE spots SET total_earnings = t.total
+        FROM spot_totals t
+        WHERE spots.spot_id = t.spot_id AND spots.total_earnings <> t.total
+        RETURNING spots.spot_id
+    ),
+    fixed_owners AS (
+        UPDATE oauth_users SET total_earnings = t.total
+        FROM owner_totals t
+        WHERE oauth_users.provider_id = t.provider_id AND oauth_users.total_earnings <> t.total
+        RETURNING oauth_users.provider_id
+    )
+    SELECT (SELECT COUNT(*) FROM fixed_spots) AS spots, (SELECT COUNT(*) FROM fixed_owners) AS owners
+""")
+
+
+def record_earning(db: Session, spot_id: int, amount: int):
+    """
+    Add a successful payment to the spot's and its owner's earnings, in the caller's transaction.
+    Nothing is ever subtracted: payments are not refunded, a cancelled booking's payment stays
+    earned. A refund flow would need to record a negative amount here and leave refunded
+    payments out of _RECONCILE.
+    """
+    db.execute(text("""
+        WITH spot AS (
+            UPDATE spots SET total_earnings = total_earnings + :amount
+            WHERE spot_id = :spot_id
+            RETURNING owner_id
+        )
+        UPDATE oauth_users SET total_earnings = total_earnings + :amount
+        FROM spot
+        WHERE oauth_users.provider_id = spot.owner_id
+    """), {"spot_id": spot_id, "amount": amount})
+
+
+def reconcile_earnings(db: Session) -> tuple:
+    """
+    Recompute every earnings counter from bookings and payments and fix the ones that drifted.
+    Runs as a single REPEATABLE READ statement, so a payment committing meanwhile makes it fail
+    with a serialization error instead of being overwritten by an older total.
+
+    Returns:
+        tuple: Number of spots and owners that were corrected
+    """
+    db.rollback()  # the isolation level can only be set at the start of a transaction
+    try:
+        db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+        fixed = db.execute(_RECONCILE).one()
+        db.commit()
+        return fixed.spots, fixed.owners
+    except Exception:
+        db.rollback()
+        raise
+
+
+def reconcile_earnings_job():
+    """
+    Scheduled entry point for the earnings reconciliation.
+    Opens its own session since it runs outside of any request.
+    """
+    db = SessionLocal()
+    try:
+        spots, owners = reconcile_earnings(db)
+        if spots or owners:
+            print(f"[earnings-reconcile] corrected {spots} spots and {owners} owners")
+    except OperationalError as conflict:
+        # Lost a race with a payment, the next run picks it up
+        print(f"[earnings-reconcile] skipped: {conflict.orig}")
+    finally:
+        db.close()
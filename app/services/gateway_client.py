@@ -0,0 +1,50 @@
+import asyncio
+from typing import Dict, Iterable, List, Optional
+import httpx
+from app.core.config import settings
+
+
+class GatewayClient:
+    """
+    Async Razorpay API client for background jobs. One pooled connection set is shared
+    by all requests, and at most `concurrency` requests are in flight at once.
+    Use as an async context manager so the pool is closed with the job.
+    """
+
+    def __init__(self, base_url: str = None, concurrency: int = None,
+                 transport: Optional[httpx.AsyncBaseTransport] = None):
+        concurrency = concurrency or settings.PAYMENT_RECONCILE_CONCURRENCY
+        self._limit = asyncio.Semaphore(concurrency)
+        self._client = httpx.AsyncClient(
+            base_url=base_url or settings.RAZORPAY_API_URL,
+            auth=(str(settings.RAZORPAY_KEY_ID), str(settings.RAZORPAY_KEY_SECRET)),
+            timeout=settings.GATEWAY_TIMEOUT_SECONDS,
+            limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency),
+            transport=transport,
+        )
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self._client.aclose()
+
+    async def order_payments(self, order_id: str) -> List[dict]:
+        """Payment attempts made against an order, newest first."""
+        async with self._limit:
+            response = await self._client.get(f"/orders/{order_id}/payments")
+        response.raise_for_status()
+        return response.json().get("items", [])
+
+    async def order_payments_many(self, order_ids: Iterable[str]) -> Dict[str, Optional[List[dict]]]:
+        """
+        Fetch the payments of many orders concurrently.
+        Orders the gateway could not be asked about map to None.
+        """
+        order_ids = list(order_ids)
+        results = await asyncio.gather(*(self.order_payments(order_id) for order_id in order_ids),
+                                       return_exceptions=True)
+        return {
+            order_id: None if isinstance(result, Exception) else result
+            for order_id, result in zip(order_ids, results)
+        }
@@ -0,0 +1,184 @@
+import hashlib
+import json
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Optional
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import delete, or_, and_, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.db.idempotency_model import IdempotencyKey
+from app.db.session import SessionLocal
+
+# Completed responses, keyed by (scope, key), so hot retries never reach the database
+response_cache = TTLCache(settings.IDEMPOTENCY_CACHE_SIZE, settings.IDEMPOTENCY_CACHE_TTL_SECONDS)
+
+
+class IdempotencyConflictException(Exception):
+    """Raised when an Idempotency-Key is still being processed or was reused for a different request."""
+
+    def __init__(self, message="Request with this Idempotency-Key is still being processed.", status_code=409):
+        self.message = message
+        self.status_code = status_code
+        super().__init__(self.message)
+
+
+def fingerprint(payload: dict) -> str:
+    """Stable hash of a request body, used to detect a key reused with a different request."""
+    canonical = json.dumps(jsonable_encoder(payload), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _replay(request_hash: str, stored_hash: str, response):
+    """Return a stored response if it was produced by the same request."""
+    if stored_hash != request_hash:
+        raise IdempotencyConflictException(
+            "Idempotency-Key was already used with a different request.", status_code=422)
+    return response
+
+
+def _claim(db: Session, scope: str, key: str, request_hash: str):
+    """
+    Claim the key for this request.
+
+    Returns:
+        None if the caller now owns the key, otherwise the existing row
+    """
+    now = datetime.now(timezone.utc)
+    expires_at = now + timedelta(hours=settings.IDEMPOTENCY_KEY_TTL_HOURS)
+
+    claimed = db.execute(
+        insert(IdempotencyKey)
+        .values(scope=scope, key=key, request_hash=request_hash,
+                status="in_progress", created_at=now, expires_at=expires_at)
+        .on_conflict_do_nothing()
+        .returning(IdempotencyKey.key)
+    ).first()
+
+    if not claimed:
+        # Take over keys that expired, or whose first attempt died mid-request
+        stale_cutoff = now - timedelta(seconds=settings.IDEMPOTENCY_IN_PROGRESS_TIMEOUT_SECONDS)
+        claimed = db.execute(
+            update(IdempotencyKey)
+            .where(IdempotencyKey.scope == scope, IdempotencyKey.key == key)
+            .where(or_(
+                IdempotencyKey.expires_at < now,
+                and_(IdempotencyKey.status == "in_progress", IdempotencyKey.created_at < stale_cutoff),
+            ))
+            .values(request_hash=request_hash, status="in_progress", response=None,
+                    created_at=now, expires_at=expires_at)
+            .returning(IdempotencyKey.key)
+        ).first()
+
+    existing = None
+    if not claimed:
+        existing = db.execute(
+            select(IdempotencyKey.request_hash, IdempotencyKey.status, IdempotencyKey.response)
+            .where(IdempotencyKey.scope == scope, IdempotencyKey.key == key)
+        ).first()
+    db.commit()
+    return existing
+
+
+def _complete(db: Session, scope: str, key: str, response):
+    db.execute(
+        update(IdempotencyKey)
+        .where(IdempotencyKey.scope == scope, IdempotencyKey.key == key)
+        .values(status="completed", response=response)
+    )
+    db.commit()
+
+
+def _release(db: Session, scope: str, key: str):
+    db.rollback()
+    db.execute(
+        delete(IdempotencyKey)
+        .where(IdempotencyKey.scope == scope, IdempotencyKey.key == key,
+               IdempotencyKey.status == "in_progress")
+    )
+    db.commit()
+
+
+async def run_idempotent(db: AsyncSession, scope: str, key: Optional[str], payload: dict,
+                         handler: Callable[[], Awaitable[dict]]):
+    """
+    Run handler at most once per (scope, Idempotency-Key).
+    Repeated requests with the same key and body get the stored response back without
+    redoing gateway calls or database writes. Failed attempts release the key so the
+    client can retry. The key bookkeeping is shared with the sync jobs and runs through run_sync.
+
+    Parameters:
+        db (AsyncSession): SQLAlchemy database session
+        scope (str): Name of the endpoint the key belongs to
+        key (str, optional): Idempotency-Key header value, the handler runs normally when missing
+        payload (dict): Request body, used to detect a key reused for a different request
+        handler (Callable): Coroutine function doing the actual work
+
+    Returns:
+        dict: The response of the first successful attempt
+
+    Raises:
+        IdempotencyConflictException (409): If the first attempt is still in progress
+        IdempotencyConflictException (422): If the key was used with a different body
+    """
+    if not key:
+        return await handler()
+
+    request_hash = fingerprint(payload)
+    cached = response_cache.get((scope, key))
+    if cached is not None:
+        return _replay(request_hash, *cached)
+
+    existing = await db.run_sync(_claim, scope, key, request_hash)
+    if existing is not None:
+        if existing.status != "completed":
+            _replay(request_hash, existing.request_hash, None)
+            raise IdempotencyConflictException()
+        response_cache.set((scope, key), (existing.request_hash, existing.response))
+        return _replay(request_hash, existing.request_hash, existing.response)
+
+    try:
+        response = jsonable_encoder(await handler())
+    except Exception:
+        await db.run_sync(_release, scope, key)
+        raise
+
+    await db.run_sync(_complete, scope, key, response)
+    response_cache.set((scope, key), (request_hash, response))
+    return response
+
+
+async def preload_response_cache(db: AsyncSession) -> int:
+    """
+    Fill the response cache with the keys completed within IDEMPOTENCY_CACHE_TTL_SECONDS,
+    so client retries arriving right after a restart or deploy are still answered from memory.
+
+    Returns:
+        int: Number of responses cached
+    """
+    since = datetime.now(timezone.utc) - timedelta(seconds=settings.IDEMPOTENCY_CACHE_TTL_SECONDS)
+    rows = (await db.execute(
+        select(IdempotencyKey.scope, IdempotencyKey.key, IdempotencyKey.request_hash, IdempotencyKey.response)
+        .where(IdempotencyKey.status == "completed", IdempotencyKey.created_at >= since)
+        .order_by(IdempotencyKey.created_at.desc())
+        .limit(settings.IDEMPOTENCY_CACHE_SIZE)
+    )).all()
+    # Oldest first, so the most recent keys end up as the most recently used
+    for row in reversed(rows):
+        response_cache.set((row.scope, row.key), (row.request_hash, row.response))
+    return len(rows)
+
+
+def purge_expired_idempotency_keys():
+    """
+    Scheduled job deleting keys past their retention period.
+    Opens its own session since it runs outside of any request.
+    """
+    db = SessionLocal()
+    try:
+        db.execute(delete(IdempotencyKey).where(IdempotencyKey.expires_at < datetime.now(timezone.utc)))
+        db.commit()
+    finally:
+        db.close()
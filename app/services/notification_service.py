@@ -0,0 +1,53 @@
+from sqlalchemy.orm import Session
+from app.core.realtime import owner_hub
+from app.db.booking_model import Booking
+from app.db.spot_model import Spot
+
+
+def _booking_payload(booking: Booking) -> dict:
+    return {
+        "id": booking.id,
+        "user_id": booking.user_id,
+        "spot_id": booking.spot_id,
+        "total_slots": booking.total_slots,
+        "start_date_time": booking.start_date_time.isoformat(),
+        "end_date_time": booking.end_date_time.isoformat(),
+        "status": booking.status,
+    }
+
+
+def _spot_owner(db: Session, spot_id: int):
+    return db.query(Spot.owner_id).filter(Spot.spot_id == spot_id).scalar()
+
+
+def notify_booking(db: Session, booking_id: int, event: str):
+    """
+    Push a booking event ("created", "checked_in", "completed", "cancelled") to the
+    spot owner's open dashboards. Call after commit. Nothing is queried while no
+    dashboard is connected.
+    """
+    if not owner_hub.has_subscribers():
+        return
+    row = (
+        db.query(Booking, Spot.owner_id)
+        .join(Spot, Booking.spot_id == Spot.spot_id)
+        .filter(Booking.id == booking_id)
+        .first()
+    )
+    if row:
+        owner_hub.publish(row.owner_id, {"type": f"booking.{event}", "booking": _booking_payload(row.Booking)})
+
+
+def notify_review(db: Session, review):
+    """Push a new review to the spot owner's open dashboards. Call after commit."""
+    if not owner_hub.has_subscribers():
+        return
+    owner_id = _spot_owner(db, review.spot_id)
+    if owner_id:
+        owner_hub.publish(owner_id, {"type": "review.created", "review": {
+            "id": review.id,
+            "user_id": review.user_id,
+            "spot_id": review.spot_id,
+            "rating_score": review.rating_score,
+            "review_description": review.review_description,
+        }})
@@ -1,12 +1,42 @@
-
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from app.core.realtime import availability_hub
 from app.db.spot_model import Spot
-from typing import List
+from typing import Iterable, List, Optional
+
+
+async def get_all_parking_spots(db: AsyncSession) -> List[Spot]:
+    result = await db.execute(select(Spot).where(Spot.verification_status.in_([1, 3])))
+    return result.scalars().all()
+
+
+async def get_parking_spot_by_id(db: AsyncSession, spot_id: int) -> Spot:
+    return await db.get(Spot, spot_id)
 
 
-def get_all_parking_spots(db: Session) -> List[Spot]:
-    return db.query(Spot).filter(Spot.verification_status.in_([1, 3])).all()
+def get_availability(db: Session, spot_ids: Optional[Iterable[int]] = None, bbox: Optional[tuple] = None) -> List[dict]:
+    """
+    Current availability of the given spots, or of the spots inside a
+    (min_lon, min_lat, max_lon, max_lat) bounding box.
+    Synchronous, since background jobs publish availability too; async callers
+    run it with AsyncSession.run_sync.
+    """
+    query = db.query(Spot.spot_id, Spot.available_slots, Spot.no_of_slots, Spot.latitude, Spot.longitude)
+    if spot_ids is not None:
+        query = query.filter(Spot.spot_id.in_(list(spot_ids)))
+    if bbox is not None:
+        min_lon, min_lat, max_lon, max_lat = bbox
+        query = query.filter(Spot.longitude.between(min_lon, max_lon), Spot.latitude.between(min_lat, max_lat))
+    return [dict(row._mapping) for row in query.all()]
 
 
-def get_parking_spot_by_id(db: Session, spot_id: int) -> Spot:
-    return db.query(Spot).filter(Spot.spot_id == spot_id).first()
+def publish_availability(db: Session, spot_ids: Iterable[int]):
+    """
+    Push the committed availability of spots to live subscribers.
+    Call after the transaction that changed available_slots has committed.
+    """
+    spot_ids = set(spot_ids)
+    if spot_ids and availability_hub.has_subscribers():
+        availability_hub.publish(get_availability(db, spot_ids))
+        db.commit()
@@ -0,0 +1,187 @@
+import asyncio
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.services.analytics_service import record_booking
+from app.services.earnings_service import record_earning
+from app.services.gateway_client import GatewayClient
+from app.services.notification_service import notify_booking
+from app.services.parking_service import publish_availability
+from app.services.waitlist_service import hold_released_slots
+
+_UNSETTLED_PAGE = text("""
+    SELECT id, razorpay_order_id, amount,
+           created_at < LOCALTIMESTAMP - make_interval(secs => :abandon_after) AS expired
+    FROM payments
+    WHERE status IN ('pending', 'failed')
+      AND id > :after
+      AND created_at < LOCALTIMESTAMP - make_interval(secs => :min_age)
+    ORDER BY id
+    LIMIT :page_size
+""")
+
+# Marks captured payments successful and books the ones that carry their booking window
+_SETTLE_CAPTURED = text("""
+    WITH captured AS (
+        SELECT * FROM unnest(CAST(:ids AS integer[]), CAST(:razorpay_payment_ids AS varchar[]))
+            AS c(id, razorpay_payment_id)
+    ),
+    confirmed AS (
+        UPDATE payments
+        SET status = 'success',
+            razorpay_payment_id = COALESCE(payments.razorpay_payment_id, captured.razorpay_payment_id)
+        FROM captured
+        WHERE payments.id = captured.id AND payments.status IN ('pending', 'failed')
+        RETURNING payments.id, payments.user_id, payments.spot_id, payments.amount, payments.total_slots,
+                  payments.start_date_time, payments.end_date_time
+    ),
+    booked AS (
+        INSERT INTO bookings (user_id, spot_id, total_slots, start_date_time, end_date_time, payment_id, status)
+        SELECT user_id, spot_id, total_slots, start_date_time, end_date_time, id, 'Booked'
+        FROM confirmed
+        WHERE total_slots IS NOT NULL
+          AND NOT EXISTS (SELECT 1 FROM bookings b WHERE b.payment_id = confirmed.id)
+        RETURNING id, spot_id, total_slots, start_date_time, end_date_time,
+                  (SELECT amount FROM confirmed WHERE confirmed.id = bookings.payment_id) AS amount
+    )
+    -- One row per booking, or a single row without one, always carrying the confirmed count
+    SELECT counted.confirmed_count, booked.*
+    FROM (SELECT COUNT(*) AS confirmed_count FROM confirmed) AS counted
+    LEFT JOIN booked ON true
+""")
+
+# Gives the slots held by unpaid orders back to their spots
+_ABANDON = text("""
+    WITH abandoned AS (
+        UPDATE payments SET status = 'abandoned'
+        WHERE id = ANY(CAST(:ids AS integer[])) AND status IN ('pending', 'failed')
+        RETURNING spot_id, total_slots
+    ),
+    released AS (
+        UPDATE spots
+        SET available_slots = LEAST(spots.available_slots + freed.slots, spots.no_of_slots)
+        FROM (
+            SELECT spot_id, SUM(total_slots) AS slots FROM abandoned
+            WHERE total_slots IS NOT NULL GROUP BY spot_id
+        ) AS freed
+        WHERE spots.spot_id = freed.spot_id
+        RETURNING spots.spot_id
+    )
+    SELECT (SELECT COUNT(*) FROM abandoned) AS abandoned_count,
+           ARRAY(SELECT spot_id FROM released) AS released_spot_ids
+""")
+
+
+def _classify(rows, gateway_payments: dict) -> tuple:
+    """
+    Split a page of unsettled payments by what the gateway knows about their orders.
+
+    Returns:
+        tuple: (payment ids, razorpay payment ids) captured at the gateway, and ids of abandoned payments
+    """
+    captured_ids, razorpay_payment_ids, abandoned_ids = [], [], []
+    for row in rows:
+        attempts = gateway_payments.get(row.razorpay_order_id)
+        if attempts is None:
+            continue  # gateway unreachable for this order, retried next run
+        captured = [attempt for attempt in attempts if attempt.get("status") == "captured"]
+        if captured:
+            if captured[0].get("amount") == row.amount * 100:
+                captured_ids.append(row.id)
+                razorpay_payment_ids.append(captured[0]["id"])
+            else:
+                print(f"[payment-reconcile] amount mismatch on order {row.razorpay_order_id}")
+        elif row.expired and not any(attempt.get("status") == "authorized" for attempt in attempts):
+            abandoned_ids.append(row.id)
+    return (captured_ids, razorpay_payment_ids), abandoned_ids
+
+
+async def reconcile_payments(db: Session, gateway: GatewayClient, page_size: int = None) -> tuple:
+    """
+    Settle payments still "pending" or "failed" here against the state of their order at the gateway.
+    Walks the unsettled payments in id order, one page at a time: the orders of a page are
+    looked up concurrently, then the page is settled in one short transaction.
+    - Orders captured at the gateway are marked successful and booked from the window stored
+      with the payment, in a single statement.
+    - Orders older than PAYMENT_ABANDON_AFTER_SECONDS without a captured or authorized attempt
+      are marked "abandoned" and their held slots are released, also in a single statement.
+    No transaction is held open while waiting on the gateway.
+
+    Parameters:
+        db (Session): SQLAlchemy database session
+        gateway (GatewayClient): Open gateway client
+        page_size (int, optional): Payments looked up per page
+
+    Returns:
+        tuple: Number of payments settled as captured and as abandoned
+    """
+    page_size = page_size or settings.PAYMENT_RECONCILE_PAGE_SIZE
+    after = 0
+    settled = abandoned = 0
+
+    while True:
+        rows = db.execute(_UNSETTLED_PAGE, {
+            "after": after,
+            "page_size": page_size,
+            "min_age": settings.PAYMENT_RECONCILE_MIN_AGE_SECONDS,
+            "abandon_after": settings.PAYMENT_ABANDON_AFTER_SECONDS,
+        }).fetchall()
+        db.commit()
+        if not rows:
+            break
+
+        gateway_payments = await gateway.order_payments_many(row.razorpay_order_id for row in rows)
+        (captured_ids, razorpay_payment_ids), abandoned_ids = _classify(rows, gateway_payments)
+
+        bookings, released_spot_ids = [], []
+        try:
+            if captured_ids:
+                confirmed = db.execute(_SETTLE_CAPTURED, {
+                    "ids": captured_ids, "razorpay_payment_ids": razorpay_payment_ids}).fetchall()
+                bookings = [booking for booking in confirmed if booking.id is not None]
+                for booking in bookings:
+                    record_booking(db, booking, booking.amount)
+                    record_earning(db, booking.spot_id, booking.amount)
+                # Payments confirmed meanwhile by the webhook or the checkout are not counted
+                settled += confirmed[0].confirmed_count
+            if abandoned_ids:
+                released = db.execute(_ABANDON, {"ids": abandoned_ids}).one()
+                abandoned += released.abandoned_count
+                released_spot_ids = released.released_spot_ids
+                for spot_id in sorted(released_spot_ids):
+                    hold_released_slots(db, spot_id)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+        for booking in bookings:
+            notify_booking(db, booking.id, "created")
+        publish_availability(db, released_spot_ids)
+
+        after = rows[-1].id
+        if len(rows) < page_size:
+            break
+
+    return settled, abandoned
+
+
+async def _reconcile_with_gateway(db: Session) -> tuple:
+    async with GatewayClient() as gateway:
+        return await reconcile_payments(db, gateway)
+
+
+def reconcile_payments_job():
+    """
+    Scheduled entry point for payment reconciliation.
+    Opens its own session since it runs outside of any request, and its own
+    event loop for the gateway client since jobs run in the threadpool.
+    """
+    db = SessionLocal()
+    try:
+        settled, abandoned = asyncio.run(_reconcile_with_gateway(db))
+        if settled or abandoned:
+            print(f"[payment-reconcile] settled {settled} captured and {abandoned} abandoned payments")
+    finally:
+        db.close()
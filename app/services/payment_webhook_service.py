@@ -0,0 +1,186 @@
+import hashlib
+import hmac
+from datetime import datetime, timezone
+from typing import Optional
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db.booking_model import Booking
+from app.db.payment_model import Payment, PaymentWebhookEvent
+from app.db.session import SessionLocal
+from app.services.analytics_service import record_booking
+from app.services.earnings_service import record_earning
+from app.services.notification_service import notify_booking
+
+# Events that mean the order was paid; the rest of the payload is the same for both
+CAPTURED_EVENTS = ("payment.captured", "order.paid")
+
+
+def verify_webhook_signature(body: bytes, signature: Optional[str]) -> bool:
+    """
+    Check the X-Razorpay-Signature header, the hex HMAC-SHA256 of the raw body
+    keyed with RAZORPAY_WEBHOOK_SECRET. Compared in constant time.
+    """
+    if not signature or not settings.RAZORPAY_WEBHOOK_SECRET:
+        return False
+    expected = hmac.new(settings.RAZORPAY_WEBHOOK_SECRET.encode(), body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature)
+
+
+def enqueue_webhook_event(db: Session, event_id: Optional[str], body: bytes, payload: dict) -> bool:
+    """
+    Store a verified webhook event for the worker. Redeliveries of an event are dropped.
+
+    Parameters:
+        db (Session): SQLAlchemy database session
+        event_id (str, optional): X-Razorpay-Event-Id header, the body hash stands in when missing
+        body (bytes): Raw request body
+        payload (dict): Parsed request body
+
+    Returns:
+        bool: True if the event is new
+    """
+    try:
+        stored = db.execute(
+            insert(PaymentWebhookEvent)
+            .values(id=event_id or hashlib.sha256(body).hexdigest(), event=str(payload.get("event", "")),
+                    payload=payload, status="pending", attempts=0)
+            .on_conflict_do_nothing()
+            .returning(PaymentWebhookEvent.id)
+        ).first()
+        db.commit()
+        return stored is not None
+    except Exception:
+        db.rollback()
+        raise
+
+
+def _payment_entity(event: PaymentWebhookEvent) -> dict:
+    try:
+        return event.payload["payload"]["payment"]["entity"]
+    except (KeyError, TypeError):
+        raise ValueError("Event carries no payment entity")
+
+
+def _locked_payment(db: Session, entity: dict) -> Payment:
+    payment = db.query(Payment).filter(
+        Payment.razorpay_order_id == entity.get("order_id")).with_for_update().one_or_none()
+    if not payment:
+        raise LookupError(f"Unknown order {entity.get('order_id')}")
+    return payment
+
+
+def _apply_captured(db: Session, entity: dict) -> Optional[int]:
+    """
+    Mark the payment of the order as successful and create its booking, unless the
+    client confirmation already did. Returns the id of a booking created here.
+    """
+    payment = _locked_payment(db, entity)
+    if payment.status == "abandoned":
+        raise ValueError("Order was paid after it was abandoned and its slots released")
+    if entity.get("amount") != payment.amount * 100:
+        raise ValueError(f"Captured amount {entity.get('amount')} does not match the order")
+
+    payment.status = "success"
+    payment.razorpay_payment_id = payment.razorpay_payment_id or entity.get("id")
+    booked = db.query(Booking.id).filter(Booking.payment_id == payment.id).first()
+    if booked or payment.total_slots is None:
+        # Already confirmed, or an order from before the window was stored with it
+        return None
+
+    booking = Booking(
+        user_id=payment.user_id,
+        spot_id=payment.spot_id,
+        start_date_time=payment.start_date_time,
+        end_date_time=payment.end_date_time,
+        payment_id=payment.id,
+        total_slots=payment.total_slots,
+        status="Booked"
+    )
+    db.add(booking)
+    db.flush()
+    record_booking(db, booking, payment.amount)
+    record_earning(db, payment.spot_id, payment.amount)
+    return booking.id
+
+
+def _apply_failed(db: Session, entity: dict):
+    """
+    Record a failed payment attempt. The order stays payable by another attempt,
+    so the held slots are not released here.
+    """
+    payment = _locked_payment(db, entity)
+    if payment.status == "pending":
+        payment.status = "failed"
+
+
+def process_webhook_events(db: Session, batch_size: int = None) -> int:
+    """
+    Apply one batch of pending webhook events, oldest first, in a single transaction.
+    Each event runs in a savepoint: events for unknown orders or with a wrong amount
+    are set aside as "ignored", other errors are retried on the next pass until
+    PAYMENT_WEBHOOK_MAX_ATTEMPTS, then the event is marked "failed".
+    Rows locked by a concurrent worker are skipped. Applying an event twice has no
+    further effect, so the client confirmation and the webhook can race safely.
+
+    Parameters:
+        db (Session): SQLAlchemy database session
+        batch_size (int, optional): Events taken per pass
+
+    Returns:
+        int: Number of events handled
+    """
+    batch_size = batch_size or settings.PAYMENT_WEBHOOK_BATCH_SIZE
+    created = []
+    try:
+        events = (
+            db.query(PaymentWebhookEvent)
+            .filter(PaymentWebhookEvent.status == "pending")
+            .order_by(PaymentWebhookEvent.received_at)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+            .all()
+        )
+        for event in events:
+            event.attempts += 1
+            try:
+                with db.begin_nested():
+                    if event.event in CAPTURED_EVENTS:
+                        booking_id = _apply_captured(db, _payment_entity(event))
+                        if booking_id:
+                            created.append(booking_id)
+                        event.status = "processed"
+                    elif event.event == "payment.failed":
+                        _apply_failed(db, _payment_entity(event))
+                        event.status = "processed"
+                    else:
+                        event.status = "ignored"
+            except (LookupError, ValueError) as rejected:
+                event.status = "ignored"
+                event.error = str(rejected)
+            except Exception as apply_error:
+                event.error = str(apply_error)
+                if event.attempts >= settings.PAYMENT_WEBHOOK_MAX_ATTEMPTS:
+                    event.status = "failed"
+            if event.status != "pending":
+                event.processed_at = datetime.now(timezone.utc)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    for booking_id in created:
+        notify_booking(db, booking_id, "created")
+    return len(events)
+
+
+def process_webhook_events_job():
+    """
+    Scheduled entry point for the webhook worker.
+    Opens its own session since it runs outside of any request.
+    """
+    db = SessionLocal()
+    try:
+        process_webhook_events(db)
+    finally:
+        db.close()
@@ -0,0 +1,130 @@
+from datetime import datetime
+from typing import List
+from zoneinfo import ZoneInfo
+import numpy as np
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db.spot_model import Spot
+from app.schemas.pricing import QuoteRequest, Quote
+
+HOURS_PER_WEEK = 7 * 24
+
+
+def parse_peak_hours(spec: str) -> np.ndarray:
+    """Parse a "8-11,17-20" style spec (end exclusive) into a 24 entry mask."""
+    mask = np.zeros(24, dtype=bool)
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        start, _, end = part.partition("-")
+        mask[int(start):int(end) if end else int(start) + 1] = True
+    return mask
+
+
+def weekly_multipliers(peak_hours: str, peak_multiplier: float, weekend_multiplier: float) -> np.ndarray:
+    """Price multiplier of every hour of the week, starting Monday 00:00 local time."""
+    hourly = np.where(parse_peak_hours(peak_hours), peak_multiplier, 1.0)
+    daily = np.array([1.0] * 5 + [weekend_multiplier] * 2)
+    return np.outer(daily, hourly).ravel()
+
+
+_WEEK = weekly_multipliers(settings.PRICING_PEAK_HOURS, settings.PRICING_PEAK_MULTIPLIER,
+                           settings.PRICING_WEEKEND_MULTIPLIER)
+# Prefix sums over two weeks, so the multipliers of any run of up to a week of hours
+# starting anywhere in the week are a single subtraction.
+_CUMULATIVE = np.concatenate(([0.0], np.cumsum(np.tile(_WEEK, 2))))
+
+
+def price_windows(hourly_rates: np.ndarray, total_slots: np.ndarray,
+                  start_hour_of_week: np.ndarray, duration_seconds: np.ndarray):
+    """
+    Price many booking windows in one vectorized pass.
+    Durations are billed in started hours, at least PRICING_MIN_BILLED_HOURS, and each
+    billed hour is charged at the multiplier of the hour of the week it starts in.
+    Every slot after the first gets PRICING_EXTRA_SLOT_DISCOUNT off.
+
+    Parameters:
+        hourly_rates (np.ndarray): Hourly rate of the spot of each window
+        total_slots (np.ndarray): Slots booked for each window
+        start_hour_of_week (np.ndarray): Local hour of the week each window starts in, 0 to 167
+        duration_seconds (np.ndarray): Length of each window
+
+    Returns:
+        tuple: Billed hours and amounts, both integer arrays
+    """
+    billed_hours = np.maximum(np.ceil(duration_seconds / 3600).astype(np.int64),
+                              settings.PRICING_MIN_BILLED_HOURS)
+    weeks, remainder = np.divmod(billed_hours, HOURS_PER_WEEK)
+    hour_units = (weeks * _CUMULATIVE[HOURS_PER_WEEK]
+                  + _CUMULATIVE[start_hour_of_week + remainder] - _CUMULATIVE[start_hour_of_week])
+    slot_units = 1 + (total_slots - 1) * (1 - settings.PRICING_EXTRA_SLOT_DISCOUNT)
+    amounts = np.ceil(np.round(hourly_rates * hour_units * slot_units, 2)).astype(np.int64)
+    return billed_hours, amounts
+
+
+def _hour_of_week(value: datetime) -> int:
+    local = value.astimezone(ZoneInfo(settings.DEFAULT_TIMEZONE))
+    return local.weekday() * 24 + local.hour
+
+
+def quote_amount(hourly_rate: int, total_slots: int, start: datetime, end: datetime) -> int:
+    """Price a single booking window, for callers that already loaded the spot's rate."""
+    _, amounts = price_windows(
+        np.array([hourly_rate], dtype=float),
+        np.array([total_slots]),
+        np.array([_hour_of_week(start)]),
+        np.array([(end - start).total_seconds()]),
+    )
+    return int(amounts[0])
+
+
+def quote_error(item, spot) -> str:
+    """
+    Why a window cannot be priced for a spot, None if it can. Used by the batch quote
+    and by booking creation, so a booking is refused for the same reasons a quote is.
+    """
+    if spot is None:
+        return "Spot not found"
+    if spot.hourly_rate is None:
+        return "Spot has no hourly rate"
+    if item.end_date_time <= item.start_date_time:
+        return "Booking window must end after it starts"
+    if item.total_slots < 1 or item.total_slots > (spot.no_of_slots or 0):
+        return "Requested slots exceed the capacity of the spot"
+    return None
+
+
+def quote_batch(db: Session, items: List[QuoteRequest]) -> List[Quote]:
+    """
+    Price a batch of (spot, window, slots) combinations with one query for the spots
+    and one vectorized pricing pass. Items that cannot be priced carry an error instead
+    of failing the whole batch.
+
+    Parameters:
+        db (Session): SQLAlchemy database session
+        items (List[QuoteRequest]): Windows to price
+
+    Returns:
+        List[Quote]: Quotes in the order of the request
+    """
+    rows = db.query(Spot.spot_id, Spot.hourly_rate, Spot.no_of_slots).filter(
+        Spot.spot_id.in_({item.spot_id for item in items})).all()
+    spots = {row.spot_id: row for row in rows}
+
+    quotes = []
+    priced = []
+    for index, item in enumerate(items):
+        error = quote_error(item, spots.get(item.spot_id))
+        quotes.append(Quote(**item.model_dump(), error=error))
+        if error is None:
+            priced.append(index)
+
+    if priced:
+        billed_hours, amounts = price_windows(
+            np.array([spots[items[i].spot_id].hourly_rate for i in priced], dtype=float),
+            np.array([items[i].total_slots for i in priced]),
+            np.array([_hour_of_week(items[i].start_date_time) for i in priced]),
+            np.array([(items[i].end_date_time - items[i].start_date_time).total_seconds() for i in priced]),
+        )
+        for index, hours, amount in zip(priced, billed_hours.tolist(), amounts.tolist()):
+            quotes[index].billed_hours = hours
+            quotes[index].amount = amount
+    return quotes
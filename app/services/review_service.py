@@ -1,15 +1,24 @@
-from sqlalchemy.orm import Session, joinedload
+from datetime import datetime
+from sqlalchemy import Integer, any_, cast, func, select, text, tuple_
+from sqlalchemy.dialects.postgresql import ARRAY, insert
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
 from typing import List, Optional
-from app.schemas.review import ReviewCreate, ReviewUpdate, ReviewInDB
-from app.db.review_model import Review
+from app.core.pagination import encode_cursor, decode_cursor
+from app.db.session import SessionLocal
+from app.schemas.review import ReviewCreate, ReviewUpdate, ReviewInDB, ReviewPageQuery
+from app.db.oauth_model import OAuthUser
+from app.db.review_model import Review, SpotRatingSummary
+from app.services.notification_service import notify_review
 from sqlalchemy.exc import SQLAlchemyError, IntegrityError
 
-def get_review(db: Session, review_id: int) -> Optional[ReviewInDB]:
+async def get_review(db: AsyncSession, review_id: int) -> Optional[ReviewInDB]:
     """
     Retrieve a review by its ID.
 
     Parameters:
-        db (Session): The database session.
+        db (AsyncSession): The database session.
         review_id (int): The ID of the review to retrieve.
 
     Returns:
@@ -21,7 +30,7 @@ def get_review(db: Session, review_id: int) -> Optional[ReviewInDB]:
         Exception: For any other unexpected errors.
     """
     try:
-        db_review = db.query(Review).filter(Review.id == review_id).first()
+        db_review = await db.get(Review, review_id)
         if db_review is None:
             raise KeyError("Review not found")
         return db_review
@@ -30,50 +39,133 @@ def get_review(db: Session, review_id: int) -> Optional[ReviewInDB]:
     except Exception as general_error:
         raise general_error
 
-def get_reviews_by_spot(db: Session, spot_id: int) -> List[ReviewInDB]:
+# Sort column and direction of each review order, ties broken on id in the same direction
+_REVIEW_SORTS = {
+    "newest": (Review.created_at, True),
+    "highest": (Review.rating_score, True),
+    "lowest": (Review.rating_score, False),
+}
+
+
+def _summary_to_dict(spot_id: int, summary: Optional[SpotRatingSummary]) -> dict:
+    count = summary.review_count if summary else 0
+    return {
+        "spot_id": spot_id,
+        "review_count": count,
+        "average_rating": round(summary.rating_sum / count, 2) if count else None,
+        "histogram": {stars: getattr(summary, f"rating_{stars}") if summary else 0 for stars in range(1, 6)},
+    }
+
+
+async def get_rating_summary(db: AsyncSession, spot_id: int) -> dict:
     """
-    Retrieve all reviews for a specific spot.
+    Review count, average rating and 1-5 star histogram of a spot, read from its
+    precomputed summary row rather than from the reviews.
 
     Parameters:
-        db (Session): The database session.
+        db (AsyncSession): The database session.
+        spot_id (int): The ID of the spot.
+
+    Returns:
+        dict: "spot_id", "review_count", "average_rating" (None without reviews) and "histogram"
+    """
+    return _summary_to_dict(spot_id, await db.get(SpotRatingSummary, spot_id))
+
+
+async def get_rating_summaries(db: AsyncSession, spot_ids: List[int]) -> List[dict]:
+    """
+    Rating summaries of many spots in one primary key lookup, for map and search lists.
+
+    Parameters:
+        db (AsyncSession): The database session.
+        spot_ids (List[int]): The IDs of the spots.
+
+    Returns:
+        List[dict]: One summary per distinct spot_id, in the order given. Spots without
+        reviews, or that do not exist, have a zero count.
+    """
+    spot_ids = list(dict.fromkeys(spot_ids))
+    summaries = {
+        summary.spot_id: summary
+        for summary in (await db.execute(select(SpotRatingSummary).where(
+            SpotRatingSummary.spot_id == any_(cast(spot_ids, ARRAY(Integer)))))).scalars()
+    }
+    return [_summary_to_dict(spot_id, summaries.get(spot_id)) for spot_id in spot_ids]
+
+
+async def _add_rating(db: AsyncSession, spot_id: int, rating_score: int, change: int):
+    """Add (change 1) or remove (change -1) one rating from a spot's summary, in the caller's transaction."""
+    values = {"review_count": change, "rating_sum": change * rating_score, f"rating_{rating_score}": change}
+    stmt = insert(SpotRatingSummary).values(spot_id=spot_id, **values)
+    await db.execute(stmt.on_conflict_do_update(
+        index_elements=[SpotRatingSummary.spot_id],
+        set_={column: getattr(SpotRatingSummary, column) + getattr(stmt.excluded, column) for column in values},
+    ))
+
+
+async def get_reviews_by_spot(db: AsyncSession, spot_id: int, page: ReviewPageQuery) -> dict:
+    """
+    Retrieve one keyset page of the reviews of a spot, with the spot's rating summary.
+    At most limit + 1 reviews are read whatever the number of reviews of the spot,
+    and the images are left out unless include_images is set.
+
+    Parameters:
+        db (AsyncSession): The database session.
         spot_id (int): The ID of the spot to retrieve reviews for.
+        page (ReviewPageQuery): Cursor, page size, sort order and whether to include images.
 
     Returns:
-        List[ReviewInDB]: A list of reviews for the specified spot.
+        dict: "items" of the page, "next_cursor" (None on the last page) and "summary"
 
     Raises:
+        ValueError: If the cursor is malformed or was issued for another sort order.
         SQLAlchemyError: If a database error occurs.
         Exception: For any other unexpected errors.
     """
     try:
-        reviews = db.query(Review).filter(
-            Review.spot_id == spot_id).options(joinedload(Review.user)).all()
-        
-        return [
-            ReviewInDB(
-                id=review.id,
-                created_at=review.created_at,
-                user_id=review.user_id,
-                reviewer_name=review.user.name if review.user else "Unknown",
-                spot_id=review.spot_id,
-                rating_score=review.rating_score,
-                review_description=review.review_description,
-                images=review.images,
-                owner_reply=review.owner_reply
-            )
-            for review in reviews
-        ]
+        sort_column, descending = _REVIEW_SORTS[page.sort]
+        columns = [Review.id, Review.created_at, Review.user_id, Review.spot_id, Review.rating_score,
+                   Review.review_description, Review.owner_reply,
+                   func.coalesce(OAuthUser.name, "Unknown").label("reviewer_name")]
+        if page.include_images:
+            columns.append(Review.images)
+        stmt = (select(*columns)
+                .outerjoin(OAuthUser, OAuthUser.provider_id == Review.user_id)
+                .where(Review.spot_id == spot_id))
+
+        if page.cursor:
+            after_value, after_id = decode_cursor(page.cursor)
+            if isinstance(after_value, datetime) != (page.sort == "newest"):
+                raise ValueError("Invalid cursor")
+            if descending:
+                stmt = stmt.where(sort_column <= after_value,
+                                  tuple_(sort_column, Review.id) < tuple_(after_value, after_id))
+            else:
+                stmt = stmt.where(sort_column >= after_value,
+                                  tuple_(sort_column, Review.id) > tuple_(after_value, after_id))
+        order = (sort_column.desc(), Review.id.desc()) if descending else (sort_column, Review.id)
+
+        rows = (await db.execute(stmt.order_by(*order).limit(page.limit + 1))).all()
+        next_cursor = None
+        if len(rows) > page.limit:
+            rows = rows[:page.limit]
+            next_cursor = encode_cursor(getattr(rows[-1], sort_column.key), rows[-1].id)
+        return {
+            "items": [dict(row._mapping) for row in rows],
+            "next_cursor": next_cursor,
+            "summary": await get_rating_summary(db, spot_id),
+        }
     except SQLAlchemyError as db_error:
         raise db_error
     except Exception as general_error:
         raise general_error
 
-def create_review(db: Session, review: ReviewCreate) -> ReviewInDB:
+async def create_review(db: AsyncSession, review: ReviewCreate) -> ReviewInDB:
     """
     Create a new review.
 
     Parameters:
-        db (Session): The database session.
+        db (AsyncSession): The database session.
         review (ReviewCreate): The review data to create.
 
     Returns:
@@ -87,25 +179,27 @@ def create_review(db: Session, review: ReviewCreate) -> ReviewInDB:
     try:
         db_review = Review(**review.model_dump())
         db.add(db_review)
-        db.commit()
-        db.refresh(db_review)
+        await _add_rating(db, db_review.spot_id, db_review.rating_score, 1)
+        await db.commit()
+        await db.refresh(db_review)
+        await db.run_sync(notify_review, db_review)
         return db_review
     except IntegrityError as integrity_error:
-        db.rollback()
+        await db.rollback()
         raise integrity_error
     except SQLAlchemyError as db_error:
-        db.rollback()
+        await db.rollback()
         raise db_error
     except Exception as general_error:
-        db.rollback()
+        await db.rollback()
         raise general_error
 
-def update_review(db: Session, review_id: int, review: ReviewUpdate) -> Optional[ReviewInDB]:
+async def update_review(db: AsyncSession, review_id: int, review: ReviewUpdate) -> Optional[ReviewInDB]:
     """
     Update an existing review.
 
     Parameters:
-        db (Session): The database session.
+        db (AsyncSession): The database session.
         review_id (int): The ID of the review to update.
         review (ReviewUpdate): The updated review data.
 
@@ -119,32 +213,37 @@ def update_review(db: Session, review_id: int, review: ReviewUpdate) -> Optional
         Exception: For any other unexpected errors.
     """
     try:
-        db_review = db.query(Review).filter(Review.id == review_id).first()
+        # Locked so concurrent edits of the review adjust the summary from the rating they replace
+        db_review = await db.get(Review, review_id, with_for_update=True)
         if db_review is None:
             raise KeyError("Review not found")
 
+        rated = (db_review.spot_id, db_review.rating_score)
         for key, value in review.dict(exclude_unset=True).items():
             setattr(db_review, key, value)
+        if (db_review.spot_id, db_review.rating_score) != rated:
+            await _add_rating(db, *rated, -1)
+            await _add_rating(db, db_review.spot_id, db_review.rating_score, 1)
 
-        db.commit()
-        db.refresh(db_review)
+        await db.commit()
+        await db.refresh(db_review)
         return db_review
     except IntegrityError as integrity_error:
-        db.rollback()
+        await db.rollback()
         raise integrity_error
     except SQLAlchemyError as db_error:
-        db.rollback()
+        await db.rollback()
         raise db_error
     except Exception as general_error:
-        db.rollback()
+        await db.rollback()
         raise general_error
 
-def delete_review(db: Session, review_id: int) -> bool:
+async def delete_review(db: AsyncSession, review_id: int) -> bool:
     """
     Delete a review by its ID.
 
     Parameters:
-        db (Session): The database session.
+        db (AsyncSession): The database session.
         review_id (int): The ID of the review to delete.
 
     Returns:
@@ -156,16 +255,87 @@ def delete_review(db: Session, review_id: int) -> bool:
         Exception: For any other unexpected errors.
     """
     try:
-        db_review = db.query(Review).filter(Review.id == review_id).first()
+        db_review = await db.get(Review, review_id, with_for_update=True)
         if db_review is None:
             raise KeyError("Review not found")
 
-        db.delete(db_review)
-        db.commit()
+        await _add_rating(db, db_review.spot_id, db_review.rating_score, -1)
+        await db.delete(db_review)
+        await db.commit()
         return True
     except SQLAlchemyError as db_error:
-        db.rollback()
+        await db.rollback()
         raise db_error
     except Exception as general_error:
+        await db.rollback()
+        raise general_error
+
+
+# Summaries recomputed from the reviews, written only where they drifted
+_RECONCILE_RATINGS = text("""
+    WITH totals AS (
+        SELECT s.spot_id, COUNT(r.id) AS review_count, COALESCE(SUM(r.rating_score), 0) AS rating_sum,
+               COUNT(r.id) FILTER (WHERE r.rating_score = 1) AS rating_1,
+               COUNT(r.id) FILTER (WHERE r.rating_score = 2) AS rating_2,
+               COUNT(r.id) FILTER (WHERE r.rating_score = 3) AS rating_3,
+               COUNT(r.id) FILTER (WHERE r.rating_score = 4) AS rating_4,
+               COUNT(r.id) FILTER (WHERE r.rating_score = 5) AS rating_5
+        FROM spots s
+        LEFT JOIN reviews r ON r.spot_id = s.spot_id
+        GROUP BY s.spot_id
+    ),
+    fixed AS (
+        INSERT INTO spot_rating_summaries AS summary
+            (spot_id, review_count, rating_sum, rating_1, rating_2, rating_3, rating_4, rating_5)
+        SELECT t.spot_id, t.review_count, t.rating_sum, t.rating_1, t.rating_2, t.rating_3, t.rating_4, t.rating_5
+        FROM totals t
+        LEFT JOIN spot_rating_summaries c ON c.spot_id = t.spot_id
+        WHERE (c.spot_id IS NULL AND t.review_count > 0)
+           OR (c.review_count, c.rating_sum, c.rating_1, c.rating_2, c.rating_3, c.rating_4, c.rating_5)
+              <> (t.review_count, t.rating_sum, t.rating_1, t.rating_2, t.rating_3, t.rating_4, t.rating_5)
+        ON CONFLICT (spot_id) DO UPDATE SET
+            review_count = EXCLUDED.review_count, rating_sum = EXCLUDED.rating_sum,
+            rating_1 = EXCLUDED.rating_1, rating_2 = EXCLUDED.rating_2, rating_3 = EXCLUDED.rating_3,
+            rating_4 = EXCLUDED.rating_4, rating_5 = EXCLUDED.rating_5
+        RETURNING summary.spot_id
+    )
+    SELECT COUNT(*) FROM fixed
+""")
+
+
+def reconcile_rating_summaries(db: Session) -> int:
+    """
+    Recompute every spot's rating summary from its reviews and fix the ones that drifted,
+    e.g. after reviews were changed outside of this service.
+    Runs as a single REPEATABLE READ statement, so a review written meanwhile makes it fail
+    with a serialization error instead of being overwritten by an older summary.
+
+    Returns:
+        int: Number of spots whose summary was corrected
+    """
+    db.rollback()  # the isolation level can only be set at the start of a transaction
+    try:
+        db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+        fixed = db.execute(_RECONCILE_RATINGS).scalar()
+        db.commit()
+        return fixed
+    except Exception:
         db.rollback()
-        raise general_error
\ No newline at end of file
+        raise
+
+
+def reconcile_rating_summaries_job():
+    """
+    Scheduled entry point for the rating summary reconciliation.
+    Opens its own session since it runs outside of any request.
+    """
+    db = SessionLocal()
+    try:
+        fixed = reconcile_rating_summaries(db)
+        if fixed:
+            print(f"[rating-reconcile] corrected {fixed} spots")
+    except OperationalError as conflict:
+        # Lost a race with a review, the next run picks it up
+        print(f"[rating-reconcile] skipped: {conflict.orig}")
+    finally:
+        db.close()
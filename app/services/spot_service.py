@@ -1,18 +1,19 @@
 from typing import List
 from app.schemas.spot import AddSpot, EditSpot
-from sqlalchemy.orm import Session
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.db.spot_model import Spot, Document
-from app.db.booking_model import Booking
-from app.db.payment_model import Payment
-from app.db.review_model import Review
+from app.db.review_model import Review, SpotRatingSummary
+from app.db.analytics_model import SpotHourlyRollup
+from app.db.waitlist_model import WaitlistEntry
 from fastapi import HTTPException
-from sqlalchemy import func
+from app.core.config import settings
 import base64
 
 from app.services.parking_service import get_all_parking_spots
 
 
-async def add_document(spot_id, doc1, doc2, doc3, db: Session):
+async def add_document(spot_id, doc1, doc2, doc3, db: AsyncSession):
     try:
         # List of documents to iterate over, with their corresponding names
         documents = [doc1, doc2, doc3]
@@ -25,7 +26,11 @@ async def add_document(spot_id, doc1, doc2, doc3, db: Session):
                     raise HTTPException(
                         status_code=400, detail=f"doc{idx} is not a valid PDF")
 
+                # Checked and trimmed later by document_validation_service, off the request path
                 content = await file.read()
+                if len(content) > settings.DOCUMENT_MAX_BYTES:
+                    raise HTTPException(
+                        status_code=400, detail=f"doc{idx} is larger than {settings.DOCUMENT_MAX_BYTES} bytes")
                 doc_type = document_types[idx - 1]
 
                 document = Document(
@@ -36,20 +41,22 @@ async def add_document(spot_id, doc1, doc2, doc3, db: Session):
                 )
                 db.add(document)
 
-        db.commit()
+        await db.commit()
+    except HTTPException:
+        raise
     except Exception as e:
         print(e)
         raise HTTPException(
             status_code=400, detail="Error occurred during adding document.")
 
 
-async def add_spot(spot: AddSpot, db: Session):
+async def add_spot(spot: AddSpot, db: AsyncSession):
     """
     Add a parking spot for the user.
 
     Parameters:
         spot_data (AddSpot): Spot data
-        db (Session): SQLAlchemy database session
+        db (AsyncSession): SQLAlchemy database session
 
     Returns:
         dict: Response message
@@ -81,7 +88,7 @@ async def add_spot(spot: AddSpot, db: Session):
             verification_status=spot.verification_status,
         )
         db.add(new_spot)
-        db.commit()
+        await db.commit()
         return {"message": "Spot added successfully.", "spot_id": new_spot.spot_id}
     except Exception as e:
         print(e)
@@ -89,13 +96,13 @@ async def add_spot(spot: AddSpot, db: Session):
             status_code=400, detail="Error occur during adding spot.")
 
 
-def get_spot_by_id(spot_id: int, db: Session):
+async def get_spot_by_id(spot_id: int, db: AsyncSession):
     """
     Retrieve a spot by its unique spot_id.
 
     Parameters:
         spot_id (int): The unique identifier of the spot.
-        db (Session): SQLAlchemy database session.
+        db (AsyncSession): SQLAlchemy database session.
 
     Returns:
         Spot: The spot object if found.
@@ -105,7 +112,7 @@ def get_spot_by_id(spot_id: int, db: Session):
         HTTPException (500): If there is a database error.
     """
     try:
-        spot = db.query(Spot).filter(Spot.spot_id == spot_id).first()
+        spot = await db.get(Spot, spot_id)
         if not spot:
             raise HTTPException(status_code=404, detail="Spot not found.")
         return spot
@@ -114,28 +121,22 @@ def get_spot_by_id(spot_id: int, db: Session):
             status_code=500, detail="Database Error: " + str(e))
 
 
-def get_spot_list_of_owner(user_id: int, db: Session):
+async def get_spot_list_of_owner(user_id: int, db: AsyncSession):
     """
     Retrieve all spots owned by a specific user.
 
     Parameters:
         user_id (int): User ID
-        db (Session): SQLAlchemy database session
+        db (AsyncSession): SQLAlchemy database session
 
     Returns:
         List[dict]: List of spots for the specified user
     """
     try:
-        spots = db.query(Spot).filter(Spot.owner_id == str(user_id)).all()
+        spots = (await db.execute(select(Spot).where(Spot.owner_id == str(user_id)))).scalars().all()
         out: List[dict] = []
 
         for spot in spots:
-            total_earnings = (
-                db.query(func.coalesce(func.sum(Payment.amount), 0))
-                .join(Booking, Payment.id == Booking.payment_id)
-                .filter(Booking.spot_id == spot.spot_id)
-                .scalar()
-            )
             spot_dict = {
                 "id":         spot.spot_id,
                 "address":         spot.address,
@@ -143,7 +144,7 @@ def get_spot_list_of_owner(user_id: int, db: Session):
                 "title":      spot.spot_title,
                 "latitude":        spot.latitude,
                 "longitude":       spot.longitude,
-                "totalEarning": int(total_earnings),
+                "totalEarning": spot.total_earnings,
                 "available_slots": spot.available_slots,
                 "total_slots":     spot.no_of_slots,
                 "hourlyRate":     spot.hourly_rate,
@@ -162,13 +163,13 @@ def get_spot_list_of_owner(user_id: int, db: Session):
             status_code=400, detail="Error occur during fetching spots.")
 
 
-async def update_spot_details(updated_spot: EditSpot, spot_id: int, db: Session):
+async def update_spot_details(updated_spot: EditSpot, spot_id: int, db: AsyncSession):
     """
     Updates a spot with the given updated details.
 
     Parameters:
         updated_spot (dict): The dictionary containing the updated details of the spot
-        db (Session): SQLAlchemy database session
+        db (AsyncSession): SQLAlchemy database session
 
     Raises:
         HTTPException (400): If there is less total_slots in updated spot, than current available_slots
@@ -179,14 +180,14 @@ async def update_spot_details(updated_spot: EditSpot, spot_id: int, db: Session)
         dict: The updated spot
     """
     try:
-        spot = db.query(Spot).filter(
-            Spot.spot_id == spot_id).one()
+        spot = (await db.execute(select(Spot).where(
+            Spot.spot_id == spot_id))).scalar_one()
         if (not spot or spot == None):
             raise HTTPException(status_code=404, detail="Spot not found")
         if (spot.available_slots > updated_spot.total_slots):
             raise HTTPException(
                 status_code=400, detail="Slots are in use. Please try again when slots are empty.")
-        db.query(Spot).filter(Spot.spot_id == spot_id).update({
+        await db.execute(update(Spot).where(Spot.spot_id == spot_id).values({
             "spot_title": updated_spot.spot_title,
             "address": updated_spot.spot_address,
             "hourly_rate": updated_spot.hourly_rate,
@@ -195,27 +196,27 @@ async def update_spot_details(updated_spot: EditSpot, spot_id: int, db: Session)
             "close_time": updated_spot.close_time,
             "description": updated_spot.spot_description,
             "available_days": updated_spot.available_days,
-        })
+        }))
         if (updated_spot.image and updated_spot.image != []):
             image_blobs = [base64.b64decode(img_b64)
                            for img_b64 in updated_spot.image]
-            db.query(Spot).filter(Spot.spot_id == spot_id).update({
+            await db.execute(update(Spot).where(Spot.spot_id == spot_id).values({
                 "image": image_blobs
-            })
-        db.commit()
+            }))
+        await db.commit()
         return updated_spot
     except Exception as db_error:
         raise HTTPException(
             status_code=500, detail="Database Error" + str(db_error))
 
 
-async def delete_spot(spot_id: int, db: Session):
+async def delete_spot(spot_id: int, db: AsyncSession):
     """
     Deletes a parking spot from the database.
 
     Parameters:
         spot_id (int): The unique identifier of the parking spot to be deleted.
-        db (Session): The database session used to interact with the database.
+        db (AsyncSession): The database session used to interact with the database.
 
     Raises:
         HTTPException (404): If the parking spot is not found (status code 404).
@@ -226,17 +227,20 @@ async def delete_spot(spot_id: int, db: Session):
         None
     """
     try:
-        spot = db.query(Spot).filter(Spot.spot_id == spot_id).one()
+        spot = (await db.execute(select(Spot).where(Spot.spot_id == spot_id))).scalar_one()
         if (not spot or spot == None):
             raise HTTPException(status_code=404, detail="Spot not found.")
         if (spot.available_slots < spot.no_of_slots):
             raise HTTPException(status_code=400, detail="Spot not empty.")
-        db.query(Review).filter(Review.spot_id == spot_id).delete()
-        db.query(Spot).filter(Spot.spot_id == spot_id).delete()
-        db.commit()
+        await db.execute(delete(Review).where(Review.spot_id == spot_id))
+        await db.execute(delete(SpotRatingSummary).where(SpotRatingSummary.spot_id == spot_id))
+        await db.execute(delete(SpotHourlyRollup).where(SpotHourlyRollup.spot_id == spot_id))
+        await db.execute(delete(WaitlistEntry).where(WaitlistEntry.spot_id == spot_id))
+        await db.execute(delete(Spot).where(Spot.spot_id == spot_id))
+        await db.commit()
         return "Success"
     except Exception as db_error:
-        db.rollback()
-        db.commit()
+        await db.rollback()
+        await db.commit()
         raise HTTPException(
             status_code=500, detail="Error deleting spot: " + str(db_error))
@@ -0,0 +1,134 @@
+from datetime import datetime, timezone
+from typing import Optional
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.services.waitlist_service import hold_released_slots
+from app.services.parking_service import publish_availability
+
+
+def _missed_bookings_query(user_id: Optional[str], after: Optional[tuple]):
+    """
+    Build the statement that marks one batch of expired bookings as missed and
+    releases their slots, grouped by spot, in a single round trip.
+    """
+    filters = [
+        "status = 'Booked'",
+        "end_date_time < :now",
+    ]
+    if user_id is not None:
+        filters.append("user_id = :user_id")
+    if after is not None:
+        filters.append("(end_date_time, id) > (:after_end, :after_id)")
+
+    return text(f"""
+        WITH expired AS (
+            SELECT id FROM bookings
+            WHERE {" AND ".join(filters)}
+            ORDER BY end_date_time, id
+            LIMIT :batch_size
+            FOR UPDATE SKIP LOCKED
+        ),
+        missed AS (
+            UPDATE bookings SET status = 'Missed Booking'
+            FROM expired
+            WHERE bookings.id = expired.id
+            RETURNING bookings.id, bookings.spot_id, bookings.total_slots,
+                      bookings.end_date_time AS end_at
+        ),
+        released AS (
+            UPDATE spots
+            SET available_slots = LEAST(spots.available_slots + freed.slots, spots.no_of_slots)
+            FROM (
+                SELECT spot_id, SUM(total_slots) AS slots FROM missed GROUP BY spot_id
+            ) AS freed
+            WHERE spots.spot_id = freed.spot_id
+            RETURNING spots.spot_id
+        )
+        SELECT COUNT(*) OVER () AS missed_count, id, end_at,
+               (SELECT array_agg(spot_id) FROM released) AS released_spot_ids,
+               (SELECT array_agg(r.spot_id) FROM released r
+                WHERE EXISTS (
+                    SELECT 1 FROM waitlist_entries w
+                    WHERE w.spot_id = r.spot_id AND w.status = 'waiting'
+                )) AS waitlisted_spot_ids
+        FROM missed
+        ORDER BY end_at DESC, id DESC
+        LIMIT 1
+    """)
+
+
+def release_missed_bookings(db: Session, user_id: Optional[str] = None,
+                            batch_size: int = None, max_batches: int = None) -> int:
+    """
+    Mark every expired booking that was never checked in as "Missed Booking" and
+    return its slots to the spot.
+    Work is done in bounded batches, each in its own short transaction, walking
+    forward from a (end_date_time, id) high-water mark so a pass never revisits rows.
+    Rows locked by a concurrent check-in or cancellation are skipped, not waited on.
+    Released slots of spots with a waitlist are offered to the head of the queue in the
+    same transaction, and the new availability is then pushed to live subscribers.
+
+    Parameters:
+        db (Session): SQLAlchemy database session
+        user_id (str, optional): Restrict the sweep to a single user's bookings
+        batch_size (int, optional): Bookings processed per statement
+        max_batches (int, optional): Upper bound on statements issued in one pass
+
+    Returns:
+        int: Number of bookings marked as missed
+
+    Example:
+        release_missed_bookings(db)
+        mark all expired "Booked" bookings as "Missed Booking" and free their slots
+        return the number of bookings updated
+    """
+    batch_size = batch_size or settings.MISSED_BOOKING_SWEEP_BATCH_SIZE
+    max_batches = max_batches or settings.MISSED_BOOKING_SWEEP_MAX_BATCHES
+    now = datetime.now(timezone.utc)
+    after = None
+    total_missed = 0
+    released_spots = set()
+
+    try:
+        for _ in range(max_batches):
+            params = {"now": now, "batch_size": batch_size}
+            if user_id is not None:
+                params["user_id"] = user_id
+            if after is not None:
+                params["after_end"], params["after_id"] = after
+
+            row = db.execute(_missed_bookings_query(user_id, after), params).fetchone()
+            if row:
+                for spot_id in sorted(row.waitlisted_spot_ids or []):
+                    hold_released_slots(db, spot_id)
+            db.commit()
+
+            if not row:
+                break
+            total_missed += row.missed_count
+            released_spots.update(row.released_spot_ids or [])
+            after = (row.end_at, row.id)
+            if row.missed_count < batch_size:
+                break
+    except Exception:
+        db.rollback()
+        raise
+
+    publish_availability(db, released_spots)
+    return total_missed
+
+
+def sweep_missed_bookings():
+    """
+    Scheduled entry point for the missed booking sweeper.
+    Opens its own session since it runs outside of any request.
+    """
+    db = SessionLocal()
+    try:
+        missed = release_missed_bookings(db)
+        if missed:
+            print(f"[missed-booking-sweeper] released {missed} missed bookings")
+    finally:
+        db.close()
@@ -1,12 +1,9 @@
 # app/services/user_service.py
 
 from fastapi import Depends
-from sqlalchemy.orm import Session
-from sqlalchemy.sql import func
-from app.db.payment_model import Payment
-from app.db.booking_model import Booking
-from app.db.spot_model import Spot
-from app.db.session import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.session import get_async_db
 from app.db.oauth_model import OAuthUser
 from app.schemas.user import UserProfile, UserUpdate, OwnerProfile
 from app.core.oauth import oauth2_scheme
@@ -19,10 +16,10 @@ class AuthenticationError(Exception):
         self.message = message
         super().__init__(self.message)
 
-async def get_profile_data(user_id: str, token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+async def get_profile_data(user_id: str, token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)):
     try:
-        user = db.query(OAuthUser).filter(
-            OAuthUser.provider_id == user_id).first()
+        user = (await db.execute(select(OAuthUser).where(
+            OAuthUser.provider_id == user_id))).scalars().first()
         if not user:
             raise KeyError("User not found")
 
@@ -30,21 +27,12 @@ async def get_profile_data(user_id: str, token: str = Depends(oauth2_scheme), db
         if not payload:
             raise AuthenticationError("Invalid token")
 
-        # Calculate total earnings
-        total_earnings = (
-            db.query(func.sum(Payment.amount))
-            .join(Booking, Payment.id == Booking.payment_id)
-            .join(Spot, Booking.spot_id == Spot.spot_id)
-            .filter(Spot.owner_id == user_id)
-            .scalar()
-        ) or 0  # Default to 0 if no earnings
-
         return UserProfile(
             id=user.provider_id,
             name=user.name,
             email=user.email,
             phone=user.phone,
-            total_earnings=total_earnings,
+            total_earnings=user.total_earnings,
             profile_picture=user.profile_picture
         )
     except KeyError as usernotfoundError:
@@ -59,7 +47,7 @@ async def get_profile_data(user_id: str, token: str = Depends(oauth2_scheme), db
         raise general_error
 
 
-async def update_profile_details(user_id: str, user_update: UserUpdate, token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+async def update_profile_details(user_id: str, user_update: UserUpdate, token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)):
     """
     Update authenticated user profile.
 
@@ -67,7 +55,7 @@ async def update_profile_details(user_id: str, user_update: UserUpdate, token: s
         user_id (str): The ID of the user
         user_update (UserUpdate): The user details to update
         token (str): The OAuth2 token
-        db (Session): The database session
+        db (AsyncSession): The database session
 
     Returns:
         UserProfile: The updated user's profile information
@@ -79,8 +67,8 @@ async def update_profile_details(user_id: str, user_update: UserUpdate, token: s
             500: Any other error occurs during the process
     """
     try:
-        user = db.query(OAuthUser).filter(
-            OAuthUser.provider_id == user_id).first()
+        user = (await db.execute(select(OAuthUser).where(
+            OAuthUser.provider_id == user_id))).scalars().first()
         if not user:
             raise KeyError("User not found")
 
@@ -97,8 +85,8 @@ async def update_profile_details(user_id: str, user_update: UserUpdate, token: s
         if user_update.profile_picture is not None:
             user.profile_picture = user_update.profile_picture
 
-        db.commit()
-        db.refresh(user)
+        await db.commit()
+        await db.refresh(user)
 
         return UserProfile(
             id=user.provider_id,
@@ -120,13 +108,13 @@ async def update_profile_details(user_id: str, user_update: UserUpdate, token: s
         raise general_error
 
 
-async def get_profile_unauth(user_id: str, db: Session = Depends(get_db)):
+async def get_profile_unauth(user_id: str, db: AsyncSession = Depends(get_async_db)):
     """
     Fetch un-authenticated user profile.
 
     Parameters:
         user_id (str): The ID of the user
-        db (Session): The database session
+        db (AsyncSession): The database session
 
     Returns:
         UserProfile: The user's profile information
@@ -136,8 +124,8 @@ async def get_profile_unauth(user_id: str, db: Session = Depends(get_db)):
             404: If the user is not found
     """
     try:
-        user = db.query(OAuthUser).filter(
-            OAuthUser.provider_id == user_id).first()
+        user = (await db.execute(select(OAuthUser).where(
+            OAuthUser.provider_id == user_id))).scalars().first()
         if not user:
             raise KeyError("User not found")
 
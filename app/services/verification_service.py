@@ -1,17 +1,99 @@
-from sqlalchemy.orm import Session
+from datetime import timedelta
+from sqlalchemy import Integer, any_, cast, func, or_, select, update
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException
+from app.core.config import settings
 from app.db.spot_model import Spot, Document
 from typing import List, Optional
 from app.schemas.verification import SpotVerification, DocumentInfo
 
 
-def get_pending_spot_verifications(db: Session) -> List[SpotVerification]:
+async def get_pending_spots_with_documents(db: AsyncSession, spot_ids: Optional[List[int]] = None) -> List[tuple]:
+    """
+    Load the spots pending verification together with the metadata of their documents
+    in a single query. Document contents and spot images are left in the database,
+    the documents are fetched one at a time by id through /spots/documents/view/{id}.
+
+    Parameters:
+        db (AsyncSession): The database session
+        spot_ids (List[int], optional): Restrict the result to these spots
+
+    Returns:
+        List[tuple]: (spot row, list of document rows) per pending spot, in spot_id order
+    """
+    query = (
+        select(Spot.spot_id, Spot.spot_title, Spot.description, Spot.address, Spot.owner_id,
+               Document.id.label("document_id"), Document.document_type, Document.filename,
+               Document.uploaded_at, Document.status, Document.page_count, Document.validation_error)
+        .outerjoin(Document, Document.spot_id == Spot.spot_id)
+        .where(Spot.verification_status == 0)
+        .order_by(Spot.spot_id, Document.id)
+    )
+    if spot_ids is not None:
+        query = query.where(Spot.spot_id == any_(cast(spot_ids, ARRAY(Integer))))
+    rows = (await db.execute(query)).all()
+
+    spots = {}
+    for row in rows:
+        spot, documents = spots.setdefault(row.spot_id, (row, []))
+        if row.document_id is not None:
+            documents.append(row)
+    return list(spots.values())
+
+
+def document_url(document_id: int) -> str:
+    return f"spots/documents/view/{document_id}"
+
+
+def _to_spot_verifications(spots: List[tuple]) -> List[SpotVerification]:
+    pending_spots = []
+    for spot, documents in spots:
+        identity_proof_document: Optional[DocumentInfo] = None
+        ownership_proof_document: Optional[DocumentInfo] = None
+        supporting_document: Optional[DocumentInfo] = None
+
+        for doc in documents:
+            doc_info = DocumentInfo(
+                document_id=doc.document_id,
+                file_name=doc.filename,
+                file_type=doc.document_type,
+                url=document_url(doc.document_id),
+                uploaded_at=doc.uploaded_at,
+                status=doc.status,
+                page_count=doc.page_count,
+                validation_error=doc.validation_error
+            )
+            if doc.document_type.lower() == "identity_proof":
+                identity_proof_document = doc_info
+            elif doc.document_type.lower() == "ownership_proof":
+                ownership_proof_document = doc_info
+            elif doc.document_type.lower() == "supporting_document":
+                supporting_document = doc_info
+
+        pending_spots.append(
+            SpotVerification(
+                spot_id=spot.spot_id,
+                spot_title=spot.spot_title,
+                spot_description=spot.description or "",
+                spot_address=spot.address or "",
+                owner_id=spot.owner_id,
+                identity_proof_document=identity_proof_document,
+                ownership_proof_document=ownership_proof_document,
+                supporting_document=supporting_document
+            )
+        )
+    return pending_spots
+
+
+async def get_pending_spot_verifications(db: AsyncSession) -> List[SpotVerification]:
     """
     Retrieve a list of all spots pending verification (verification_status == 0), 
-    along with their associated documents sorted by document type.
+    along with their associated documents sorted by document type. Documents are
+    listed by name and URL only, their contents are served by /spots/documents/view/{id}.
 
     Parameters:
-        db (Session): The database session
+        db (AsyncSession): The database session
 
     Returns:
         List[SpotVerification]: List of spots with their documents for verification
@@ -23,45 +105,10 @@ def get_pending_spot_verifications(db: Session) -> List[SpotVerification]:
         Exception: For any other unexpected errors.
     """
     try:
-        spots = db.query(Spot).filter(Spot.verification_status == 0).all()
+        spots = await get_pending_spots_with_documents(db)
         if not spots:
             raise KeyError("No pending verification requests found.")
-
-        pending_spots = []
-        for spot in spots:
-            documents = db.query(Document).filter(
-                Document.spot_id == spot.spot_id).all()
-            identity_proof_document: Optional[DocumentInfo] = None
-            ownership_proof_document: Optional[DocumentInfo] = None
-            supporting_document: Optional[DocumentInfo] = None
-
-            for doc in documents:
-                doc_info = DocumentInfo(
-                    file_name=doc.filename,
-                    file_type=doc.document_type,
-                    file_data=doc.content,
-                    uploaded_at=doc.uploaded_at
-                )
-                if doc.document_type.lower() == "identity_proof":
-                    identity_proof_document = doc_info
-                elif doc.document_type.lower() == "ownership_proof":
-                    ownership_proof_document = doc_info
-                elif doc.document_type.lower() == "supporting_document":
-                    supporting_document = doc_info
-
-            pending_spots.append(
-                SpotVerification(
-                    spot_id=spot.spot_id,
-                    spot_title=spot.spot_title,
-                    spot_description=getattr(spot, "description", ""),
-                    spot_address=getattr(spot, "address", ""),
-                    owner_id=spot.owner_id,
-                    identity_proof_document=identity_proof_document,
-                    ownership_proof_document=ownership_proof_document,
-                    supporting_document=supporting_document
-                )
-            )
-        return pending_spots
+        return _to_spot_verifications(spots)
     except KeyError as no_pending_spots:
         raise no_pending_spots
     except ValueError as value_error:
@@ -72,12 +119,126 @@ def get_pending_spot_verifications(db: Session) -> List[SpotVerification]:
         raise general_error
 
 
-def accept_request(db: Session, spot_id: int):
+def _unclaimed_or_claimed_by(admin_id: str):
+    """Pending spots nobody holds a live lease on, or whose lease belongs to admin_id."""
+    return or_(
+        Spot.verification_lease_until.is_(None),
+        Spot.verification_lease_until < func.now(),
+        Spot.verification_claimed_by == admin_id,
+    )
+
+
+async def claim_verifications(db: AsyncSession, admin_id: str, limit: int) -> List[SpotVerification]:
+    """
+    Lease the next pending spots to an admin for VERIFICATION_LEASE_SECONDS.
+    Spots leased to other admins are not handed out again until their lease runs
+    out, and rows another admin is claiming at the same moment are skipped rather
+    than waited on (FOR UPDATE SKIP LOCKED), so concurrent admins get disjoint
+    batches. Spots the admin already holds can be claimed again, renewing their lease.
+
+    Parameters:
+        db (AsyncSession): The database session
+        admin_id (str): The admin claiming the spots
+        limit (int): Maximum number of spots to claim
+
+    Returns:
+        List[SpotVerification]: The claimed spots with their documents, in spot_id order
+
+    Raises:
+        KeyError: If no pending spot is free to claim.
+        Exception: For any other unexpected errors.
+    """
+    try:
+        claimable = (
+            select(Spot.spot_id)
+            .where(Spot.verification_status == 0, _unclaimed_or_claimed_by(admin_id))
+            .order_by(Spot.spot_id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+            .cte("claimable")
+        )
+        claimed = (await db.execute(
+            update(Spot)
+            .where(Spot.spot_id == claimable.c.spot_id)
+            .values(verification_claimed_by=admin_id,
+                    verification_lease_until=func.now() + timedelta(seconds=settings.VERIFICATION_LEASE_SECONDS))
+            .returning(Spot.spot_id)
+            .execution_options(synchronize_session=False)
+        )).scalars().all()
+        await db.commit()
+        if not claimed:
+            raise KeyError("No pending verification requests to claim.")
+        return _to_spot_verifications(await get_pending_spots_with_documents(db, list(claimed)))
+    except KeyError as no_pending_spots:
+        raise no_pending_spots
+    except Exception as general_error:
+        await db.rollback()
+        raise general_error
+
+
+async def decide_verifications(db: AsyncSession, admin_id: str, spot_ids: List[int], status: int) -> dict:
+    """
+    Accept (status 1) or reject (status -1) a batch of pending spots in one UPDATE.
+    A spot is decided unless it is no longer pending or another admin holds a live
+    lease on it, those are reported back as skipped.
+
+    Parameters:
+        db (AsyncSession): The database session
+        admin_id (str): The admin deciding the spots
+        spot_ids (List[int]): The spots to decide
+        status (int): The new verification_status, 1 or -1
+
+    Returns:
+        dict: "decided" and "skipped" spot ids, in the order they were given
+
+    Raises:
+        ValueError: If status is neither 1 nor -1.
+        Exception: For any other unexpected errors.
+    """
+    if status not in (1, -1):
+        raise ValueError("Verification status must be 1 (accepted) or -1 (rejected).")
+    try:
+        spot_ids = list(dict.fromkeys(spot_ids))
+        decided = set((await db.execute(
+            update(Spot)
+            .where(Spot.spot_id == any_(cast(spot_ids, ARRAY(Integer))),
+                   Spot.verification_status == 0,
+                   _unclaimed_or_claimed_by(admin_id))
+            .values(verification_status=status, verification_claimed_by=None, verification_lease_until=None)
+            .returning(Spot.spot_id)
+            .execution_options(synchronize_session=False)
+        )).scalars().all())
+        await db.commit()
+        return {
+            "decided": [spot_id for spot_id in spot_ids if spot_id in decided],
+            "skipped": [spot_id for spot_id in spot_ids if spot_id not in decided],
+        }
+    except Exception as general_error:
+        await db.rollback()
+        raise general_error
+
+
+async def _set_verification_status(db: AsyncSession, spot_id: int, status: int) -> Spot:
+    """Set the verification_status of a spot and drop its claim in one UPDATE ... RETURNING."""
+    spot = (await db.execute(
+        update(Spot)
+        .where(Spot.spot_id == spot_id)
+        .values(verification_status=status, verification_claimed_by=None, verification_lease_until=None)
+        .returning(Spot)
+        .execution_options(synchronize_session=False)
+    )).scalars().first()
+    if not spot:
+        raise KeyError("Spot not found")
+    await db.commit()
+    return spot
+
+
+async def accept_request(db: AsyncSession, spot_id: int):
     """
     Accept a spot verification request by updating the spot's verification_status to 1.
 
     Parameters:
-        db (Session): The database session
+        db (AsyncSession): The database session
         spot_id (int): The ID of the spot to accept
 
     Returns:
@@ -90,14 +251,7 @@ def accept_request(db: Session, spot_id: int):
         Exception: For any other unexpected errors.
     """
     try:
-        spot_check = db.query(Spot.spot_id).filter(Spot.spot_id == spot_id).first()
-        if not spot_check:
-            raise KeyError("Spot not found")
-        spot = db.query(Spot).filter(Spot.spot_id == spot_id).first()
-        spot.verification_status = 1
-        db.commit()
-        db.refresh(spot)
-        return spot
+        return await _set_verification_status(db, spot_id, 1)
     except KeyError as spot_not_found:
         raise spot_not_found
     except ValueError as value_error:
@@ -108,12 +262,12 @@ def accept_request(db: Session, spot_id: int):
         raise general_error
 
 
-def reject_request(db: Session, spot_id: int):
+async def reject_request(db: AsyncSession, spot_id: int):
     """
     Reject a spot verification request by updating the spot's verification_status to -1.
 
     Parameters:
-        db (Session): The database session
+        db (AsyncSession): The database session
         spot_id (int): The ID of the spot to reject
 
     Returns:
@@ -126,14 +280,7 @@ def reject_request(db: Session, spot_id: int):
         Exception: For any other unexpected errors.
     """
     try:
-        spot_check = db.query(Spot.spot_id).filter(Spot.spot_id == spot_id).first()
-        if not spot_check:
-            raise KeyError("Spot not found")
-        spot = db.query(Spot).filter(Spot.spot_id == spot_id).first()
-        spot.verification_status = -1
-        db.commit()
-        db.refresh(spot)
-        return spot
+        return await _set_verification_status(db, spot_id, -1)
     except KeyError as spot_not_found:
         raise spot_not_found
     except ValueError as value_error:
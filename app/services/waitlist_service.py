@@ -0,0 +1,236 @@
+from datetime import datetime, timedelta, timezone
+from typing import List
+from sqlalchemy import func, text
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.db.spot_model import Spot
+from app.db.waitlist_model import WaitlistEntry
+from app.services.parking_service import publish_availability
+from app.schemas.waitlist import WaitlistJoin, WaitlistEntryInfo
+
+
+def _queue_position(db: Session, entry: WaitlistEntry):
+    """1-based position of a waiting entry in its spot's queue, None once it left the queue."""
+    if entry.status != "waiting":
+        return None
+    ahead = db.query(func.count(WaitlistEntry.id)).filter(
+        WaitlistEntry.spot_id == entry.spot_id,
+        WaitlistEntry.status == "waiting",
+        WaitlistEntry.id < entry.id,
+    ).scalar()
+    return ahead + 1
+
+
+def _to_info(db: Session, entry: WaitlistEntry) -> WaitlistEntryInfo:
+    return WaitlistEntryInfo(
+        id=entry.id,
+        user_id=entry.user_id,
+        spot_id=entry.spot_id,
+        total_slots=entry.total_slots,
+        start_date_time=entry.start_date_time,
+        end_date_time=entry.end_date_time,
+        status=entry.status,
+        offered_until=entry.offered_until,
+        position=_queue_position(db, entry),
+    )
+
+
+def join_waitlist(db: Session, entry_data: WaitlistJoin) -> WaitlistEntryInfo:
+    """
+    Add a user to the waitlist of a sold out spot for a booking window.
+    Joining twice for the same spot and window returns the existing entry.
+
+    Parameters:
+        db (Session): SQLAlchemy database session
+        entry_data (WaitlistJoin): Spot, window and number of slots wanted
+
+    Returns:
+        WaitlistEntryInfo: The entry and its position in the queue
+
+    Raises:
+        KeyError: If the spot is not found.
+        ValueError: If the window is invalid or asks for more slots than the spot has.
+    """
+    try:
+        spot = db.query(Spot.no_of_slots).filter(Spot.spot_id == entry_data.spot_id).first()
+        if not spot:
+            raise KeyError("Spot not found")
+        if entry_data.end_date_time <= entry_data.start_date_time:
+            raise ValueError("Booking window must end after it starts")
+        if entry_data.end_date_time <= datetime.now(timezone.utc):
+            raise ValueError("Booking window has already ended")
+        if entry_data.total_slots < 1 or entry_data.total_slots > (spot.no_of_slots or 0):
+            raise ValueError("Requested slots exceed the capacity of the spot")
+
+        entry = db.query(WaitlistEntry).filter(
+            WaitlistEntry.spot_id == entry_data.spot_id,
+            WaitlistEntry.user_id == entry_data.user_id,
+            WaitlistEntry.start_date_time == entry_data.start_date_time,
+            WaitlistEntry.end_date_time == entry_data.end_date_time,
+            WaitlistEntry.status.in_(["waiting", "offered"]),
+        ).first()
+        if not entry:
+            entry = WaitlistEntry(**entry_data.model_dump(), status="waiting")
+            db.add(entry)
+            db.commit()
+            db.refresh(entry)
+        return _to_info(db, entry)
+    except Exception:
+        db.rollback()
+        raise
+
+
+def get_waitlist_entry(db: Session, entry_id: int) -> WaitlistEntryInfo:
+    """
+    Retrieve a waitlist entry with its current queue position.
+
+    Raises:
+        KeyError: If the entry is not found.
+    """
+    entry = db.query(WaitlistEntry).filter(WaitlistEntry.id == entry_id).first()
+    if not entry:
+        raise KeyError("Waitlist entry not found")
+    return _to_info(db, entry)
+
+
+def get_user_waitlist(db: Session, user_id: str) -> List[WaitlistEntryInfo]:
+    """
+    Retrieve the waiting and offered entries of a user.
+    """
+    entries = db.query(WaitlistEntry).filter(
+        WaitlistEntry.user_id == user_id,
+        WaitlistEntry.status.in_(["waiting", "offered"]),
+    ).order_by(WaitlistEntry.id).all()
+    return [_to_info(db, entry) for entry in entries]
+
+
+def leave_waitlist(db: Session, entry_id: int) -> WaitlistEntryInfo:
+    """
+    Remove an entry from the queue. Slots held for an open offer go to the next in line.
+
+    Raises:
+        KeyError: If the entry is not found.
+        ValueError: If the entry was already claimed, cancelled or expired.
+    """
+    try:
+        entry = db.query(WaitlistEntry).filter(WaitlistEntry.id == entry_id).with_for_update().first()
+        if not entry:
+            raise KeyError("Waitlist entry not found")
+        if entry.status not in ("waiting", "offered"):
+            raise ValueError(f"Waitlist entry is already {entry.status}")
+
+        was_offered = entry.status == "offered"
+        entry.status = "cancelled"
+        if was_offered:
+            db.execute(text("""
+                UPDATE spots SET available_slots = LEAST(available_slots + :slots, no_of_slots)
+                WHERE spot_id = :spot_id
+            """), {"slots": entry.total_slots, "spot_id": entry.spot_id})
+            hold_released_slots(db, entry.spot_id)
+        db.commit()
+
+        if was_offered:
+            publish_availability(db, [entry.spot_id])
+        return _to_info(db, entry)
+    except Exception:
+        db.rollback()
+        raise
+
+
+def hold_released_slots(db: Session, spot_id: int) -> int:
+    """
+    Offer freed slots of a spot to the head of its waitlist, inside the caller's transaction.
+    Slots for each offer are held (taken out of available_slots) for the claim window,
+    in strict queue order: the head blocks the queue until enough slots are free for it.
+    Callers that free slots run this before they commit, so the slots are never visible
+    as available to a direct booking ahead of the queue. Nothing is committed or published.
+
+    Parameters:
+        db (Session): SQLAlchemy database session
+        spot_id (int): Spot whose slots were released
+
+    Returns:
+        int: Number of offers made
+    """
+    now = datetime.now(timezone.utc)
+    offered_until = now + timedelta(seconds=settings.WAITLIST_CLAIM_WINDOW_SECONDS)
+    offers = 0
+    spot = db.query(Spot).filter(Spot.spot_id == spot_id).with_for_update().populate_existing().first()
+    if not spot:
+        return 0
+
+    while True:
+        head = db.query(WaitlistEntry).filter(
+            WaitlistEntry.spot_id == spot_id,
+            WaitlistEntry.status == "waiting",
+        ).order_by(WaitlistEntry.id).with_for_update(skip_locked=True).first()
+        if not head:
+            break
+        if head.end_date_time <= now:
+            head.status = "expired"
+            db.flush()
+            continue
+        if head.total_slots > spot.available_slots:
+            break
+        spot.available_slots -= head.total_slots
+        head.status = "offered"
+        head.offered_until = offered_until
+        db.flush()
+        offers += 1
+    return offers
+
+
+def expire_waitlist_offers(db: Session) -> int:
+    """
+    Return the slots of offers that were not claimed in time and pass them on,
+    and drop waiting entries whose booking window already ended.
+
+    Returns:
+        int: Number of lapsed offers
+    """
+    now = datetime.now(timezone.utc)
+    try:
+        db.execute(text("""
+            UPDATE waitlist_entries SET status = 'expired'
+            WHERE status = 'waiting' AND end_date_time <= :now
+        """), {"now": now})
+        released = db.execute(text("""
+            WITH lapsed AS (
+                UPDATE waitlist_entries SET status = 'expired'
+                WHERE status = 'offered' AND offered_until < :now
+                RETURNING spot_id, total_slots
+            ),
+            released AS (
+                UPDATE spots
+                SET available_slots = LEAST(spots.available_slots + freed.slots, spots.no_of_slots)
+                FROM (
+                    SELECT spot_id, SUM(total_slots) AS slots FROM lapsed GROUP BY spot_id
+                ) AS freed
+                WHERE spots.spot_id = freed.spot_id
+                RETURNING spots.spot_id
+            )
+            SELECT (SELECT COUNT(*) FROM lapsed) AS lapsed_count, spot_id FROM released
+            ORDER BY spot_id
+        """), {"now": now}).fetchall()
+        for row in released:
+            hold_released_slots(db, row.spot_id)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    publish_availability(db, [row.spot_id for row in released])
+    return released[0].lapsed_count if released else 0
+
+
+def expire_waitlist_job():
+    """
+    Scheduled entry point for waitlist offer expiry.
+    Opens its own session since it runs outside of any request.
+    """
+    db = SessionLocal()
+    try:
+        expire_waitlist_offers(db)
+    finally:
+        db.close()
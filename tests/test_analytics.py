@@ -0,0 +1,87 @@
+import pytest
+from sqlalchemy.orm import Session
+from datetime import datetime
+from tests.test_config import client, db, clean_test_db, checkout_signature
+from app.db.oauth_model import OAuthUser
+from app.db.payment_model import Payment
+from app.db.booking_model import Booking
+from app.db.spot_model import Spot
+
+@pytest.fixture
+def owner_spot(db: Session):
+    owner = OAuthUser(
+        provider="google",
+        provider_id="owner_test",
+        email="owner@example.com",
+        name="Test Owner",
+        profile_picture="http://example.com/avatar.png",
+        access_token="mock_token"
+    )
+    spot = Spot(
+        owner_id="owner_test",
+        spot_title="Test Spot",
+        address="123 Test St",
+        latitude=0.0,
+        longitude=0.0,
+        hourly_rate=10,
+        no_of_slots=4,
+        available_slots=4,
+        open_time="08:00:00",
+        close_time="20:00:00",
+        description="Test spot description",
+        available_days=["Monday", "Tuesday"],
+        image=[b"mock_image_data"],
+        created_at=datetime.now()
+    )
+    db.add_all([owner, spot])
+    db.commit()
+    return spot
+
+def pay_and_book(db, spot, order_id, amount, start, end, total_slots):
+    payment = Payment(user_id="test_user", spot_id=spot.spot_id, amount=amount, status="pending",
+                      razorpay_order_id=order_id, total_slots=total_slots,
+                      start_date_time=f"{start}+05:30", end_date_time=f"{end}+05:30")
+    db.add(payment)
+    db.commit()
+    response = client.post("/bookings/update-payment-status", json={
+        "payment_id": payment.id,
+        "razorpay_payment_id": f"rp_{order_id}",
+        "razorpay_signature": checkout_signature(order_id, f"rp_{order_id}"),
+        "start_time": start,
+        "end_time": end,
+        "total_slots": total_slots
+    })
+    assert response.status_code == 200
+    return db.query(Booking).filter(Booking.payment_id == payment.id).one()
+
+def test_rollups_follow_bookings(owner_spot, db):
+    pay_and_book(db, owner_spot, "order_a", 40, "2025-01-01T10:30:00", "2025-01-01T12:15:00", 2)
+    cancelled = pay_and_book(db, owner_spot, "order_b", 10, "2025-01-01T11:00:00", "2025-01-01T12:00:00", 1)
+    pay_and_book(db, owner_spot, "order_c", 20, "2025-01-02T09:00:00", "2025-01-02T11:00:00", 1)
+    assert client.delete(f"/bookings/{cancelled.id}").status_code == 200
+
+    window = {"start": "2025-01-01T00:00:00", "end": "2025-01-03T00:00:00"}
+    occupancy = client.get("/analytics/owner/owner_test/occupancy", params=window).json()
+    by_hour = {bucket["bucket_start"][:16]: bucket for bucket in occupancy}
+    assert by_hour["2025-01-01T10:00"]["occupied_slot_hours"] == 1.0
+    assert by_hour["2025-01-01T11:00"]["occupied_slot_hours"] == 2.0
+    assert by_hour["2025-01-01T11:00"]["cancellations"] == 1
+    assert by_hour["2025-01-01T12:00"]["occupancy_rate"] == 0.125
+
+    revenue = client.get("/analytics/owner/owner_test/revenue", params=window).json()
+    assert revenue == [
+        {"day": "2025-01-01", "bookings": 2, "revenue": 50},
+        {"day": "2025-01-02", "bookings": 1, "revenue": 20},
+    ]
+
+    invalid = client.get("/analytics/owner/owner_test/revenue",
+                         params={"start": "2025-01-03T00:00:00", "end": "2025-01-01T00:00:00"})
+    assert invalid.status_code == 400
+
+def test_payment_adds_to_earnings(owner_spot, db):
+    pay_and_book(db, owner_spot, "order_a", 40, "2025-01-01T10:00:00", "2025-01-01T12:00:00", 2)
+    pay_and_book(db, owner_spot, "order_b", 10, "2025-01-01T11:00:00", "2025-01-01T12:00:00", 1)
+
+    db.expire_all()
+    assert owner_spot.total_earnings == 50
+    assert db.query(OAuthUser).filter(OAuthUser.provider_id == "owner_test").one().total_earnings == 50
@@ -1,10 +1,13 @@
+import json
 import pytest
 from sqlalchemy.orm import Session
 from datetime import datetime
-from tests.test_config import client, db, clean_test_db
+from tests.test_config import client, db, clean_test_db, checkout_signature
 from app.db.oauth_model import OAuthUser
 from app.db.payment_model import Payment
+from app.db.booking_model import Booking
 from app.db.spot_model import Spot
+from app.services.sweeper_service import release_missed_bookings
 
 @pytest.fixture
 def create_test_data(db: Session):
@@ -85,7 +88,31 @@ def test_invalid_booking(create_test_data):
     }
     response = client.post("/bookings/book-spot/", json=payload)
     assert response.status_code == 400
-    assert response.json() == {"detail": "Failed to book the spot"}
+    assert response.json() == {"detail": "No Slot Available"}
+
+def test_booking_window_and_slots_are_validated(create_test_data, db):
+    spot, user, owner = create_test_data
+    payload = {
+        "user_id": user.provider_id,
+        "spot_id": spot.spot_id,
+        "total_slots": 1,
+        "start_date_time": "2999-10-01T12:00:00",
+        "end_date_time": "2999-10-01T07:00:00",  # Ends before it starts
+        "total_amount": 10,
+        "receipt": "receipt_inverted"
+    }
+    response = client.post("/bookings/book-spot", json=payload)
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Booking window must end after it starts"}
+
+    payload.update(end_date_time="2999-10-01T14:00:00", total_slots=0, total_amount=0)
+    response = client.post("/bookings/book-spot", json=payload)
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Requested slots exceed the capacity of the spot"}
+
+    db.expire_all()
+    assert spot.available_slots == 5
+    assert db.query(Payment).count() == 0
 
 def test_update_booking_valid(create_test_data, db):
     # Create test user, spot, and payment entry
@@ -96,7 +123,10 @@ def test_update_booking_valid(create_test_data, db):
         spot_id=spot.spot_id,
         amount=20,
         status="pending",
-        razorpay_order_id="order_xyz"
+        razorpay_order_id="order_xyz",
+        total_slots=1,
+        start_date_time="2025-04-23T10:00:00+05:30",
+        end_date_time="2025-04-23T12:00:00+05:30"
     )
     db.add(payment)
     db.commit()
@@ -104,7 +134,7 @@ def test_update_booking_valid(create_test_data, db):
     payload = {
         "payment_id": 1,
         "razorpay_payment_id": "rp_payment_xyz",
-        "razorpay_signature": "valid_signature",
+        "razorpay_signature": checkout_signature("order_xyz", "rp_payment_xyz"),
         "start_time": "2025-04-23T10:00:00",
         "end_time": "2025-04-23T12:00:00",
         "total_slots": 1
@@ -115,6 +145,29 @@ def test_update_booking_valid(create_test_data, db):
     assert response.status_code == 200
     assert response.json()["payment_status"] == "success"
 
+def test_update_booking_books_the_payment_window(create_test_data, db):
+    spot, user, owner = create_test_data
+    payment = Payment(user_id=user.provider_id, spot_id=spot.spot_id, amount=20, status="pending",
+                      razorpay_order_id="order_window", total_slots=1,
+                      start_date_time="2025-04-23T10:00:00+05:30", end_date_time="2025-04-23T12:00:00+05:30")
+    db.add(payment)
+    db.commit()
+
+    # The client asks for more slots and a longer window than it paid for
+    response = client.post("/bookings/update-payment-status", json={
+        "payment_id": payment.id,
+        "razorpay_payment_id": "rp_payment_window",
+        "razorpay_signature": checkout_signature("order_window", "rp_payment_window"),
+        "start_time": "2025-04-23T08:00:00",
+        "end_time": "2025-04-23T20:00:00",
+        "total_slots": 5
+    })
+    assert response.status_code == 200
+
+    booking = db.query(Booking).filter(Booking.payment_id == payment.id).one()
+    assert booking.total_slots == 1
+    assert (booking.start_date_time, booking.end_date_time) == (payment.start_date_time, payment.end_date_time)
+
 def test_paymenet_not_found(create_test_data, db):
     # Create test user, spot, and payment entry
     spot, user, owner = create_test_data
@@ -129,5 +182,221 @@ def test_paymenet_not_found(create_test_data, db):
     }
 
     response = client.post("/bookings/update-payment-status", json=payload)
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Payment not found."
+
+def test_release_missed_bookings(create_test_data, db):
+    spot, user, owner = create_test_data
+    payment = Payment(
+        user_id=user.provider_id,
+        spot_id=spot.spot_id,
+        amount=20,
+        status="success",
+        razorpay_order_id="order_missed"
+    )
+    db.add(payment)
+    db.commit()
+
+    expired = Booking(user_id=user.provider_id, spot_id=spot.spot_id, total_slots=2,
+                      start_date_time="2023-10-01T10:00:00", end_date_time="2023-10-01T12:00:00",
+                      payment_id=payment.id, status="Booked")
+    checked_in = Booking(user_id=user.provider_id, spot_id=spot.spot_id, total_slots=1,
+                         start_date_time="2023-10-01T10:00:00", end_date_time="2023-10-01T12:00:00",
+                         payment_id=payment.id, status="Checked In")
+    upcoming = Booking(user_id=user.provider_id, spot_id=spot.spot_id, total_slots=1,
+                       start_date_time="2999-10-01T10:00:00", end_date_time="2999-10-01T12:00:00",
+                       payment_id=payment.id, status="Booked")
+    spot.available_slots = 1
+    db.add_all([expired, checked_in, upcoming])
+    db.commit()
+
+    assert release_missed_bookings(db, batch_size=1) == 1
+
+    db.expire_all()
+    assert expired.status == "Missed Booking"
+    assert checked_in.status == "Checked In"
+    assert upcoming.status == "Booked"
+    assert spot.available_slots == 3
+
+    # A second pass finds nothing left to release
+    assert release_missed_bookings(db) == 0
+
+def test_slots_are_released_once(create_test_data, db):
+    spot, user, owner = create_test_data
+    payment = Payment(user_id=user.provider_id, spot_id=spot.spot_id, amount=20, status="success",
+                      razorpay_order_id="order_cancel")
+    db.add(payment)
+    db.commit()
+    booked = Booking(user_id=user.provider_id, spot_id=spot.spot_id, total_slots=2,
+                     start_date_time="2999-10-01T10:00:00", end_date_time="2999-10-01T12:00:00",
+                     payment_id=payment.id, status="Booked")
+    missed = Booking(user_id=user.provider_id, spot_id=spot.spot_id, total_slots=1,
+                     start_date_time="2023-10-01T10:00:00", end_date_time="2023-10-01T12:00:00",
+                     payment_id=payment.id, status="Missed Booking")
+    spot.available_slots = 3
+    db.add_all([booked, missed])
+    db.commit()
+
+    assert client.delete(f"/bookings/{booked.id}").status_code == 200
+    response = client.delete(f"/bookings/{booked.id}")
+    assert response.status_code == 409
+    assert response.json()["detail"] == "A booking in status Cancelled cannot be cancelled"
+    assert client.delete(f"/bookings/{missed.id}").status_code == 409
+    assert client.put(f"/bookings/checkout/{missed.id}").status_code == 409
+    assert client.delete("/bookings/999999").status_code == 404
+
+    db.expire_all()
+    assert spot.available_slots == 5
+
+
+def test_update_booking_idempotency_key(create_test_data, db):
+    spot, user, owner = create_test_data
+    payment = Payment(
+        user_id=user.provider_id,
+        spot_id=spot.spot_id,
+        amount=20,
+        status="pending",
+        razorpay_order_id="order_retry",
+        total_slots=1,
+        start_date_time="2025-04-23T10:00:00+05:30",
+        end_date_time="2025-04-23T12:00:00+05:30"
+    )
+    db.add(payment)
+    db.commit()
+
+    payload = {
+        "payment_id": payment.id,
+        "razorpay_payment_id": "rp_payment_retry",
+        "razorpay_signature": checkout_signature("order_retry", "rp_payment_retry"),
+        "start_time": "2025-04-23T10:00:00",
+        "end_time": "2025-04-23T12:00:00",
+        "total_slots": 1
+    }
+    headers = {"Idempotency-Key": "confirm-retry-1"}
+
+    first = client.post("/bookings/update-payment-status", json=payload, headers=headers)
+    retry = client.post("/bookings/update-payment-status", json=payload, headers=headers)
+
+    assert first.status_code == 200
+    assert retry.status_code == 200
+    assert retry.json() == first.json()
+    assert db.query(Booking).filter(Booking.payment_id == payment.id).count() == 1
+
+    # The same key cannot be reused for a different request
+    payload["total_slots"] = 2
+    mismatch = client.post("/bookings/update-payment-status", json=payload, headers=headers)
+    assert mismatch.status_code == 422
+
+
+def test_update_booking_rejects_forged_signature(create_test_data, db):
+    spot, user, owner = create_test_data
+    payment = Payment(
+        user_id=user.provider_id,
+        spot_id=spot.spot_id,
+        amount=20,
+        status="pending",
+        razorpay_order_id="order_forged",
+        total_slots=1,
+        start_date_time="2025-04-23T10:00:00+05:30",
+        end_date_time="2025-04-23T12:00:00+05:30"
+    )
+    db.add(payment)
+    db.commit()
+
+    payload = {
+        "payment_id": payment.id,
+        "razorpay_payment_id": "rp_payment_forged",
+        "razorpay_signature": checkout_signature("order_other", "rp_payment_forged"),
+        "start_time": "2025-04-23T10:00:00",
+        "end_time": "2025-04-23T12:00:00",
+        "total_slots": 1
+    }
+    response = client.post("/bookings/update-payment-status", json=payload)
+
     assert response.status_code == 400
-    assert response.json()["detail"] == "Failed to update the payment status"
\ No newline at end of file
+    assert response.json()["detail"] == "Invalid payment signature."
+    db.expire_all()
+    assert db.get(Payment, payment.id).status == "pending"
+    assert db.query(Booking).filter(Booking.payment_id == payment.id).count() == 0
+
+
+def test_booking_history_pages(create_test_data, db):
+    spot, user, owner = create_test_data
+    payment = Payment(
+        user_id="42",
+        spot_id=spot.spot_id,
+        amount=20,
+        status="success",
+        razorpay_order_id="order_history"
+    )
+    db.add(payment)
+    db.commit()
+
+    # Two bookings share a start time, so the id breaks the tie between pages
+    starts = ["2025-01-01T10:00:00", "2025-01-02T10:00:00", "2025-01-02T10:00:00",
+              "2025-01-03T10:00:00", "2025-01-04T10:00:00"]
+    bookings = [
+        Booking(user_id="42", spot_id=spot.spot_id, total_slots=1, start_date_time=start,
+                end_date_time=start.replace("10:00", "12:00"), payment_id=payment.id,
+                status="Cancelled" if i == 0 else "Completed")
+        for i, start in enumerate(starts)
+    ]
+    db.add_all(bookings)
+    db.commit()
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/bookings/user/42", params=params)
+        assert response.status_code == 200
+        page = response.json()
+        assert len(page["items"]) <= 2
+        seen += [item["id"] for item in page["items"]]
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+
+    newest_first = sorted(bookings, key=lambda b: (b.start_date_time, b.id), reverse=True)
+    assert seen == [b.id for b in newest_first]
+
+    completed = client.get("/bookings/user/42", params={"status": "Completed",
+                                                         "start_from": "2025-01-02T00:00:00"})
+    assert [item["id"] for item in completed.json()["items"]] == [b.id for b in newest_first[:4]]
+
+    assert client.get("/bookings/user/42", params={"cursor": "not-a-cursor"}).status_code == 400
+
+
+def test_export_bookings(create_test_data, db):
+    spot, user, owner = create_test_data
+    payment = Payment(
+        user_id=user.provider_id,
+        spot_id=spot.spot_id,
+        amount=20,
+        status="success",
+        razorpay_order_id="order_export"
+    )
+    db.add(payment)
+    db.commit()
+    db.add_all([
+        Booking(user_id=user.provider_id, spot_id=spot.spot_id, total_slots=1,
+                start_date_time=f"2025-01-0{day}T10:00:00", end_date_time=f"2025-01-0{day}T12:00:00",
+                payment_id=payment.id, status="Completed")
+        for day in range(1, 6)
+    ])
+    db.commit()
+
+    response = client.get("/bookings/export")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert len(rows) == 5
+    assert rows[0]["spot_title"] == "Test Spot"
+    assert rows[0]["payment_amount"] == 20
+
+    response = client.get("/bookings/export", params={"format": "csv", "start_from": "2025-01-03T00:00:00"})
+    lines = response.text.splitlines()
+    assert lines[0].startswith("id,user_id,spot_id")
+    assert len(lines) == 4
@@ -2,17 +2,24 @@ import pytest
 from fastapi.testclient import TestClient
 from fastapi import HTTPException
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 from app.main import app
 from app.services.auth_service import verify_oauth_token, verify_google_token, verify_github_token
-from app.db.session import get_db, Base
+from app.db.query_monitor import capture_queries
+from app.db.session import get_db, get_async_db, get_async_read_db, Base, SessionLocal, AsyncSessionLocal
 from app.db.oauth_model import OAuthUser
 from app.db.payment_model import Payment
 from app.db.booking_model import Booking
 from app.db.spot_model import Spot, Document
 from app.db.review_model import Review
+from contextlib import contextmanager
+import hashlib
+import hmac
 import os
 from dotenv import load_dotenv
+from app.core.config import settings
 
 load_dotenv()
 DB_USER: str = os.getenv("DB_USER")
@@ -26,8 +33,18 @@ engine = create_engine(TEST_DATABASE_URL)
 TestingSessionLocal = sessionmaker(
     autocommit=False, autoflush=False, bind=engine)
 
-# Create the test database tables
-Base.metadata.create_all(bind=engine)
+# Async engine on the same database. Without pooling, since tests run coroutines
+# on more than one event loop and a connection cannot move between loops.
+async_engine = create_async_engine(
+    f"postgresql+psycopg://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/test", poolclass=NullPool,
+    connect_args={"client_encoding": "utf8"})
+TestingAsyncSessionLocal = async_sessionmaker(
+    async_engine, autoflush=False, expire_on_commit=False)
+
+# Sessions the app opens itself, outside of a dependency (streamed responses, jobs),
+# use the test database too
+SessionLocal.configure(bind=engine)
+AsyncSessionLocal.configure(bind=async_engine)
 
 def override_get_db():
     db = TestingSessionLocal()
@@ -36,6 +53,10 @@ def override_get_db():
     finally:
         db.close()
 
+async def override_get_async_db():
+    async with TestingAsyncSessionLocal() as db:
+        yield db
+
 def mock_verify_oauth_token(token: str = None, provider: str = None):
     """
     Mock function to simulate OAuth token verification.
@@ -82,8 +103,27 @@ def db():
     finally:
         db.close()
 
+def checkout_signature(razorpay_order_id: str, razorpay_payment_id: str) -> str:
+    """
+    Signature Razorpay checkout hands to the client for a paid order.
+    """
+    message = f"{razorpay_order_id}|{razorpay_payment_id}".encode()
+    return hmac.new(settings.RAZORPAY_KEY_SECRET.encode(), message, hashlib.sha256).hexdigest()
+
+@contextmanager
+def assert_max_queries(limit: int):
+    """
+    Fail if the block, including the requests it makes, runs more than limit SQL statements.
+    """
+    with capture_queries() as queries:
+        yield queries
+    assert queries.count <= limit, (
+        f"{queries.count} statements ran, at most {limit} expected:\n{queries.summary()}")
+
 # Overrides
 app.dependency_overrides[get_db] = override_get_db
+app.dependency_overrides[get_async_db] = override_get_async_db
+app.dependency_overrides[get_async_read_db] = override_get_async_db
 app.dependency_overrides[verify_oauth_token] = mock_verify_oauth_token
 app.dependency_overrides[verify_google_token] = mock_verify_google_token
 app.dependency_overrides[verify_github_token] = mock_verify_github_token
@@ -0,0 +1,140 @@
+import io
+import struct
+import zlib
+import pytest
+from datetime import datetime, timedelta, timezone
+from pypdf import PdfWriter
+from sqlalchemy.orm import Session
+from tests.test_config import client, db, clean_test_db
+from app.core.config import settings
+from app.db.oauth_model import OAuthUser
+from app.db.spot_model import Spot, Document
+from app.services.document_validation_service import validate_pdf, validate_documents, shutdown_validation_pool
+
+def make_pdf(pages: int = 1) -> bytes:
+    writer = PdfWriter()
+    for _ in range(pages):
+        writer.add_blank_page(width=100, height=100)
+    output = io.BytesIO()
+    writer.write(output)
+    return output.getvalue()
+
+def make_compressed_pdf(pages: int = 1) -> bytes:
+    """A PDF 1.5 file whose catalog, page tree and pages all sit in a compressed object stream."""
+    kids = " ".join(f"{3 + i} 0 R" for i in range(pages))
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", f"<< /Type /Pages /Kids [{kids}] /Count {pages} >>".encode()]
+    objects += [b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 100 100] >>"] * pages
+    header, body = b"", b""
+    for number, obj in enumerate(objects, start=1):
+        header += b"%d %d " % (number, len(body))
+        body += obj + b"\n"
+    stream_number, xref_number = len(objects) + 1, len(objects) + 2
+    stream = zlib.compress(header + body)
+    out = b"%PDF-1.5\n"
+    stream_offset = len(out)
+    out += (b"%d 0 obj << /Type /ObjStm /N %d /First %d /Filter /FlateDecode /Length %d >>\nstream\n"
+            % (stream_number, len(objects), len(header), len(stream)) + stream + b"\nendstream\nendobj\n")
+    xref_offset = len(out)
+    rows = [struct.pack(">BIH", 0, 0, 65535)]
+    rows += [struct.pack(">BIH", 2, stream_number, index) for index in range(len(objects))]
+    rows += [struct.pack(">BIH", 1, stream_offset, 0), struct.pack(">BIH", 1, xref_offset, 0)]
+    xref = b"".join(rows)
+    out += (b"%d 0 obj << /Type /XRef /Size %d /W [1 4 2] /Root 1 0 R /Length %d >>\nstream\n"
+            % (xref_number, xref_number + 1, len(xref)) + xref + b"\nendstream\nendobj\n")
+    return out + b"startxref\n%d\n%%%%EOF\n" % xref_offset
+
+@pytest.fixture(autouse=True)
+def validation_pool():
+    yield
+    shutdown_validation_pool()
+
+@pytest.fixture
+def spot(db: Session):
+    db.add(OAuthUser(provider="google", provider_id="owner_id", email="owner@example.com",
+                     name="Test User", access_token="mock_token"))
+    spot = Spot(owner_id="owner_id", spot_title="Test Spot", address="123 Test St", latitude=0.0,
+                longitude=0.0, hourly_rate=10, no_of_slots=5, available_slots=5, open_time="08:00:00",
+                close_time="20:00:00", available_days=["Monday"], created_at=datetime.now(), verification_status=0)
+    db.add(spot)
+    db.commit()
+    return spot
+
+def test_validate_pdf():
+    result = validate_pdf(make_pdf(pages=3), max_bytes=10_000, max_pages=5)
+    assert result["status"] == "valid" and result["page_count"] == 3
+    assert result["content"].startswith(b"%PDF-")
+
+    assert validate_pdf(make_compressed_pdf(pages=4), max_bytes=10_000, max_pages=5)["page_count"] == 4
+
+    pdf = make_pdf()
+    encrypted = PdfWriter(clone_from=io.BytesIO(pdf))
+    encrypted.encrypt("secret")
+    output = io.BytesIO()
+    encrypted.write(output)
+    # Carries every token a PDF has, but its cross-reference table points nowhere
+    forged = (b"%PDF-1.7\n1 0 obj << /Type /Catalog /Pages 2 0 R >> endobj\n"
+              b"2 0 obj << /Type /Pages /Kids [3 0 R] /Count 1 >> endobj\n"
+              b"3 0 obj << /Type /Page /Parent 2 0 R >> endobj\n"
+              b"xref\n0 1\ntrailer << /Root 1 0 R >>\nstartxref\n9\n%%EOF\n")
+    refused = {
+        "Not a PDF file": b"MZ\x90\x00 definitely an executable",
+        "PDF could not be parsed: EOF marker not found": pdf[:-20],
+        "PDF could not be parsed: Broken xref table": pdf[:len(pdf) // 2] + pdf[-40:],
+        "Encrypted PDFs are not accepted": output.getvalue(),
+        "PDF has 6 pages, at most 5 are accepted": make_pdf(pages=6),
+        "File is larger than 100 bytes": pdf,
+    }
+    for error, content in refused.items():
+        max_bytes = 100 if "larger" in error else 10_000
+        result = validate_pdf(content, max_bytes=max_bytes, max_pages=5)
+        assert (result["status"], result["error"], result["content"]) == ("invalid", error, None)
+    assert validate_pdf(forged, max_bytes=10_000, max_pages=5)["status"] == "invalid"
+
+def test_uploads_are_validated_in_the_background(spot, db: Session):
+    files = {
+        "doc1": ("identity.pdf", make_pdf(pages=2), "application/pdf"),
+        # Claims to be a PDF, the worker finds out it is not
+        "doc2": ("ownership.pdf", b"<html>not a pdf</html>", "application/pdf"),
+    }
+    response = client.post("/spots/add-documents", data={"spot_id": spot.spot_id}, files=files)
+    assert response.status_code == 200
+    statuses = {doc.filename: doc.status for doc in db.query(Document).all()}
+    assert statuses == {"identity.pdf": "pending", "ownership.pdf": "pending"}
+
+    assert validate_documents(db) == 2
+    assert validate_documents(db) == 0
+
+    documents = client.get("/spots/documents").json()[0]["documents"]
+    assert documents["Identity Proof"]["status"] == "valid"
+    assert documents["Ownership Proof"] == {
+        "filename": "ownership.pdf", "url": documents["Ownership Proof"]["url"],
+        "status": "invalid", "validation_error": "Not a PDF file",
+    }
+    identity = db.query(Document).filter(Document.filename == "identity.pdf").one()
+    assert identity.page_count == 2 and identity.validated_at is not None
+
+def test_oversized_upload_is_refused(spot, monkeypatch):
+    monkeypatch.setattr(settings, "DOCUMENT_MAX_BYTES", 100)
+    files = {
+        "doc1": ("identity.pdf", make_pdf(pages=2), "application/pdf"),
+        "doc2": ("ownership.pdf", make_pdf(), "application/pdf"),
+    }
+    response = client.post("/spots/add-documents", data={"spot_id": spot.spot_id}, files=files)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "doc1 is larger than 100 bytes"
+
+def test_lapsed_claims_are_taken_again(spot, db: Session):
+    now = datetime.now(timezone.utc)
+    # Claimed by a worker that died, and by one still running
+    lapsed = Document(spot_id=spot.spot_id, document_type="Identity Proof", content=make_pdf(), filename="lapsed.pdf",
+                      status="validating", validation_lease_until=now - timedelta(seconds=1))
+    running = Document(spot_id=spot.spot_id, document_type="Ownership Proof", content=make_pdf(), filename="running.pdf",
+                       status="validating", validation_lease_until=now + timedelta(hours=1))
+    db.add_all([lapsed, running])
+    db.commit()
+
+    assert validate_documents(db) == 1
+
+    db.expire_all()
+    assert (lapsed.status, lapsed.page_count, lapsed.validation_lease_until) == ("valid", 1, None)
+    assert running.status == "validating"
@@ -0,0 +1,175 @@
+import asyncio
+import hashlib
+import hmac
+import json
+import httpx
+import pytest
+from fastapi import FastAPI, HTTPException
+from sqlalchemy.orm import Session
+from datetime import datetime, timedelta
+from tests.test_config import client, db, clean_test_db, checkout_signature
+from app.core.config import settings
+from app.db.oauth_model import OAuthUser
+from app.db.payment_model import Payment, PaymentWebhookEvent
+from app.db.booking_model import Booking
+from app.db.spot_model import Spot
+from app.services.payment_webhook_service import process_webhook_events
+from app.services.payment_reconcile_service import reconcile_payments
+from app.services.gateway_client import GatewayClient
+
+WEBHOOK_SECRET = "whsec_test"
+
+@pytest.fixture
+def pending_payment(db: Session, monkeypatch):
+    monkeypatch.setattr(settings, "RAZORPAY_WEBHOOK_SECRET", WEBHOOK_SECRET)
+    owner = OAuthUser(
+        provider="google",
+        provider_id="owner_test",
+        email="owner@example.com",
+        name="Test Owner",
+        access_token="mock_token"
+    )
+    spot = Spot(
+        owner_id="owner_test",
+        spot_title="Test Spot",
+        address="123 Test St",
+        latitude=0.0,
+        longitude=0.0,
+        hourly_rate=10,
+        no_of_slots=4,
+        available_slots=2,
+        open_time="08:00:00",
+        close_time="20:00:00",
+        available_days=["Monday", "Tuesday"],
+        created_at=datetime.now()
+    )
+    db.add_all([owner, spot])
+    db.commit()
+    payment = Payment(user_id="test_user", spot_id=spot.spot_id, amount=40, status="pending",
+                      razorpay_order_id="order_hook", total_slots=2,
+                      start_date_time="2999-10-01T10:00:00+05:30", end_date_time="2999-10-01T12:00:00+05:30")
+    db.add(payment)
+    db.commit()
+    return payment
+
+def send_webhook(event_id, event, order_id="order_hook", amount=4000, secret=WEBHOOK_SECRET):
+    body = json.dumps({
+        "entity": "event",
+        "event": event,
+        "payload": {"payment": {"entity": {
+            "id": "pay_hook", "order_id": order_id, "amount": amount, "status": "captured"}}}
+    }).encode()
+    signature = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+    return client.post("/webhooks/razorpay", content=body, headers={
+        "X-Razorpay-Signature": signature, "X-Razorpay-Event-Id": event_id})
+
+def test_webhook_rejects_bad_signature(pending_payment, db):
+    response = send_webhook("evt_1", "payment.captured", secret="wrong")
+    assert response.status_code == 400
+    assert db.query(PaymentWebhookEvent).count() == 0
+
+def test_captured_webhook_books_once(pending_payment, db):
+    assert send_webhook("evt_1", "payment.captured").status_code == 200
+    assert send_webhook("evt_1", "payment.captured").status_code == 200
+    assert send_webhook("evt_2", "order.paid").status_code == 200
+    assert db.query(PaymentWebhookEvent).count() == 2
+
+    assert process_webhook_events(db) == 2
+    db.expire_all()
+    payment = db.get(Payment, pending_payment.id)
+    assert payment.status == "success"
+    assert payment.razorpay_payment_id == "pay_hook"
+    bookings = db.query(Booking).filter(Booking.payment_id == payment.id).all()
+    assert len(bookings) == 1
+    assert bookings[0].total_slots == 2
+    assert db.get(Spot, payment.spot_id).total_earnings == 40
+
+    # The client confirmation arriving late does not book a second time
+    response = client.post("/bookings/update-payment-status", json={
+        "payment_id": payment.id,
+        "razorpay_payment_id": "pay_hook",
+        "razorpay_signature": checkout_signature("order_hook", "pay_hook"),
+        "start_time": "2999-10-01T10:00:00",
+        "end_time": "2999-10-01T12:00:00",
+        "total_slots": 2
+    })
+    assert response.status_code == 200
+    assert db.query(Booking).filter(Booking.payment_id == payment.id).count() == 1
+
+def test_webhook_for_unknown_order_is_ignored(pending_payment, db):
+    assert send_webhook("evt_1", "payment.captured", order_id="order_other").status_code == 200
+    assert send_webhook("evt_2", "payment.captured", amount=100).status_code == 200
+    assert process_webhook_events(db) == 2
+    db.expire_all()
+    statuses = {event.id: event.status for event in db.query(PaymentWebhookEvent)}
+    assert statuses == {"evt_1": "ignored", "evt_2": "ignored"}
+    assert db.get(Payment, pending_payment.id).status == "pending"
+
+def gateway_stub():
+    """Local stand-in for the Razorpay orders API."""
+    stub = FastAPI()
+    orders = {
+        "order_paid": [{"id": "pay_late", "amount": 4000, "status": "captured"}],
+        "order_gone": [{"id": "pay_declined", "amount": 2000, "status": "failed"}],
+        "order_retry": [{"id": "pay_pending", "amount": 1000, "status": "authorized"}],
+    }
+
+    @stub.get("/orders/{order_id}/payments")
+    def order_payments(order_id: str):
+        if order_id not in orders:
+            raise HTTPException(status_code=503)
+        return {"entity": "collection", "count": len(orders[order_id]), "items": orders[order_id]}
+
+    return stub
+
+def test_reconcile_payments_against_gateway(pending_payment, db):
+    spot = db.get(Spot, pending_payment.spot_id)
+    day_ago = datetime.now() - timedelta(days=1)
+    pending_payment.razorpay_order_id = "order_paid"
+    pending_payment.created_at = day_ago
+    window = {"start_date_time": "2999-10-02T10:00:00+05:30", "end_date_time": "2999-10-02T11:00:00+05:30"}
+    gone = Payment(user_id="u2", spot_id=spot.spot_id, amount=20, status="pending", razorpay_order_id="order_gone",
+                   total_slots=2, created_at=day_ago, **window)
+    down = Payment(user_id="u3", spot_id=spot.spot_id, amount=10, status="pending", razorpay_order_id="order_down",
+                   total_slots=1, created_at=day_ago, **window)
+    retry = Payment(user_id="u4", spot_id=spot.spot_id, amount=10, status="failed", razorpay_order_id="order_retry",
+                    total_slots=1, created_at=day_ago, **window)
+    fresh = Payment(user_id="u5", spot_id=spot.spot_id, amount=10, status="pending", razorpay_order_id="order_fresh",
+                    total_slots=1, **window)
+    db.add_all([gone, down, retry, fresh])
+    db.commit()
+
+    async def run():
+        async with GatewayClient(base_url="http://gateway", transport=httpx.ASGITransport(app=gateway_stub())) as gateway:
+            return await reconcile_payments(db, gateway, page_size=2)
+
+    assert asyncio.run(run()) == (1, 1)
+
+    db.expire_all()
+    statuses = {payment.razorpay_order_id: payment.status for payment in db.query(Payment)}
+    assert statuses == {"order_paid": "success", "order_gone": "abandoned", "order_down": "pending",
+                        "order_retry": "failed", "order_fresh": "pending"}
+    booking = db.query(Booking).filter(Booking.payment_id == pending_payment.id).one()
+    assert booking.total_slots == 2
+    assert db.get(Spot, spot.spot_id).available_slots == 4
+    assert db.get(Spot, spot.spot_id).total_earnings == 40
+
+def test_reconcile_counts_only_payments_it_settles(pending_payment, db):
+    pending_payment.razorpay_order_id = "order_paid"
+    pending_payment.created_at = datetime.now() - timedelta(days=1)
+    db.commit()
+    stub = FastAPI()
+
+    @stub.get("/orders/{order_id}/payments")
+    def order_payments(order_id: str):
+        # The checkout confirms the payment while the gateway is being asked about it
+        db.get(Payment, pending_payment.id).status = "success"
+        db.commit()
+        return {"entity": "collection", "count": 1, "items": [{"id": "pay_late", "amount": 4000, "status": "captured"}]}
+
+    async def run():
+        async with GatewayClient(base_url="http://gateway", transport=httpx.ASGITransport(app=stub)) as gateway:
+            return await reconcile_payments(db, gateway, page_size=2)
+
+    assert asyncio.run(run()) == (0, 0)
+    assert db.query(Booking).filter(Booking.payment_id == pending_payment.id).count() == 0
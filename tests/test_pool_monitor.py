@@ -0,0 +1,76 @@
+import asyncio
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.orm import sessionmaker
+from tests.test_config import client, TEST_DATABASE_URL
+from app.core.config import settings
+from app.db import session
+from app.db.pool_monitor import SessionLeakMiddleware, TimedQueuePool, instrument_engine, pool_stats
+
+@pytest.fixture
+def small_pool():
+    engine = create_engine(TEST_DATABASE_URL, poolclass=TimedQueuePool, pool_size=1, max_overflow=0,
+                           pool_timeout=0.1)
+    stats = instrument_engine(engine, "test")
+    yield engine, stats
+    engine.dispose()
+    for key in [key for key, value in pool_stats.items() if value is stats]:
+        del pool_stats[key]
+
+def test_unclosed_session_is_reported(small_pool):
+    engine, stats = small_pool
+    Session = sessionmaker(bind=engine)
+    open_sessions = []
+
+    leaky_app = FastAPI()
+    leaky_app.add_middleware(SessionLeakMiddleware)
+
+    @leaky_app.get("/leak")
+    def leak():
+        db = Session()
+        db.execute(text("SELECT 1"))
+        open_sessions.append(db)
+        return {}
+
+    @leaky_app.get("/closed")
+    def closed():
+        with Session() as db:
+            db.execute(text("SELECT 1"))
+        return {}
+
+    with TestClient(leaky_app) as leaky_client:
+        leaky_client.get("/closed")
+        assert stats.leaks == 0
+        leaky_client.get("/leak")
+        assert stats.leaks == 1
+
+    # The leaked connection holds the only slot, so the next checkout times out
+    with pytest.raises(PoolTimeoutError):
+        engine.connect()
+    snapshot = stats.snapshot()
+    assert snapshot["checked_out"] == 1
+    assert snapshot["timeouts"] == 1
+    assert snapshot["leaked_sessions"] == 1
+    assert snapshot["checkouts"] == 2
+
+    open_sessions[0].close()
+    assert stats.snapshot()["checked_out"] == 0
+
+def test_startup_opens_and_warms_pools(monkeypatch):
+    monkeypatch.setattr(settings, "DATABASE_URL", TEST_DATABASE_URL)
+    monkeypatch.setattr(settings, "ASYNC_DATABASE_URL", TEST_DATABASE_URL.replace("postgresql://", "postgresql+psycopg://"))
+    assert session.engine is None
+    session.init_engines()
+    try:
+        asyncio.run(session.warm_pools(2))
+        pools = {pool["name"]: pool for pool in client.get("/metrics/db-pool").json()}
+        assert pools["sync"]["checked_in"] == 2 and pools["sync"]["checked_out"] == 0
+        assert pools["async"]["checkouts"] == 2
+    finally:
+        asyncio.run(session.dispose_engines())
+        for key in [key for key, value in pool_stats.items() if value.name in ("sync", "async")]:
+            del pool_stats[key]
+    assert session.engine is None
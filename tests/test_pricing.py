@@ -0,0 +1,83 @@
+import pytest
+import numpy as np
+from sqlalchemy.orm import Session
+from datetime import datetime
+from tests.test_config import client, db, clean_test_db
+from app.db.oauth_model import OAuthUser
+from app.db.spot_model import Spot
+from app.services.pricing_service import weekly_multipliers
+
+@pytest.fixture
+def priced_spot(db: Session):
+    owner = OAuthUser(
+        provider="google",
+        provider_id="owner_test",
+        email="owner@example.com",
+        name="Test Owner",
+        profile_picture="http://example.com/avatar.png",
+        access_token="mock_token"
+    )
+    spot = Spot(
+        owner_id="owner_test",
+        spot_title="Priced Spot",
+        address="123 Test St",
+        latitude=0.0,
+        longitude=0.0,
+        hourly_rate=10,
+        no_of_slots=3,
+        available_slots=3,
+        open_time="08:00:00",
+        close_time="20:00:00",
+        description="Test spot description",
+        available_days=["Monday", "Tuesday"],
+        image=[b"mock_image_data"],
+        created_at=datetime.now()
+    )
+    db.add_all([owner, spot])
+    db.commit()
+    return spot
+
+def quote_payload(spot_id, total_slots=1, start="2999-10-01T10:30:00", end="2999-10-01T12:15:00"):
+    return {
+        "spot_id": spot_id,
+        "total_slots": total_slots,
+        "start_date_time": start,
+        "end_date_time": end
+    }
+
+def test_weekly_multipliers():
+    week = weekly_multipliers("8-10,17", 1.5, 2.0)
+    assert week.shape == (168,)
+    assert week[7] == 1.0
+    assert week[8] == week[9] == week[17] == 1.5
+    assert week[10] == 1.0
+    # Saturday peak hours get both multipliers
+    assert week[5 * 24 + 8] == 3.0
+    assert week[6 * 24 + 12] == 2.0
+
+def test_quote_started_hours(priced_spot):
+    response = client.post("/pricing/quote", json=quote_payload(priced_spot.spot_id, total_slots=2))
+    assert response.status_code == 200
+    assert response.json()["billed_hours"] == 2
+    assert response.json()["amount"] == 40
+
+def test_batch_quotes(priced_spot):
+    items = [
+        quote_payload(priced_spot.spot_id),
+        quote_payload(999),
+        quote_payload(priced_spot.spot_id, total_slots=4),
+        quote_payload(priced_spot.spot_id, start="2999-10-01T10:00:00", end="2999-10-01T10:10:00"),
+    ]
+    response = client.post("/pricing/quotes", json={"items": items})
+    assert response.status_code == 200
+    quotes = response.json()
+    assert [quote["amount"] for quote in quotes] == [20, None, None, 10]
+    assert quotes[1]["error"] == "Spot not found"
+    assert quotes[2]["error"] == "Requested slots exceed the capacity of the spot"
+
+def test_booking_amount_must_match_quote(priced_spot):
+    payload = quote_payload(priced_spot.spot_id)
+    payload.update({"user_id": "test_user", "total_amount": 5, "receipt": "receipt_cheap"})
+    response = client.post("/bookings/book-spot", json=payload)
+    assert response.status_code == 422
+    assert "20" in response.json()["detail"]
@@ -0,0 +1,57 @@
+import pytest
+from datetime import datetime
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from tests.test_config import client, db, clean_test_db, assert_max_queries, TestingSessionLocal
+from app.core.config import settings
+from app.db.oauth_model import OAuthUser
+from app.db.spot_model import Spot
+from app.db.query_monitor import QueryCounterMiddleware, capture_queries
+
+@pytest.fixture
+def spots(db: Session):
+    db.add(OAuthUser(provider="google", provider_id="owner_test", email="owner@example.com",
+                     name="Test Owner", access_token="mock_token"))
+    for i in range(3):
+        db.add(Spot(owner_id="owner_test", spot_title=f"Spot {i}", address="123 Test St", latitude=0.0,
+                    longitude=0.0, hourly_rate=10, no_of_slots=5, available_slots=5, open_time="08:00:00",
+                    close_time="20:00:00", available_days=["Monday"], created_at=datetime.now()))
+    db.commit()
+
+def test_query_headers_in_debug_mode(spots, monkeypatch):
+    monkeypatch.setattr(settings, "DEBUG", True)
+    with assert_max_queries(1):
+        response = client.get("/spotdetails/getparkingspot")
+    assert response.status_code == 200
+    assert response.headers["X-DB-Query-Count"] == "1"
+    assert response.headers["X-DB-Query-Max-Repeats"] == "1"
+    assert float(response.headers["X-DB-Query-Time-Ms"]) > 0
+
+    monkeypatch.setattr(settings, "DEBUG", False)
+    assert "X-DB-Query-Count" not in client.get("/spotdetails/getparkingspot").headers
+
+def test_repeated_statements_are_reported(capsys, monkeypatch):
+    monkeypatch.setattr(settings, "QUERY_REPEAT_WARN_THRESHOLD", 5)
+    loop_app = FastAPI()
+    loop_app.add_middleware(QueryCounterMiddleware)
+
+    @loop_app.get("/loop")
+    def loop():
+        with TestingSessionLocal() as session:
+            for spot_id in range(6):
+                session.execute(text("SELECT * FROM spots WHERE spot_id = :spot_id"), {"spot_id": spot_id})
+        return {}
+
+    with capture_queries() as queries:
+        TestClient(loop_app).get("/loop")
+    statement, times = queries.most_repeated()
+    assert times == 6 and "FROM spots" in statement
+    assert "the same statement 6 times, likely an N+1" in capsys.readouterr().out
+
+def test_assert_max_queries_fails_past_the_limit(db: Session):
+    with pytest.raises(AssertionError, match="2 statements ran, at most 1 expected"):
+        with assert_max_queries(1):
+            db.execute(text("SELECT 1"))
+            db.execute(text("SELECT 2"))
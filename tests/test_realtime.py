@@ -0,0 +1,119 @@
+import asyncio
+import threading
+import pytest
+from sqlalchemy.orm import Session
+from datetime import datetime
+from tests.test_config import client, db, clean_test_db, TestingAsyncSessionLocal
+from app.core.realtime import AvailabilityHub, OwnerHub, availability_hub
+from app.db.oauth_model import OAuthUser
+from app.db.payment_model import Payment
+from app.db.booking_model import Booking
+from app.db.spot_model import Spot
+from app.services.booking_service import cancel_booking
+
+def availability(spot_id, available_slots, latitude=0.0, longitude=0.0):
+    return {"spot_id": spot_id, "available_slots": available_slots, "no_of_slots": 5,
+            "latitude": latitude, "longitude": longitude}
+
+def test_hub_coalesces_updates_per_spot():
+    async def scenario():
+        hub = AvailabilityHub()
+        watcher = hub.subscribe(spot_ids=[1, 2])
+        area = hub.subscribe(bbox=(10.0, 10.0, 20.0, 20.0))
+
+        # Publishers run on other threads
+        def publish():
+            hub.publish([availability(1, 4)])
+            hub.publish([availability(1, 3), availability(3, 1, latitude=15.0, longitude=15.0)])
+            hub.publish([availability(9, 1, latitude=50.0, longitude=50.0)])
+        thread = threading.Thread(target=publish)
+        thread.start()
+        thread.join()
+        await asyncio.wait_for(watcher.wakeup.wait(), timeout=1)
+        await asyncio.sleep(0)
+
+        assert watcher.drain() == [availability(1, 3)]
+        assert [update["spot_id"] for update in area.drain()] == [3]
+        assert not watcher.wakeup.is_set()
+
+        hub.unsubscribe(watcher)
+        hub.unsubscribe(area)
+        assert not hub.has_subscribers()
+
+    asyncio.run(scenario())
+
+def test_cancellation_is_pushed(db: Session):
+    owner = OAuthUser(provider="google", provider_id="owner_test", email="owner@example.com",
+                      name="Test Owner", access_token="mock_token")
+    spot = Spot(owner_id="owner_test", spot_title="Test Spot", address="123 Test St", latitude=0.0,
+                longitude=0.0, hourly_rate=10, no_of_slots=5, available_slots=3, open_time="08:00:00",
+                close_time="20:00:00", available_days=["Monday"], created_at=datetime.now())
+    db.add_all([owner, spot])
+    db.commit()
+    payment = Payment(user_id="test_user", spot_id=spot.spot_id, amount=20, status="success",
+                      razorpay_order_id="order_live")
+    db.add(payment)
+    db.commit()
+    booking = Booking(user_id="test_user", spot_id=spot.spot_id, total_slots=2,
+                      start_date_time="2999-10-01T10:00:00", end_date_time="2999-10-01T12:00:00",
+                      payment_id=payment.id, status="Booked")
+    db.add(booking)
+    db.commit()
+
+    async def scenario():
+        subscription = availability_hub.subscribe(spot_ids=[spot.spot_id])
+        try:
+            async with TestingAsyncSessionLocal() as async_db:
+                await cancel_booking(async_db, booking.id)
+            await asyncio.wait_for(subscription.wakeup.wait(), timeout=1)
+            [update] = subscription.drain()
+            assert update["available_slots"] == 5
+        finally:
+            availability_hub.unsubscribe(subscription)
+
+    asyncio.run(scenario())
+
+def test_stream_requires_spots_or_bbox():
+    assert client.get("/spotdetails/availability/stream").status_code == 400
+    assert client.get("/spotdetails/availability/stream", params={"bbox": "1,2,3"}).status_code == 400
+
+def test_owner_receives_booking_events(db: Session):
+    owner = OAuthUser(provider="google", provider_id="owner_test", email="owner@example.com",
+                      name="Test Owner", access_token="mock_token")
+    spot = Spot(owner_id="owner_test", spot_title="Test Spot", address="123 Test St", latitude=0.0,
+                longitude=0.0, hourly_rate=10, no_of_slots=5, available_slots=3, open_time="08:00:00",
+                close_time="20:00:00", available_days=["Monday"], created_at=datetime.now())
+    db.add_all([owner, spot])
+    db.commit()
+    payment = Payment(user_id="test_user", spot_id=spot.spot_id, amount=20, status="success",
+                      razorpay_order_id="order_ws")
+    db.add(payment)
+    db.commit()
+    booking = Booking(user_id="test_user", spot_id=spot.spot_id, total_slots=2,
+                      start_date_time="2999-10-01T10:00:00", end_date_time="2999-10-01T12:00:00",
+                      payment_id=payment.id, status="Booked")
+    db.add(booking)
+    db.commit()
+
+    with client.websocket_connect("/notifications/owner/owner_test") as websocket:
+        websocket.send_text("ping")
+        assert websocket.receive_json() == {"type": "pong"}
+
+        assert client.put(f"/bookings/checkin/{booking.id}").status_code == 200
+        event = websocket.receive_json()
+        assert event["type"] == "booking.checked_in"
+        assert event["booking"]["id"] == booking.id
+        assert event["booking"]["status"] == "Checked In"
+
+def test_slow_owner_connection_overflows():
+    async def scenario():
+        hub = OwnerHub()
+        connection = hub.connect("owner_test", buffer_size=2)
+        for i in range(3):
+            hub._deliver("owner_test", {"type": "booking.created", "n": i})
+        assert connection.queue.qsize() == 2
+        assert connection.overflowed.is_set()
+        hub.disconnect(connection)
+        assert not hub.has_subscribers()
+
+    asyncio.run(scenario())
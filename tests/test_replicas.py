@@ -0,0 +1,47 @@
+import asyncio
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+from tests.test_config import client, async_engine, DB_USER, DB_PASSWORD, DB_HOST
+from app.db.replicas import Replica, ReplicaRouter
+
+def unreachable_replica(name):
+    engine = create_async_engine(f"postgresql+psycopg://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:1/test",
+                                 poolclass=NullPool, connect_args={"connect_timeout": 1})
+    return Replica(name, engine)
+
+def test_reads_rotate_over_current_replicas():
+    async def scenario():
+        # The test database is not in recovery, so it reads as a replica with no lag
+        first, second = Replica("replica-1", async_engine), Replica("replica-2", async_engine)
+        router = ReplicaRouter([first, second], max_lag_seconds=5, check_interval_seconds=60)
+        assert await router.pick() is async_engine
+        assert first.lag == 0 and second.lag is None
+        assert await router.pick() is async_engine
+        assert second.lag == 0
+        assert [replica["in_rotation"] for replica in router.status()] == [True, True]
+
+    asyncio.run(scenario())
+
+def test_lagging_or_unreachable_replicas_fall_back_to_primary():
+    async def scenario():
+        down = unreachable_replica("replica-1")
+        behind = Replica("replica-2", async_engine)
+        router = ReplicaRouter([down, behind], max_lag_seconds=-1, check_interval_seconds=60)
+        assert await router.pick() is None
+        assert down.lag is None and down.error
+        assert behind.lag == 0
+        [down_status, behind_status] = router.status()
+        assert not down_status["in_rotation"] and not behind_status["in_rotation"]
+
+        # Readings are reused until the next check is due
+        checked_at = down.checked_at
+        assert await router.pick() is None
+        assert down.checked_at == checked_at
+
+    asyncio.run(scenario())
+
+def test_no_replicas_reads_from_primary():
+    assert asyncio.run(ReplicaRouter([], max_lag_seconds=5, check_interval_seconds=5).pick()) is None
+    response = client.get("/metrics/db-replicas")
+    assert response.status_code == 200
+    assert response.json() == []
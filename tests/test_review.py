@@ -2,7 +2,8 @@ import pytest
 from sqlalchemy.orm import Session
 from app.db.review_model import Review
 from app.schemas.review import ReviewCreate, ReviewUpdate
-from tests.test_config import client, db, clean_test_db
+from app.services.review_service import reconcile_rating_summaries
+from tests.test_config import client, db, clean_test_db, assert_max_queries
 from app.db.oauth_model import OAuthUser
 from app.db.spot_model import Spot
 from datetime import datetime
@@ -188,3 +189,102 @@ def test_delete_nonexistent_review():
         "/reviews/9999")  # Assuming 9999 is a non-existent ID
     assert response.status_code == 404
     assert response.json()["detail"] == "Review not found"
+
+
+@pytest.fixture
+def rated_spot(create_test_review):
+    """Spot 1 with seven more reviews posted through the API, rated 1, 2, 3, 4, 5, 5 and 4."""
+    for score in [1, 2, 3, 4, 5, 5, 4]:
+        response = client.post("/reviews/", json={
+            "user_id": "test_user", "spot_id": 1, "rating_score": score,
+            "review_description": f"{score} stars", "images": [], "owner_reply": None,
+        })
+        assert response.status_code == 200
+    return 1
+
+
+def test_reviews_by_spot_pages_and_summary(rated_spot):
+    """
+    Test keyset pages of a spot's reviews and the rating summary headers.
+    """
+    pages = []
+    cursor = None
+    while True:
+        params = {"limit": 3, "sort": "highest", "include_images": False}
+        if cursor:
+            params["cursor"] = cursor
+        with assert_max_queries(2):
+            response = client.get(f"/reviews/spot/{rated_spot}", params=params)
+        assert response.status_code == 200
+        pages.append(response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+
+    # The review of the fixture was inserted directly, so it is not in the summary
+    assert response.headers["X-Review-Count"] == "7"
+    assert response.headers["X-Rating-Average"] == "3.43"
+    assert response.headers["X-Rating-Histogram"] == "1,1,1,2,2"
+
+    reviews = [review for page in pages for review in page]
+    assert [len(page) for page in pages] == [3, 3, 2]
+    assert [review["rating_score"] for review in reviews] == [5, 5, 5, 4, 4, 3, 2, 1]
+    assert all(review["images"] is None and review["reviewer_name"] == "Test User" for review in reviews)
+
+    newest = client.get(f"/reviews/spot/{rated_spot}", params={"limit": 2}).json()
+    assert [review["review_description"] for review in newest] == ["4 stars", "5 stars"]
+    assert newest[0]["images"] == []
+
+    lowest = client.get(f"/reviews/spot/{rated_spot}", params={"sort": "lowest", "limit": 2})
+    assert [review["rating_score"] for review in lowest.json()] == [1, 2]
+    # A cursor only continues the order it was issued for
+    response = client.get(f"/reviews/spot/{rated_spot}", params={"cursor": lowest.headers["X-Next-Cursor"]})
+    assert response.status_code == 400
+
+
+def test_review_writes_keep_the_summary(rated_spot):
+    """
+    Test that updating and deleting reviews adjusts the spot's rating summary.
+    """
+    lowest = client.get(f"/reviews/spot/{rated_spot}", params={"sort": "lowest", "limit": 1}).json()[0]
+    response = client.put(f"/reviews/{lowest['id']}", json={
+        "user_id": "test_user", "spot_id": rated_spot, "rating_score": 5,
+        "review_description": "Changed my mind", "images": [], "owner_reply": None,
+    })
+    assert response.status_code == 200
+    headers = client.get(f"/reviews/spot/{rated_spot}").headers
+    assert headers["X-Review-Count"] == "7"
+    assert headers["X-Rating-Histogram"] == "0,1,1,2,3"
+
+    client.delete(f"/reviews/{lowest['id']}")
+    headers = client.get(f"/reviews/spot/{rated_spot}").headers
+    assert headers["X-Review-Count"] == "6"
+    assert headers["X-Rating-Average"] == "3.83"
+    assert headers["X-Rating-Histogram"] == "0,1,1,2,2"
+
+
+def test_rating_summaries_in_one_query(rated_spot, db: Session):
+    """
+    Test the batch rating summaries of map and search lists.
+    """
+    with assert_max_queries(1):
+        response = client.get("/reviews/summaries", params={"spot_ids": [rated_spot, 404, rated_spot]})
+    assert response.status_code == 200
+    assert response.json() == [
+        {"spot_id": rated_spot, "review_count": 7, "average_rating": 3.43,
+         "histogram": {"1": 1, "2": 1, "3": 1, "4": 2, "5": 2}},
+        {"spot_id": 404, "review_count": 0, "average_rating": None,
+         "histogram": {"1": 0, "2": 0, "3": 0, "4": 0, "5": 0}},
+    ]
+    assert client.get("/reviews/summaries").status_code == 422
+
+
+def test_reconcile_rating_summaries(rated_spot, db: Session):
+    """
+    Test that reconciliation counts the review the fixture inserted behind the service's back.
+    """
+    assert reconcile_rating_summaries(db) == 1
+    assert reconcile_rating_summaries(db) == 0
+    summary = client.get("/reviews/summaries", params={"spot_ids": [rated_spot]}).json()[0]
+    assert summary["review_count"] == 8
+    assert summary["histogram"]["5"] == 3
@@ -5,6 +5,9 @@ from tests.test_config import client, db, clean_test_db
 from app.db.oauth_model import OAuthUser
 from app.db.payment_model import Payment
 from app.db.spot_model import Spot
+from app.db.review_model import Review, SpotRatingSummary
+from app.db.analytics_model import SpotHourlyRollup
+from app.db.waitlist_model import WaitlistEntry
 import base64
 
 @pytest.fixture
@@ -124,7 +127,29 @@ def test_invalid_user_add_spot(create_test_data):
 
     response = client.post("/spots/add-spot", data=data)
 
-    assert response.status_code == 400 
-  
-
-
+    assert response.status_code == 400
+
+def test_delete_spot(create_test_data, db: Session):
+    user, owner = create_test_data
+    spot = Spot(owner_id=owner.provider_id, spot_title="Test Spot", address="123 Test St", latitude=0.0,
+                longitude=0.0, hourly_rate=10, no_of_slots=5, available_slots=5, open_time="08:00:00",
+                close_time="20:00:00", available_days=["Monday"], created_at=datetime.now(), verification_status=1)
+    db.add(spot)
+    db.commit()
+    spot_id = spot.spot_id
+    db.add_all([
+        Review(user_id=user.provider_id, spot_id=spot_id, rating_score=5, review_description="Great spot!", images=[]),
+        SpotRatingSummary(spot_id=spot_id, review_count=1, rating_sum=5, rating_5=1),
+        SpotHourlyRollup(spot_id=spot_id, bucket_start=datetime(2025, 1, 1, 10), bookings=1, occupied_slot_hours=1, revenue=10),
+        WaitlistEntry(spot_id=spot_id, user_id=user.provider_id, total_slots=1,
+                      start_date_time=datetime(2999, 1, 1, 10), end_date_time=datetime(2999, 1, 1, 12)),
+    ])
+    db.commit()
+
+    response = client.delete(f"/spots/{spot_id}")
+    assert response.status_code == 200
+    db.expire_all()
+    assert db.query(Spot).filter(Spot.spot_id == spot_id).count() == 0
+    assert db.query(SpotRatingSummary).count() == 0
+    assert db.query(SpotHourlyRollup).count() == 0
+    assert db.query(WaitlistEntry).count() == 0
@@ -5,6 +5,7 @@ from app.db.oauth_model import OAuthUser
 from app.db.payment_model import Payment
 from app.db.booking_model import Booking
 from app.db.spot_model import Spot
+from app.services.earnings_service import reconcile_earnings
 from tests.test_config import client, db, clean_test_db
 
 
@@ -187,3 +188,21 @@ def test_update_user_profile(db: Session, create_mock_oauth_user, monkeypatch):
     assert data["email"] == update_data["email"]
     assert data["phone"] == update_data["phone"]
     assert data["profile_picture"] == update_data["profile_picture"]
+
+
+def test_earnings_reconciliation(db: Session, create_mock_oauth_user, create_mock_spot, create_mock_booking_and_payment, monkeypatch):
+    monkeypatch.setattr("app.services.auth_service.verify_oauth_token", always_valid_token)
+    monkeypatch.setattr("app.services.auth_service.verify_google_token", always_valid_token)
+    monkeypatch.setattr("app.services.auth_service.verify_github_token", always_valid_token)
+    user = create_mock_oauth_user
+
+    # The booking was inserted directly, so only reconciliation counts it
+    assert reconcile_earnings(db) == (1, 1)
+    assert reconcile_earnings(db) == (0, 0)
+
+    response = client.get(
+        f"/users/profile/{user.provider_id}", headers={"Authorization": "Bearer mock_token"})
+    assert response.json()["total_earnings"] == 100
+
+    spots = client.get(f"/spots/owner/{user.provider_id}").json()
+    assert spots[0]["totalEarning"] == 100
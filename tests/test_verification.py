@@ -1,9 +1,12 @@
+import asyncio
 import pytest
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from datetime import datetime
 from app.db.spot_model import Spot, Document
 from app.db.oauth_model import OAuthUser
-from tests.test_config import client, db, clean_test_db
+from app.services.verification_service import claim_verifications
+from tests.test_config import client, db, clean_test_db, assert_max_queries, TestingAsyncSessionLocal
 
 # Helper to create a user, spot, and documents for verification
 @pytest.fixture
@@ -111,4 +114,89 @@ def test_documents_sorted_into_fields(db, create_spot_with_documents):
             assert spot["identity_proof_document"]["file_type"] == "identity_proof"
             assert spot["ownership_proof_document"]["file_type"] == "ownership_proof"
             assert spot["supporting_document"]["file_type"] == "supporting_document"
-    assert found
\ No newline at end of file
+    assert found
+
+# Four more pending spots with large documents, after the one of create_spot_with_documents
+@pytest.fixture
+def pending_spots(db: Session, create_spot_with_documents):
+    spot_ids = [create_spot_with_documents.spot_id]
+    for i in range(4):
+        spot = Spot(owner_id="owner_id", spot_title=f"Extra Spot {i}", address="123 Test St", latitude=0.0,
+                    longitude=0.0, hourly_rate=10, no_of_slots=5, available_slots=5, open_time="08:00:00",
+                    close_time="20:00:00", available_days=["Monday"], verification_status=0)
+        db.add(spot)
+        db.flush()
+        for doc_type in ["identity_proof", "ownership_proof"]:
+            db.add(Document(spot_id=spot.spot_id, filename=f"{doc_type}.pdf", document_type=doc_type,
+                            content=b"%PDF" + b"0" * 100_000))
+        spot_ids.append(spot.spot_id)
+    db.commit()
+    return spot_ids
+
+# 8. Test: Pending spots and their documents load in one query without the PDF contents
+def test_pending_list_runs_one_query_for_many_spots(pending_spots):
+    with assert_max_queries(1):
+        response = client.get("/verify-list/")
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data) == 5
+    assert len(response.content) < 10_000
+    assert data[-1]["supporting_document"] is None
+    identity = data[0]["identity_proof_document"]
+    assert "file_data" not in identity
+    assert identity["url"] == f"spots/documents/view/{identity['document_id']}"
+
+    with assert_max_queries(1):
+        response = client.get("/spots/documents")
+    assert response.status_code == 200
+    assert len(response.json()) == 5
+    assert len(response.content) < 10_000
+
+    # The contents are served on demand by id
+    response = client.get("/" + identity["url"])
+    assert response.status_code == 200
+    assert response.content == b"fakepdfdata"
+
+# 9. Test: Admins claiming one after the other get disjoint batches
+def test_claims_hand_out_disjoint_leases(pending_spots):
+    response = client.post("/verify-list/queue/claim", json={"admin_id": "admin-1", "limit": 2})
+    assert response.status_code == 200
+    assert [spot["spot_id"] for spot in response.json()] == pending_spots[:2]
+
+    response = client.post("/verify-list/queue/claim", json={"admin_id": "admin-2", "limit": 2})
+    assert [spot["spot_id"] for spot in response.json()] == pending_spots[2:4]
+
+    # Claiming again renews the admin's own leases and tops the batch up
+    response = client.post("/verify-list/queue/claim", json={"admin_id": "admin-1", "limit": 3})
+    assert [spot["spot_id"] for spot in response.json()] == pending_spots[:2] + pending_spots[4:]
+
+    response = client.post("/verify-list/queue/claim", json={"admin_id": "admin-3"})
+    assert response.status_code == 404
+
+# 10. Test: A claim skips rows locked by a concurrent claim instead of waiting
+def test_claim_skips_locked_spots(pending_spots):
+    async def scenario():
+        async with TestingAsyncSessionLocal() as holder, TestingAsyncSessionLocal() as db:
+            await holder.execute(select(Spot.spot_id).where(Spot.spot_id.in_(pending_spots[:3]))
+                                 .with_for_update())
+            claimed = await asyncio.wait_for(claim_verifications(db, "admin-2", 5), timeout=5)
+            await holder.rollback()
+        return [spot.spot_id for spot in claimed]
+
+    assert asyncio.run(scenario()) == pending_spots[3:]
+
+# 11. Test: Bulk decisions apply in one statement and skip other admins' leases
+def test_bulk_decisions(pending_spots):
+    client.post("/verify-list/queue/claim", json={"admin_id": "admin-1", "limit": 2})
+
+    with assert_max_queries(1):
+        response = client.post("/verify-list/queue/accept",
+                               json={"admin_id": "admin-2", "spot_ids": pending_spots[:4]})
+    assert response.status_code == 200
+    assert response.json() == {"decided": pending_spots[2:4], "skipped": pending_spots[:2]}
+
+    response = client.post("/verify-list/queue/reject",
+                           json={"admin_id": "admin-1", "spot_ids": pending_spots[:3] + [9999]})
+    assert response.json() == {"decided": pending_spots[:2], "skipped": [pending_spots[2], 9999]}
+
+    assert [spot["spot_id"] for spot in client.get("/verify-list/").json()] == pending_spots[4:]
@@ -0,0 +1,138 @@
+import pytest
+from sqlalchemy.orm import Session
+from datetime import datetime, timedelta, timezone
+from tests.test_config import client, db, clean_test_db
+from app.db.oauth_model import OAuthUser
+from app.db.spot_model import Spot
+from app.db.payment_model import Payment
+from app.db.booking_model import Booking
+from app.db.waitlist_model import WaitlistEntry
+from app.services.waitlist_service import hold_released_slots, expire_waitlist_offers
+
+@pytest.fixture
+def sold_out_spot(db: Session):
+    owner = OAuthUser(
+        provider="google",
+        provider_id="owner_test",
+        email="owner@example.com",
+        name="Test Owner",
+        profile_picture="http://example.com/avatar.png",
+        access_token="mock_token"
+    )
+    spot = Spot(
+        owner_id="owner_test",
+        spot_title="Busy Spot",
+        address="123 Test St",
+        latitude=0.0,
+        longitude=0.0,
+        hourly_rate=10.0,
+        no_of_slots=2,
+        available_slots=0,
+        open_time="08:00:00",
+        close_time="20:00:00",
+        description="Always full",
+        available_days=["Monday", "Tuesday"],
+        image=[b"mock_image_data"],
+        created_at=datetime.now()
+    )
+    db.add_all([owner, spot])
+    db.commit()
+    return spot
+
+def waitlist_payload(spot, user_id, total_slots=1):
+    return {
+        "user_id": user_id,
+        "spot_id": spot.spot_id,
+        "total_slots": total_slots,
+        "start_date_time": "2999-10-01T10:00:00",
+        "end_date_time": "2999-10-01T12:00:00"
+    }
+
+def test_book_sold_out_spot(sold_out_spot):
+    payload = waitlist_payload(sold_out_spot, "test_user")
+    payload["total_amount"] = 20
+    payload["receipt"] = "receipt_sold_out"
+    response = client.post("/bookings/book-spot", json=payload)
+    assert response.status_code == 409
+
+def test_join_waitlist(sold_out_spot):
+    first = client.post("/waitlist/", json=waitlist_payload(sold_out_spot, "user_a"))
+    second = client.post("/waitlist/", json=waitlist_payload(sold_out_spot, "user_b"))
+    again = client.post("/waitlist/", json=waitlist_payload(sold_out_spot, "user_a"))
+
+    assert first.status_code == 200
+    assert first.json()["status"] == "waiting"
+    assert first.json()["position"] == 1
+    assert second.json()["position"] == 2
+    # Joining twice keeps the original place in the queue
+    assert again.json()["id"] == first.json()["id"]
+
+    too_many = client.post("/waitlist/", json=waitlist_payload(sold_out_spot, "user_c", total_slots=3))
+    assert too_many.status_code == 400
+
+def test_released_slots_go_to_head_of_queue(sold_out_spot, db):
+    first = client.post("/waitlist/", json=waitlist_payload(sold_out_spot, "user_a", total_slots=2)).json()
+    second = client.post("/waitlist/", json=waitlist_payload(sold_out_spot, "user_b")).json()
+
+    # One free slot is not enough for the head, and the queue is not jumped
+    sold_out_spot.available_slots = 1
+    db.flush()
+    assert hold_released_slots(db, sold_out_spot.spot_id) == 0
+
+    sold_out_spot.available_slots = 2
+    db.flush()
+    assert hold_released_slots(db, sold_out_spot.spot_id) == 1
+    db.commit()
+
+    db.expire_all()
+    assert sold_out_spot.available_slots == 0
+    assert db.get(WaitlistEntry, first["id"]).status == "offered"
+    assert db.get(WaitlistEntry, second["id"]).status == "waiting"
+    assert client.get(f"/waitlist/{second['id']}").json()["position"] == 1
+
+def test_lapsed_offer_passes_to_next(sold_out_spot, db):
+    first = client.post("/waitlist/", json=waitlist_payload(sold_out_spot, "user_a")).json()
+    second = client.post("/waitlist/", json=waitlist_payload(sold_out_spot, "user_b")).json()
+
+    sold_out_spot.available_slots = 1
+    db.flush()
+    hold_released_slots(db, sold_out_spot.spot_id)
+    db.commit()
+
+    # The head never claims its offer
+    entry = db.get(WaitlistEntry, first["id"])
+    entry.offered_until = datetime.now(timezone.utc) - timedelta(seconds=1)
+    db.commit()
+
+    assert expire_waitlist_offers(db) == 1
+
+    db.expire_all()
+    assert db.get(WaitlistEntry, first["id"]).status == "expired"
+    assert db.get(WaitlistEntry, second["id"]).status == "offered"
+    assert sold_out_spot.available_slots == 0
+
+    claim = client.post(f"/waitlist/{first['id']}/claim", json={"total_amount": 20})
+    assert claim.status_code == 409
+
+def test_cancelled_slots_are_held_for_the_queue(sold_out_spot, db):
+    payment = Payment(user_id="test_user", spot_id=sold_out_spot.spot_id, amount=20, status="success",
+                      razorpay_order_id="order_full")
+    db.add(payment)
+    db.commit()
+    booking = Booking(user_id="test_user", spot_id=sold_out_spot.spot_id, total_slots=1, payment_id=payment.id,
+                      start_date_time=datetime(2999, 10, 1, 10, tzinfo=timezone.utc),
+                      end_date_time=datetime(2999, 10, 1, 12, tzinfo=timezone.utc), status="Booked")
+    db.add(booking)
+    db.commit()
+    waiting = client.post("/waitlist/", json=waitlist_payload(sold_out_spot, "user_a")).json()
+
+    assert client.delete(f"/bookings/{booking.id}").status_code == 200
+
+    # The freed slot never became available to a direct booking
+    db.expire_all()
+    assert sold_out_spot.available_slots == 0
+    assert db.get(WaitlistEntry, waiting["id"]).status == "offered"
+    payload = waitlist_payload(sold_out_spot, "user_b")
+    payload["total_amount"] = 20
+    payload["receipt"] = "receipt_jump"
+    assert client.post("/bookings/book-spot", json=payload).status_code == 409